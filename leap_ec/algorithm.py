@@ -7,6 +7,8 @@
     * random_search() for a more naive strategy
 """
 
+import contextlib
+
 from leap_ec import ops, util
 from toolz import pipe
 from typing import Iterable
@@ -25,6 +27,8 @@ def generational_ea(max_generations: int,
                     init_evaluate=Individual.evaluate_population,
                     k_elites: int=1,
                     start_generation: int=0,
+                    checkpointer=None,
+                    profiler=None,
                     context=context):
     """
     This function provides an evolutionary algorithm with a generational
@@ -64,6 +68,12 @@ def generational_ea(max_generations: int,
     :param start_generation: index of the first generation to count from
         (defaults to 0). You might want to change this, for example, in
         experiments that involve stopping and restarting an algorithm.
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+        saves the population every few generations (and at the end), and
+        that resumes from its last checkpoint if it has one to resume from.
+    :param profiler: an optional `leap_ec.profiling.PipelineProfiler` that
+        records the time spent in, and the individuals passing through, each
+        stage of `pipeline` in each generation.
 
     :return: the final population
 
@@ -117,26 +127,53 @@ def generational_ea(max_generations: int,
     Individual<...>...
 
     """
-    # Initialize a population of pop_size individuals of the same type as
-    # individual_cls
-    parents = representation.create_population(pop_size, problem=problem)
+    if checkpointer is not None and checkpointer.can_resume():
+        # Pick up where the checkpointed run left off
+        state = checkpointer.load()
+        parents = state['population']
+        generation_counter = util.inc_generation(start_generation=state['generation'], context=context)
+    else:
+        # Initialize a population of pop_size individuals of the same type as
+        # individual_cls
+        parents = representation.create_population(pop_size, problem=problem)
+
+        # Set up a generation counter that records the current generation to
+        # context
+        generation_counter = util.inc_generation(start_generation=start_generation, context=context)
+
+        # Evaluate initial population
+        parents = init_evaluate(parents)
+
+    def state():
+        return {'population': parents,
+                'generation': generation_counter.generation()}
+
+    if profiler is not None:
+        pipeline = profiler.wrap(pipeline)
+        # A resumed population brings its own copy of the problem with it
+        timing = profiler.timing(parents[0].problem if parents else problem)
+    else:
+        timing = contextlib.nullcontext()
+
+    with timing:
+        while (generation_counter.generation() < max_generations) and not stop(
+                parents):
+            # Execute the operators to create a new offspring population
+            offspring = pipe(parents, *pipeline,
+                             ops.elitist_survival(parents=parents,
+                                                  k=k_elites))
 
-    # Set up a generation counter that records the current generation to
-    # context
-    generation_counter = util.inc_generation(start_generation=start_generation, context=context)
+            parents = offspring  # Replace parents with offspring
+            generation_counter()  # Increment to the next generation
 
-    # Evaluate initial population
-    parents = init_evaluate(parents)
+            if profiler is not None:
+                profiler.end_generation(generation_counter.generation())
 
-    while (generation_counter.generation() < max_generations) and not stop(
-            parents):
-        # Execute the operators to create a new offspring population
-        offspring = pipe(parents, *pipeline,
-                         ops.elitist_survival(parents=parents,
-                                              k=k_elites))
+            if checkpointer is not None:
+                checkpointer.step(generation_counter.generation(), state)
 
-        parents = offspring  # Replace parents with offspring
-        generation_counter()  # Increment to the next generation
+    if checkpointer is not None:
+        checkpointer.step(generation_counter.generation(), state, force=True)
 
     return parents
 
@@ -148,6 +185,7 @@ def multi_population_ea(max_generations, num_populations, pop_size, problem,
                         representation, shared_pipeline,
                         subpop_pipelines=None, stop=lambda x: False,
                         init_evaluate=Individual.evaluate_population,
+                        checkpointer=None,
                         context=context):
     """
     An EA that maintains multiple (interacting) subpopulations, i.e. for
@@ -181,6 +219,9 @@ def multi_population_ea(max_generations, num_populations, pop_size, problem,
         `Individual.evaluate_population` is suitable for many cases, but you
         may wish to pass a different operator in for distributed evaluation
         or other purposes.
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+        saves the subpopulations every few generations (and at the end), and
+        that resumes from its last checkpoint if it has one to resume from.
 
     :return: a list of lists of each of the subpopulations.
 
@@ -258,10 +299,17 @@ def multi_population_ea(max_generations, num_populations, pop_size, problem,
 
     assert (len(representation) == len(problem))
 
-    # Initialize & evaluate the initial subpopulations
-    pops = [r.create_population(pop_size, problem=p) for r, p in
-            zip(representation, problem)]
-    pops = [init_evaluate(p) for p in pops]
+    if checkpointer is not None and checkpointer.can_resume():
+        # Pick up where the checkpointed run left off
+        state = checkpointer.load()
+        pops = state['populations']
+        start_generation = state['generation']
+    else:
+        # Initialize & evaluate the initial subpopulations
+        pops = [r.create_population(pop_size, problem=p) for r, p in
+                zip(representation, problem)]
+        pops = [init_evaluate(p) for p in pops]
+        start_generation = 0
 
     # Include a reference to the populations in the context object.
     # This allows operators to see all the subpopulations.
@@ -269,7 +317,12 @@ def multi_population_ea(max_generations, num_populations, pop_size, problem,
 
     # Set up a generation counter that records the current generation to the
     # context
-    generation_counter = util.inc_generation(context=context)
+    generation_counter = util.inc_generation(start_generation=start_generation,
+                                             context=context)
+
+    def state():
+        return {'populations': pops,
+                'generation': generation_counter.generation()}
 
     while (generation_counter.generation() < max_generations) and not stop(
             pops):
@@ -288,6 +341,11 @@ def multi_population_ea(max_generations, num_populations, pop_size, problem,
 
         generation_counter()  # Increment to the next generation
 
+        if checkpointer is not None:
+            checkpointer.step(generation_counter.generation(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(generation_counter.generation(), state, force=True)
 
     return pops
 
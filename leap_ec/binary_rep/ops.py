@@ -3,12 +3,13 @@
     Binary representation specific pipeline operators.
 """
 from random import random
-from typing import Iterator
+from typing import Iterator, List
 
 import numpy as np
 
 from leap_ec.util import wrap_curry
-from leap_ec.ops import compute_expected_probability, iteriter_op, random_bernoulli_vector
+from leap_ec.ops import compute_expected_probability, iteriter_op, listlist_op, random_bernoulli_vector
+from leap_ec.population import genome_matrix, set_genomes
 
 
 ##############################
@@ -94,3 +95,54 @@ def genome_mutate_bitflip(genome: np.ndarray,
     genome[indices_to_flip] = (genome[indices_to_flip] + 1) % 2
 
     return genome
+
+
+##############################
+# Function batch_mutate_bitflip
+##############################
+@wrap_curry
+@listlist_op
+def batch_mutate_bitflip(population: List,
+                         expected_num_mutations: float = None,
+                         probability: float = None) -> List:
+    """Perform bit-flip mutation on a whole batch of individuals at once.
+
+    This is a vectorized counterpart of :py:func:`mutate_bitflip` that
+    operates on a list (or :py:class:`~leap_ec.population.Population`) of
+    individuals instead of an iterator.  A single Bernoulli mask is drawn for
+    every bit in the batch, so each bit flips with the same probability as
+    with `mutate_bitflip`.
+
+    All the genomes must be binary numpy arrays of the same length:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([1, 1])), Individual(np.array([0, 1]))]
+    >>> pop = batch_mutate_bitflip(pop, probability=1.0)
+    >>> pop[0].genome, pop[1].genome
+    (array([0, 0]), array([1, 0]))
+
+    :param population: the individuals to mutate (usually clones)
+    :param expected_num_mutations: on average how many mutations done (specificy either this or probability, but not both)
+    :param probability: the probability of mutating any given gene (specificy either this or expected_num_mutations, but not both)
+    :return: the mutated population
+    """
+    if (expected_num_mutations is not None) and (probability is not None):
+        raise ValueError("Received parameters for 'probability' and 'expected_num_mutations', but can only use one or the other.")
+    if (expected_num_mutations is None) and (probability is None):
+        raise ValueError("Received no value for 'probability' or 'expected_num_mutations'.  Must have one.")
+    if (probability is not None) and ((probability < 0) or (probability > 1)):
+        raise ValueError(f"The value of 'probability' is {probability}, but must be >= 0 and <= 1.")
+
+    genomes = genome_matrix(population)
+
+    if probability is None:
+        p = compute_expected_probability(expected_num_mutations, genomes[0])
+    else:
+        p = probability
+
+    indices_to_flip = random_bernoulli_vector(shape=genomes.shape, p=p)
+    genomes[indices_to_flip] = (genomes[indices_to_flip] + 1) % 2
+
+    set_genomes(population, genomes)
+    return population
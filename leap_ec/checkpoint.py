@@ -0,0 +1,242 @@
+"""
+    Checkpointing, so that long runs can be resumed after they're interrupted.
+
+    A checkpoint is a single pickle file that holds
+
+    * the algorithm's own state, such as its population and generation,
+    * the states of Python's and numpy's global random number generators,
+    * the global `context`, and
+    * the picklable attributes of any other stateful objects you ask it to
+      save, such as probes (e.g. `FitnessStatsCSVProbe.bsf_ind`).
+
+    Checkpoints are written to a temporary file in the same directory, which
+    is then renamed over the old checkpoint, so a run that's killed while
+    writing one never leaves behind a corrupt file.
+
+    The monolithic algorithms (`generational_ea()`, `multi_population_ea()`,
+    `generalized_nsga_2()`, and the asynchronous `steady_state()` functions)
+    take a `checkpointer` parameter:
+
+    >>> from leap_ec.algorithm import generational_ea
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> from leap_ec.binary_rep.initializers import create_binary_sequence
+    >>> from leap_ec.binary_rep.ops import mutate_bitflip
+    >>> from leap_ec.representation import Representation
+    >>> from leap_ec import ops
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'run.pkl')
+    >>> def run(max_generations):
+    ...     return generational_ea(max_generations=max_generations, pop_size=4,
+    ...                            problem=MaxOnes(),
+    ...                            representation=Representation(
+    ...                                initialize=create_binary_sequence(length=5)),
+    ...                            pipeline=[ops.tournament_selection,
+    ...                                      ops.clone,
+    ...                                      mutate_bitflip(expected_num_mutations=1),
+    ...                                      ops.evaluate,
+    ...                                      ops.pool(size=4)],
+    ...                            checkpointer=Checkpointer(path, every=2, resume=True))
+    >>> pop = run(max_generations=4)
+
+    Running it again resumes from the end of the saved run, rather than
+    starting over, so here just two more generations are run:
+
+    >>> pop = run(max_generations=6)
+    >>> from leap_ec.global_vars import context
+    >>> context['leap']['generation']
+    6
+"""
+import os
+import pickle
+import random
+import tempfile
+
+import numpy as np
+
+from leap_ec.global_vars import context
+
+
+##############################
+# Function save_checkpoint
+##############################
+def save_checkpoint(path, state, stateful=(), context=context):
+    """ Atomically write a checkpoint to `path`.
+
+    :param path: of the checkpoint file
+    :param state: a dict of the algorithm's own state
+    :param stateful: objects whose picklable attributes should be saved too
+    :param context: the context to save
+    """
+    checkpoint = {
+        'state': state,
+        'context': context,
+        'stateful': [object_state(obj, context) for obj in stateful],
+        'random_state': random.getstate(),
+        'numpy_random_state': np.random.get_state(),
+    }
+    atomic_pickle(path, checkpoint)
+
+
+##############################
+# Function atomic_pickle
+##############################
+def atomic_pickle(path, obj):
+    """ Pickle `obj` to `path`, by way of a temporary file in the same
+    directory that is renamed over `path` once it's complete, so that `path`
+    never holds a partly written file.
+
+    :param path: of the file to write
+    :param obj: the object to pickle
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+##############################
+# Function load_checkpoint
+##############################
+def load_checkpoint(path, stateful=(), context=context):
+    """ Read a checkpoint written by `save_checkpoint()`, and restore the
+    random number generators, the context, and the stateful objects from it.
+
+    :param path: of the checkpoint file
+    :param stateful: the objects that were saved with the checkpoint, in the
+        same order, whose attributes are to be restored
+    :param context: the context to restore, in place
+    :return: the dict of the algorithm's own state
+    """
+    with open(path, 'rb') as f:
+        checkpoint = pickle.load(f)
+
+    if len(checkpoint['stateful']) != len(stateful):
+        raise ValueError(f"The checkpoint has {len(checkpoint['stateful'])} stateful objects, but {len(stateful)} were given to restore.")
+
+    # Update the context in place, since other objects may refer to it
+    context.update(checkpoint['context'])
+    for obj, attributes in zip(stateful, checkpoint['stateful']):
+        restore_object_state(obj, attributes)
+    random.setstate(checkpoint['random_state'])
+    np.random.set_state(checkpoint['numpy_random_state'])
+
+    return checkpoint['state']
+
+
+##############################
+# Function object_state
+##############################
+def object_state(obj, context=context):
+    """ Return the attributes of `obj` that can be pickled.
+
+    This leaves out open streams and the like, as well as any reference to
+    the context (which is saved and restored on its own).
+
+    >>> class Probe:
+    ...     def __init__(self):
+    ...         self.best = 7
+    ...         self.key = lambda ind: ind.fitness  # Lambdas can't be pickled
+    >>> object_state(Probe())
+    {'best': 7}
+
+    :param obj: whose state is wanted
+    :param context: the context, which is left out
+    :return: a dict of attributes, which `restore_object_state()` can put
+        back
+    """
+    attributes = {}
+    for name, value in getattr(obj, '__dict__', {}).items():
+        if value is context:
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        attributes[name] = value
+    return attributes
+
+
+##############################
+# Function restore_object_state
+##############################
+def restore_object_state(obj, state):
+    """ Put back attributes saved by `object_state()`.
+
+    :param obj: to be restored
+    :param state: the saved attributes
+    """
+    if state:
+        vars(obj).update(state)
+
+
+##############################
+# Class Checkpointer
+##############################
+class Checkpointer:
+    """ Periodically saves checkpoints for an algorithm, and resumes from
+    them.
+
+    :param path: of the checkpoint file
+    :param every: how many steps (generations, or births for steady-state
+        algorithms) to go between checkpoints
+    :param resume: if True, and the checkpoint file exists, an algorithm given
+        this checkpointer resumes from it instead of starting a new run
+    :param stateful: other objects whose picklable attributes are to be saved
+        and restored along with the algorithm, such as the probes in its
+        pipeline
+    :param context: the context to save and restore
+    """
+    def __init__(self, path, every: int = 1, resume: bool = True,
+                 stateful=(), context=context):
+        assert(every > 0)
+        self.path = path
+        self.every = every
+        self.resume = resume
+        self.stateful = list(stateful)
+        self.context = context
+        self.last_step = None
+
+    def can_resume(self):
+        """:return: True if there is a checkpoint that we should resume from"""
+        return self.resume and os.path.exists(self.path)
+
+    def load(self):
+        """:return: the algorithm state saved in the checkpoint, after
+        restoring the rest"""
+        state = load_checkpoint(self.path, self.stateful, self.context)
+        self.last_step = state.get('step')
+        return state
+
+    def save(self, step, state):
+        """ Save a checkpoint now.
+
+        :param step: the current generation or birth count
+        :param state: a dict of the algorithm's own state
+        """
+        save_checkpoint(self.path, dict(state, step=step), self.stateful,
+                        self.context)
+        self.last_step = step
+
+    def step(self, step, state, force=False):
+        """ Save a checkpoint if at least `every` steps have passed since the
+        last one.
+
+        :param step: the current generation or birth count
+        :param state: a dict of the algorithm's own state, or a function that
+            returns one, which is only called if a checkpoint is due
+        :param force: save a checkpoint even if one isn't due yet, as at the
+            end of a run
+        :return: True if a checkpoint was saved
+        """
+        last_step = 0 if self.last_step is None else self.last_step
+        if step - last_step < self.every and not force:
+            return False
+        self.save(step, state() if callable(state) else state)
+        return True
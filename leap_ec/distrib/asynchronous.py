@@ -9,14 +9,18 @@
 """
 import random
 import logging
+from collections import deque
+
 import toolz
 
 import distributed
 
+from leap_ec.checkpoint import object_state, restore_object_state
 from leap_ec.global_vars import context
-from leap_ec import util
+from leap_ec import ops, util
 
-from .evaluate import evaluate, is_viable
+from .evaluate import (evaluate, evaluate_chunk, is_viable,
+                       lookup_cached_fitness, cache_fitness)
 from .individual import DistributedIndividual
 
 # Create unique logger for this namespace
@@ -38,20 +42,63 @@ logger.addHandler(console_handler)
 def eval_population(population, client, context=context):
     """ Concurrently evaluate all the individuals in the given population
 
+    Individuals whose fitnesses are already in a `CachedProblem` aren't
+    evaluated again, but just scattered to the cluster so that their futures
+    complete right away, and the fitnesses of the others are added to the
+    client side cache as they arrive.
+
     :param population: to be evaluated
     :param client: dask client
     :param context: for storing count of non-viable individuals
     :return: dask distrib iterator for futures
     """
+    from_cache = [lookup_cached_fitness(individual) for individual in population]
+    hits = [individual for individual, hit in zip(population, from_cache)
+            if hit]
+    misses = [individual for individual, hit in zip(population, from_cache)
+              if not hit]
+
     # farm out population to worker nodes for evaluation
-    worker_futures = client.map(evaluate(context=context), population,
+    worker_futures = client.map(evaluate(context=context), misses,
                                 pure=False)
+    for individual, future in zip(misses, worker_futures):
+        future.add_done_callback(_cache_result(individual.problem))
+    if hits:
+        worker_futures += client.scatter(hits, hash=False)
 
     # We'll need this later to catch eval tasks as they complete, and to
     # submit new tasks.
     return distributed.as_completed(worker_futures)
 
 
+def _cache_result(problem):
+    """ :return: a future's done callback that caches the fitness of the
+        individual it evaluated in `problem`, if that is a `CachedProblem` """
+    def callback(future):
+        if future.status == 'finished':
+            cache_fitness(problem, future.result())
+
+    return callback
+
+
+##############################
+# function submit_chunks
+##############################
+def submit_chunks(individuals, client, chunksize, context=context):
+    """ Submit the given individuals for evaluation in chunks of `chunksize`
+    individuals per task
+
+    :param individuals: to be evaluated
+    :param client: dask client
+    :param chunksize: how many individuals each task evaluates
+    :param context: for storing count of non-viable individuals
+    :return: list of futures, each for a list of evaluated individuals
+    """
+    chunks = [individuals[i:i + chunksize]
+              for i in range(0, len(individuals), chunksize)]
+    return client.map(evaluate_chunk(context=context), chunks, pure=False)
+
+
 ##############################
 # function replace_if
 ##############################
@@ -62,21 +109,26 @@ def replace_if(new_individual, pop, index):
     :param new_individual: is a newly evaluated individual
     :param pop: of already evaluated individuals
     :param index: of individual in pop to be compared against
-    :return: None
+    :return: the individual that was replaced, or `new_individual` if it
+        wasn't let in
     """
     # If individual in the pop is not viable, it will *always lose*, even if
     # the new individual is also not viable.  (Thus assuring there is churn
     # in the pop.
-    if not is_viable(pop[index]):
+    old_individual = pop[index]
+    if not is_viable(old_individual):
         logger.debug('Replacing %s for %s due to non-viable individual',
-                     new_individual, pop[index])
+                     new_individual, old_individual)
         pop[index] = new_individual
-    elif new_individual > pop[index]:
-        logger.debug('Replaced %s with %s', pop[index], new_individual)
+        return old_individual
+    elif new_individual > old_individual:
+        logger.debug('Replaced %s with %s', old_individual, new_individual)
         pop[index] = new_individual
+        return old_individual
     else:
         logger.debug('%s < %s, so the latter stays in pop', new_individual,
-                     pop[index])
+                     old_individual)
+        return new_individual
 
 
 ##############################
@@ -99,14 +151,16 @@ def tournament_insert_into_pop(individual, pop, max_size):
     :param individual: that was just evaluated
     :param pop: of already evaluated individuals
     :param max_size: of the pop
-    :return: None
+    :return: the individual that was evicted from (or kept out of) the pop,
+        or None if the pop wasn't full
     """
     if len(pop) < max_size:
         logger.debug('pop not at capacity, so just inserting')
         pop.append(individual)
+        return None
     else:
         rand_index = random.randrange(len(pop))
-        replace_if(individual, pop, rand_index)
+        return replace_if(individual, pop, rand_index)
 
 
 ##############################
@@ -122,16 +176,18 @@ def greedy_insert_into_pop(individual, pop, max_size):
 
     :param individual: that was just evaluated
     :param pop: of already evaluated individuals
-    :return: None
+    :return: the individual that was evicted from (or kept out of) the pop,
+        or None if the pop wasn't full
     """
     if len(pop) < max_size:
         logger.debug('pop not at capacity, so just inserting')
         pop.append(individual)
+        return None
     else:
         # From https://stackoverflow.com/questions/2474015/getting-the-index
         # -of-the-returned-max-or-min-item-using-max-min-on-a-list
         index_min = min(range(len(pop)), key=pop.__getitem__)
-        replace_if(individual, pop, index_min)
+        return replace_if(individual, pop, index_min)
 
 
 ##############################
@@ -144,9 +200,29 @@ def steady_state(client, max_births, init_pop_size, pop_size,
                  count_nonviable=False,
                  evaluated_probe=None,
                  pop_probe=None,
+                 chunksize=None,
+                 checkpointer=None,
                  context=context):
     """ Implements an asynchronous steady-state EA
 
+    By default, each evaluated individual is inserted into the population
+    as soon as it arrives, and `offspring_pipeline` is run right away to
+    breed its replacement, which is then submitted as its own dask task.
+
+    If `chunksize` is given, this runs in a *batched* mode instead, which
+    has far less per-evaluation overhead when there are many workers and
+    evaluations are cheap.  Whatever evaluations have completed are
+    collected together; all of them are inserted into the population, then
+    `pop_probe` is called once, and then `offspring_pipeline` is run once to
+    breed one replacement for each of them.  These are submitted in tasks
+    of `chunksize` individuals each.  In this mode `offspring_pipeline`
+    should *not* end in `ops.pool()`, because one sized for the batch is
+    appended to it.
+
+    In either mode, if `problem` is a `CachedProblem`, offspring whose
+    fitnesses it already has are inserted without being sent to the workers,
+    and the fitnesses of the rest are added to it as they arrive.
+
     :param client: Dask client that should already be set-up
     :param max_births: how many births are we allowing?
     :param init_pop_size: size of initial population sent directly to workers
@@ -165,25 +241,61 @@ def steady_state(client, max_births, init_pop_size, pop_size,
            individuals
     :param pop_probe: is an optional function that writes a snapshot of the
            population to a CSV formatted stream ever N births
+    :param chunksize: if given, use the batched mode, with this many
+           individuals evaluated per dask task
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+           saves the population, the individuals still being evaluated, and
+           the state of `inserter` every few births (and at the end), and
+           that resumes from its last checkpoint if it has one to resume
+           from, in which case those individuals are evaluated again
+    :param context: for storing count of non-viable individuals
     :return: the population containing the final individuals
     """
-    initial_population = representation.create_population(init_pop_size,
-                                                          problem=problem)
+    if chunksize is not None:
+        return _batched_steady_state(client, max_births, init_pop_size,
+                                     pop_size, representation, problem,
+                                     offspring_pipeline, inserter,
+                                     count_nonviable, evaluated_probe,
+                                     pop_probe, chunksize, checkpointer,
+                                     context)
+
+    pop, unevaluated, births = _start_steady_state(
+        init_pop_size, representation, problem, inserter, checkpointer)
+
+    # Maps each outstanding future to the individual it is evaluating
+    in_flight = {}
+    # Individuals whose fitnesses were found in a CachedProblem, and so are
+    # never sent to the workers
+    from_cache = deque()
+
+    def submit(individuals):
+        misses = _lookup_cached(individuals, from_cache)
+        futures = client.map(evaluate(context=context), misses,
+                             pure=False)
+        in_flight.update(zip(futures, ([ind] for ind in misses)))
+        return futures
 
     # fan out the entire initial population to dask workers
-    as_completed_iter = eval_population(initial_population, client=client,
-                                        context=context)
-
-    # This is where we'll be putting evaluated individuals
-    pop = []
+    as_completed_iter = distributed.as_completed(submit(unevaluated))
 
     # Bookkeeping for tracking the number of max_births towards are fixed
     # birth budget.
-    birth_counter = util.inc_births(context, start=0)
+    birth_counter = util.inc_births(context, start=births)
 
-    for i, evaluated_future in enumerate(as_completed_iter):
+    def state():
+        return _steady_state_state(pop, [*in_flight.values(), from_cache],
+                                   birth_counter, inserter, context)
 
-        evaluated = evaluated_future.result()
+    # If resuming from a run that had wound down, breed enough offspring to
+    # get init_pop_size evaluations going again, as far as the budget allows
+    while pop and len(in_flight) + len(from_cache) < init_pop_size and \
+            birth_counter.births() < max_births:
+        offspring = toolz.pipe(pop, *offspring_pipeline)
+        as_completed_iter.update(submit(offspring))
+        birth_counter.do_increment(len(offspring))
+
+    for i, evaluated in enumerate(_completed(as_completed_iter, in_flight,
+                                             from_cache)):
 
         if evaluated_probe is not None:
             # Give a chance to do something extra with the newly evaluated
@@ -219,10 +331,7 @@ def steady_state(client, max_births, init_pop_size, pop_size,
             [logger.debug('%s', str(o.genome)) for o in offspring]
 
             # Now asynchronously submit to dask
-            for child in offspring:
-                future = client.submit(evaluate(context=context), child,
-                                       pure=False)
-                as_completed_iter.add(future)
+            as_completed_iter.update(submit(offspring))
 
             # Be sure to count the new kids against the birth budget
             birth_counter.do_increment(len(offspring))
@@ -230,4 +339,193 @@ def steady_state(client, max_births, init_pop_size, pop_size,
             logger.debug(f'Not creating offspring because birth count is'
                          f'{birth_counter.births()}')
 
+        if checkpointer is not None:
+            checkpointer.step(birth_counter.births(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(birth_counter.births(), state, force=True)
+
     return pop
+
+
+def _batched_steady_state(client, max_births, init_pop_size, pop_size,
+                          representation, problem, offspring_pipeline,
+                          inserter, count_nonviable, evaluated_probe,
+                          pop_probe, chunksize, checkpointer, context):
+    """ The batched mode of `steady_state()`; see there for the parameters.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, but got {chunksize}.")
+
+    pop, unevaluated, births = _start_steady_state(
+        init_pop_size, representation, problem, inserter, checkpointer)
+
+    # Maps each outstanding future to the chunk of individuals it is
+    # evaluating
+    in_flight = {}
+    # Individuals whose fitnesses were found in a CachedProblem, and so are
+    # never sent to the workers
+    from_cache = deque()
+
+    def submit(individuals):
+        misses = _lookup_cached(individuals, from_cache)
+        futures = submit_chunks(misses, client, chunksize, context)
+        chunks = [misses[i:i + chunksize]
+                  for i in range(0, len(misses), chunksize)]
+        in_flight.update(zip(futures, chunks))
+        return futures
+
+    # fan out the entire initial population to dask workers
+    as_completed_iter = distributed.as_completed(submit(unevaluated))
+
+    # Bookkeeping for tracking the number of max_births towards are fixed
+    # birth budget.
+    birth_counter = util.inc_births(context, start=births)
+
+    def state():
+        return _steady_state_state(pop, [*in_flight.values(), from_cache],
+                                   birth_counter, inserter, context)
+
+    # If resuming from a run that had wound down, breed enough offspring to
+    # get init_pop_size evaluations going again, as far as the budget allows
+    num_offspring = min(init_pop_size - len(unevaluated),
+                        max_births - birth_counter.births())
+    if pop and num_offspring > 0:
+        offspring = toolz.pipe(pop, *offspring_pipeline,
+                               ops.pool(size=num_offspring))
+        as_completed_iter.update(submit(offspring))
+        birth_counter.do_increment(len(offspring))
+
+    i = 0
+    for batch in _completed_batches(as_completed_iter, in_flight, from_cache):
+        # How many evaluations just finished, and so how many replacements
+        # we need to keep the workers just as busy
+        num_finished = len(batch)
+
+        for evaluated in batch:
+            if evaluated_probe is not None:
+                evaluated_probe(evaluated)
+
+            logger.debug('%d evaluated: %s %s', i, str(evaluated.genome),
+                         str(evaluated.fitness))
+            i += 1
+
+            if not is_viable(evaluated) and not count_nonviable:
+                births = birth_counter.do_decrement()
+                logger.debug(f'Non-viable individual, birth count now {births}')
+
+            inserter(evaluated, pop, pop_size)
+
+        if pop_probe is not None:
+            pop_probe(pop)
+
+        num_offspring = min(num_finished, max_births - birth_counter.births())
+        if num_offspring > 0:
+            offspring = toolz.pipe(pop, *offspring_pipeline,
+                                   ops.pool(size=num_offspring))
+
+            logger.debug('created %d offspring', len(offspring))
+
+            as_completed_iter.update(submit(offspring))
+
+            # Be sure to count the new kids against the birth budget
+            birth_counter.do_increment(len(offspring))
+        else:
+            logger.debug(f'Not creating offspring because birth count is'
+                         f'{birth_counter.births()}')
+
+        if checkpointer is not None:
+            checkpointer.step(birth_counter.births(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(birth_counter.births(), state, force=True)
+
+    return pop
+
+
+def _start_steady_state(init_pop_size, representation, problem, inserter,
+                        checkpointer):
+    """ Either create a new initial population, or resume from
+    `checkpointer`'s last checkpoint.
+
+    :return: the population, the individuals to be evaluated, and the birth
+        count
+    """
+    if checkpointer is not None and checkpointer.can_resume():
+        state = checkpointer.load()
+        restore_object_state(inserter, state['inserter'])
+        return state['population'], state['unevaluated'], state['births']
+
+    initial_population = representation.create_population(init_pop_size,
+                                                          problem=problem)
+    return [], initial_population, 0
+
+
+def _lookup_cached(individuals, from_cache):
+    """ Look up the fitnesses of `individuals` in their `CachedProblem`, if
+    they have one, on the client side, since a copy sent to a worker arrives
+    with an empty cache.
+
+    :param individuals: to be evaluated
+    :param from_cache: a deque that the individuals whose fitnesses were
+        found are appended to
+    :return: the rest of the individuals, which still need to be evaluated
+    """
+    misses = []
+    for individual in individuals:
+        if lookup_cached_fitness(individual):
+            from_cache.append(individual)
+        else:
+            misses.append(individual)
+    return misses
+
+
+def _completed(as_completed_iter, in_flight, from_cache):
+    """ Yield each individual as soon as it has either been found in the cache
+    or been evaluated, in which case its fitness is added to the cache.
+
+    The cached individuals come first, so that none are left waiting on an
+    evaluation.  New futures and cached individuals may be added between
+    yields.
+    """
+    while True:
+        while from_cache:
+            yield from_cache.popleft()
+        try:
+            evaluated_future = next(as_completed_iter)
+        except StopIteration:
+            return
+        individual, = in_flight.pop(evaluated_future)
+        evaluated = evaluated_future.result()
+        cache_fitness(individual.problem, evaluated)
+        yield evaluated
+
+
+def _completed_batches(as_completed_iter, in_flight, from_cache):
+    """ Like `_completed()`, but yield lists of all the individuals that have
+    been found in the cache or been evaluated since the last list.
+    """
+    while True:
+        try:
+            # Don't wait on the workers if there are cached individuals
+            batch = as_completed_iter.next_batch(block=not from_cache)
+        except StopIteration:
+            return
+        evaluated = list(from_cache)
+        from_cache.clear()
+        for evaluated_future in batch:
+            chunk = in_flight.pop(evaluated_future)
+            for individual, evaluated_individual in \
+                    zip(chunk, evaluated_future.result()):
+                cache_fitness(individual.problem, evaluated_individual)
+                evaluated.append(evaluated_individual)
+        yield evaluated
+
+
+def _steady_state_state(pop, unevaluated, birth_counter, inserter, context):
+    """ :return: the state of a steady-state EA to be checkpointed, where
+        `unevaluated` holds lists of the individuals still to be evaluated """
+    return {'population': pop,
+            'unevaluated': [ind for chunk in unevaluated for ind in chunk],
+            'births': birth_counter.births(),
+            'inserter': object_state(inserter, context)}
@@ -10,6 +10,8 @@ import distributed
 
 from leap_ec.util import wrap_curry
 from leap_ec.global_vars import context
+from leap_ec.individual import RobustIndividual
+from leap_ec.problem import CachedProblem
 
 
 @wrap_curry
@@ -72,6 +74,20 @@ def evaluate(individual, context=context):
     return individual
 
 
+@wrap_curry
+def evaluate_chunk(individuals, context=context):
+    """ concurrently evaluate a chunk of individuals in a single task
+
+    This runs `evaluate()` on each of the given individuals in turn on the
+    same dask worker, so that the scheduling overhead of a task is shared
+    by the whole chunk rather than paid by every individual.
+
+    :param individuals: to be evaluated
+    :return: the evaluated individuals
+    """
+    return [evaluate(individual, context=context) for individual in individuals]
+
+
 def is_viable(individual):
     """
     evaluate.evaluate() will set an individual's fitness to NaN and the
@@ -86,3 +102,50 @@ def is_viable(individual):
         return individual.is_viable
     else:
         return True
+
+
+def lookup_cached_fitness(individual):
+    """ If the individual's problem is a `CachedProblem` that already has the
+    fitness of its phenome, assign that fitness so that the individual needn't
+    be sent to a worker.
+
+    A `CachedProblem` shipped to a worker arrives with an empty cache, so
+    this lookup has to happen on the client side.
+
+    :param individual: to be looked up
+    :return: True if the individual got its fitness from the cache
+    """
+    problem = individual.problem
+    if not isinstance(problem, CachedProblem):
+        return False
+
+    try:
+        individual.fitness = problem.lookup(problem.key(individual.decode()))
+    except KeyError:
+        return False
+    except Exception:
+        # Leave undecodable individuals to be handled by evaluation
+        return False
+
+    if isinstance(individual, RobustIndividual):
+        individual.is_viable = True
+    return True
+
+
+def cache_fitness(problem, individual):
+    """ Store the fitness of an individual that a worker just evaluated in
+    `problem`, the client side copy of its problem, if that is a
+    `CachedProblem`.
+
+    The individual is also given back `problem` in place of the empty copy
+    it returned with, so that its offspring share the client's cache.
+
+    :param problem: the individual's problem on the client side
+    :param individual: that has been evaluated
+    """
+    if not isinstance(problem, CachedProblem):
+        return
+
+    individual.problem = problem
+    if is_viable(individual):
+        problem.store(problem.key(individual.phenome), individual.fitness)
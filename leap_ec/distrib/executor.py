@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+  This provides fitness evaluation pipeline operators that run on a standard
+  `concurrent.futures` executor, such as a `ProcessPoolExecutor` or a
+  `ThreadPoolExecutor`, rather than on a dask cluster.
+
+  These have the same interface as their counterparts in
+  `leap_ec.distrib.synchronous` (and, for `steady_state()`,
+  `leap_ec.distrib.asynchronous`), but take an `executor` instead of a dask
+  `client`.  They avoid the startup and scheduling overhead of dask, which can
+  dominate on a single machine when fitness evaluations are cheap.
+
+  Individuals never leave the calling process.  Each individual is decoded
+  locally, and only its phenome (along with its problem) is sent to a worker,
+  in chunks of `chunksize` phenomes per task.  The workers send back fitnesses
+  and timing information, and the bookkeeping that
+  `leap_ec.distrib.evaluate.evaluate()` does on dask workers is then applied
+  to the individuals locally.  This means individuals whose evaluation needs
+  more than their phenome, such as `WholeEvaluatedIndividual`, aren't
+  supported here.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import logging
+from math import nan
+from multiprocessing import shared_memory
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import toolz
+
+from leap_ec import leap_logger_name
+from leap_ec.checkpoint import object_state, restore_object_state
+from leap_ec.global_vars import context
+from leap_ec.individual import RobustIndividual
+from leap_ec.population import genome_matrix
+from leap_ec.problem import CachedProblem
+from leap_ec.util import wrap_curry
+from leap_ec import ops, util
+
+from .asynchronous import greedy_insert_into_pop
+from .evaluate import cache_fitness, is_viable, lookup_cached_fitness
+
+logger = logging.getLogger(leap_logger_name)
+
+
+##############################
+# function evaluate_phenomes
+##############################
+def evaluate_phenomes(problems, phenomes):
+    """ Evaluate a chunk of phenomes; this is what runs on the executor's
+    workers.
+
+    Any exception raised while evaluating a phenome is caught and returned in
+    place of its fitness, so one bad phenome doesn't spoil the rest of the
+    chunk.
+
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> import numpy as np
+    >>> problem = MaxOnes()
+    >>> results = evaluate_phenomes([problem, problem], [np.array([1, 1]), None])
+    >>> results[0][:2], type(results[1][1]).__name__
+    ((2, None), 'ValueError')
+
+    :param problems: the problem to evaluate each phenome on (sending the same
+        problem object several times in one task costs no more than sending
+        it once, because pickle memoizes it)
+    :param phenomes: a chunk of phenomes to evaluate
+    :return: a list of `(fitness, exception, start_eval_time,
+        stop_eval_time, hostname, pid)` tuples, one for each phenome
+    """
+    hostname, pid = platform.node(), os.getpid()
+    results = []
+    for problem, phenome in zip(problems, phenomes):
+        start_eval_time = time.time()
+        try:
+            fitness, exception = problem.evaluate(phenome), None
+        except Exception as e:
+            fitness, exception = nan, e
+        results.append((fitness, exception, start_eval_time, time.time(),
+                        hostname, pid))
+    return results
+
+
+##############################
+# function submit_population
+##############################
+def submit_population(population, executor, chunksize=1):
+    """ Decode the given individuals and submit their phenomes to `executor`
+    for evaluation, in chunks.
+
+    A `RobustIndividual` that can't be decoded isn't submitted; instead, it
+    gets a future that has already been resolved with its exception, so that
+    `apply_results()` marks it non-viable.  Likewise, an individual whose
+    `CachedProblem` already has its fitness gets a future resolved with that
+    fitness.  For the rest, the problem that a `CachedProblem` wraps is sent
+    to the workers in its place.
+
+    :param population: to be evaluated
+    :param executor: a `concurrent.futures.Executor`
+    :param chunksize: how many phenomes to send to a worker in each task
+    :return: a list of `(individuals, future)` pairs, one for each chunk
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, but got {chunksize}.")
+
+    submitted = []
+    for start in range(0, len(population), chunksize):
+        chunk, phenomes = [], []
+        for individual in population[start:start + chunksize]:
+            if lookup_cached_fitness(individual):
+                submitted.append(([individual],
+                                  _resolved(individual.fitness, None)))
+                continue
+            try:
+                phenomes.append(individual.decode())
+            except Exception as e:
+                if not isinstance(individual, RobustIndividual):
+                    raise
+                submitted.append(([individual], _resolved(nan, e)))
+                continue
+            chunk.append(individual)
+
+        if chunk:
+            problems = [individual.problem.wrapped_problem
+                        if isinstance(individual.problem, CachedProblem)
+                        else individual.problem
+                        for individual in chunk]
+            future = executor.submit(evaluate_phenomes, problems, phenomes)
+            submitted.append((chunk, future))
+    return submitted
+
+
+def _resolved(fitness, exception):
+    """:return: a future already resolved with a result for one individual
+    that never left this process"""
+    now = time.time()
+    future = Future()
+    future.set_result([(fitness, exception, now, now, platform.node(),
+                        os.getpid())])
+    return future
+
+
+##############################
+# function apply_results
+##############################
+def apply_results(individuals, results, context=context):
+    """ Assign the results of `evaluate_phenomes()` to the individuals they
+    belong to.
+
+    This mirrors `leap_ec.distrib.evaluate.evaluate()`: each individual gets
+    its `fitness`, `start_eval_time`, `stop_eval_time`, `hostname`, and
+    `pid`.  A `RobustIndividual` (such as a `DistributedIndividual`) also gets
+    `is_viable` and, if its evaluation raised an exception, NaN fitness,
+    the `exception`, and a tally in `context['leap']['distrib']['non_viable']`.
+    For any other individual, the exception is re-raised, as it would be by
+    `Individual.evaluate()`.  Fitnesses are also stored in the individuals'
+    `CachedProblem`, if they have one.
+
+    :param individuals: the individuals that were evaluated
+    :param results: the corresponding output of `evaluate_phenomes()`
+    :param context: for storing count of non-viable individuals
+    :return: the evaluated individuals
+    """
+    for individual, result in zip(individuals, results):
+        fitness, exception, start, stop, hostname, pid = result
+
+        if exception is not None:
+            if not isinstance(individual, RobustIndividual):
+                raise exception
+            individual.fitness = nan
+            individual.exception = exception
+            individual.is_viable = False
+            # We track the number of such failures on the off chance that
+            # this might be useful.
+            context['leap']['distrib']['non_viable'] += 1
+            logger.warning('%s raised for %s', exception, individual)
+        else:
+            individual.fitness = fitness
+            if isinstance(individual, RobustIndividual):
+                individual.is_viable = True
+            cache_fitness(individual.problem, individual)
+
+        individual.start_eval_time = start
+        individual.stop_eval_time = stop
+        individual.hostname = hostname
+        individual.pid = pid
+
+    return individuals
+
+
+##############################
+# function eval_population
+##############################
+@wrap_curry
+@ops.listlist_op
+def eval_population(population, executor, chunksize=1, context=context):
+    """ Concurrently evaluate all the individuals in the given population
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([0, 1]), problem=MaxOnes()),
+    ...        Individual(np.array([1, 1]), problem=MaxOnes())]
+    >>> with ThreadPoolExecutor(max_workers=2) as executor:
+    ...     pop = eval_population(pop, executor)
+    >>> [ind.fitness for ind in pop]
+    [1, 2]
+
+    :param population: to be evaluated
+    :param executor: a `concurrent.futures.Executor`, e.g. a
+        `ProcessPoolExecutor`
+    :param chunksize: how many phenomes to send to a worker in each task;
+        larger chunks amortize the cost of each task for cheap fitness
+        functions
+    :param context: for storing count of non-viable individuals
+    :return: evaluated population
+    """
+    for individuals, future in submit_population(population, executor,
+                                                 chunksize):
+        apply_results(individuals, future.result(), context)
+
+    return population
+
+
+##############################
+# function eval_pool
+##############################
+@wrap_curry
+@ops.iterlist_op
+def eval_pool(next_individual, executor, size, chunksize=1,
+              context=context):
+    """ concurrently evaluate `size` individuals
+
+    This is similar to ops.pool() in that it's a "sink" for accumulating
+    individuals by "pulling" individuals from upstream the pipeline via
+    `next_individual`.  However, it's also like ops.evaluate() in that
+    these individuals are concurrently evaluated on the given executor.
+
+    :param next_individual: iterator/generator for individual provider
+    :param executor: a `concurrent.futures.Executor`
+    :param size: how many individuals to evaluate simultaneously.
+    :param chunksize: how many phenomes to send to a worker in each task
+    :param context: for storing count of non-viable individuals
+    :return: the pool of evaluated individuals
+    """
+    # First, accumulate individuals to be evaluated
+    unevaluated_offspring = [next(next_individual) for _ in range(size)]
+
+    evaluated_offspring = eval_population(unevaluated_offspring, executor,
+                                          chunksize, context)
+
+    return evaluated_offspring
+
+
+##############################
+# function evaluate_shared_genomes
+##############################
+def _attach(descriptor):
+    """:return: a shared memory block and the array it holds, given the
+    `(name, shape, dtype)` descriptor of the array"""
+    name, shape, dtype = descriptor
+    if sys.version_info >= (3, 13):
+        # Only the process that created the block should clean it up
+        block = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def evaluate_shared_genomes(genomes_descriptor, fitnesses_descriptor, start,
+                            stop, problem, decoder):
+    """ Decode and evaluate rows `start` to `stop` of a genome matrix in
+    shared memory, writing their fitnesses into a fitness array in shared
+    memory; this is what runs on the workers for
+    `eval_population_shared()`.
+
+    :param genomes_descriptor: `(name, shape, dtype)` of the genome matrix
+    :param fitnesses_descriptor: `(name, shape, dtype)` of the fitness array
+    :param start: the first row to evaluate
+    :param stop: one past the last row to evaluate
+    :param problem: to evaluate the phenomes with
+    :param decoder: to decode the genomes with
+    :return: a list of `(exception, start_eval_time, stop_eval_time,
+        hostname, pid)` tuples, one for each row
+    """
+    hostname, pid = platform.node(), os.getpid()
+    genomes_block, genomes = _attach(genomes_descriptor)
+    fitnesses_block, fitnesses = _attach(fitnesses_descriptor)
+    results = []
+    try:
+        for i in range(start, stop):
+            start_eval_time = time.time()
+            try:
+                # Copy the genome so the phenome can't outlive the block
+                phenome = decoder.decode(genomes[i].copy())
+                fitnesses[i] = problem.evaluate(phenome)
+                exception = None
+            except Exception as e:
+                fitnesses[i] = nan
+                exception = e
+            results.append((exception, start_eval_time, time.time(),
+                            hostname, pid))
+    finally:
+        # The arrays must go before their blocks can be closed
+        del genomes, fitnesses
+        genomes_block.close()
+        fitnesses_block.close()
+    return results
+
+
+##############################
+# function eval_population_shared
+##############################
+@wrap_curry
+@ops.listlist_op
+def eval_population_shared(population, executor, chunksize=1,
+                           context=context):
+    """ Concurrently evaluate all the individuals in the given population,
+    passing their genomes to the workers through shared memory
+
+    Rather than pickling each phenome, as `eval_population()` does, this
+    copies the genome matrix of the population into a
+    `multiprocessing.shared_memory` block once.  Each task then carries only
+    the name of the block, the range of rows to evaluate, and the problem and
+    decoder, and the workers write the fitnesses into a second shared block.
+    This is much cheaper for large genomes, but requires the workers to be on
+    the same host (as with a `ProcessPoolExecutor`, or a dask `Client` for a
+    `LocalCluster`), the genomes to be numeric arrays of equal length, and all
+    the individuals to share one problem and decoder.  The genomes are
+    decoded on the workers.
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> from leap_ec.individual import Individual
+    >>> problem = MaxOnes()
+    >>> pop = [Individual(np.array([0, 1]), problem=problem),
+    ...        Individual(np.array([1, 1]), problem=problem)]
+    >>> with ThreadPoolExecutor(max_workers=2) as executor:
+    ...     pop = eval_population_shared(pop, executor)
+    >>> [ind.fitness for ind in pop]
+    [1.0, 2.0]
+
+    Fitnesses come back as floats, or as float arrays for problems with a
+    `maximize` vector, such as a `MultiObjectiveProblem`.
+
+    :param population: to be evaluated
+    :param executor: a `concurrent.futures.Executor`, or anything else with a
+        compatible `submit()`, such as a dask `Client`
+    :param chunksize: how many rows each task evaluates
+    :param context: for storing count of non-viable individuals
+    :return: evaluated population
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, but got {chunksize}.")
+    if len(population) == 0:
+        return population
+
+    problem, decoder = population[0].problem, population[0].decoder
+    if any(ind.problem is not problem or ind.decoder is not decoder
+           for ind in population):
+        raise ValueError("All the individuals must share the same problem and decoder to be evaluated with shared memory.")
+
+    # Individuals whose fitnesses are already in a CachedProblem don't need
+    # to be sent out at all
+    hostname, pid, now = platform.node(), os.getpid(), time.time()
+    pending = []
+    for individual in population:
+        if lookup_cached_fitness(individual):
+            apply_results([individual],
+                          [(individual.fitness, None, now, now, hostname, pid)],
+                          context)
+        else:
+            pending.append(individual)
+    if not pending:
+        return population
+    if isinstance(problem, CachedProblem):
+        problem = problem.wrapped_problem
+
+    genomes = np.ascontiguousarray(genome_matrix(pending))
+    if genomes.dtype == object:
+        raise ValueError("Genomes must be numeric arrays to be evaluated with shared memory.")
+    # One fitness per row, or a vector of them for multiple objectives
+    fitness_shape = (len(pending),) + np.shape(getattr(problem, 'maximize', True))
+
+    genomes_block = shared_memory.SharedMemory(create=True,
+                                               size=max(1, genomes.nbytes))
+    fitnesses_block = shared_memory.SharedMemory(
+        create=True, size=8 * int(np.prod(fitness_shape)))
+    try:
+        shared_genomes = np.ndarray(genomes.shape, dtype=genomes.dtype,
+                                    buffer=genomes_block.buf)
+        shared_genomes[:] = genomes
+        genomes_descriptor = (genomes_block.name, genomes.shape,
+                              genomes.dtype.str)
+        fitnesses_descriptor = (fitnesses_block.name, fitness_shape, '<f8')
+
+        futures = []
+        for start in range(0, len(pending), chunksize):
+            stop = min(start + chunksize, len(pending))
+            futures.append((start, stop,
+                            executor.submit(evaluate_shared_genomes,
+                                            genomes_descriptor,
+                                            fitnesses_descriptor,
+                                            start, stop, problem, decoder)))
+        timings = {start: future.result() for start, _, future in futures}
+
+        fitnesses = np.ndarray(fitness_shape, dtype='<f8',
+                               buffer=fitnesses_block.buf).copy()
+    finally:
+        shared_genomes = None
+        genomes_block.close()
+        genomes_block.unlink()
+        fitnesses_block.close()
+        fitnesses_block.unlink()
+
+    for start, stop, _ in futures:
+        # Scalar fitnesses as Python floats, vectors as arrays
+        chunk_fitnesses = fitnesses[start:stop]
+        if chunk_fitnesses.ndim == 1:
+            chunk_fitnesses = chunk_fitnesses.tolist()
+        results = [(fitness, *timing) for fitness, timing
+                   in zip(chunk_fitnesses, timings[start])]
+        apply_results(pending[start:stop], results, context)
+
+    return population
+
+
+##############################
+# function steady_state
+##############################
+def steady_state(executor, max_births, init_pop_size, pop_size,
+                 representation,
+                 problem, offspring_pipeline,
+                 inserter=greedy_insert_into_pop,
+                 count_nonviable=False,
+                 evaluated_probe=None,
+                 pop_probe=None,
+                 max_in_flight=None,
+                 checkpointer=None,
+                 context=context):
+    """ Implements an asynchronous steady-state EA on a `concurrent.futures`
+    executor
+
+    This is the counterpart of `leap_ec.distrib.asynchronous.steady_state()`
+    for a local `ProcessPoolExecutor` (or any other executor), and takes the
+    same parameters, inserters, and birth budget: the initial population is
+    evaluated, and then, as each evaluation completes, the new individual is
+    inserted into the population and `offspring_pipeline` is run on the
+    population to breed replacements, so that workers never idle waiting for
+    a generation to finish.
+
+    At most `max_in_flight` evaluations are outstanding at any time.  If the
+    initial population is larger than that, the rest of it waits its turn; if
+    it's smaller, breeding only begins once the first of it has been
+    evaluated and inserted.
+
+    :param executor: a `concurrent.futures.Executor`, e.g. a
+        `ProcessPoolExecutor`
+    :param max_births: how many births are we allowing?
+    :param init_pop_size: size of initial population sent directly to workers
+           at start
+    :param pop_size: how large should the population be?
+    :param representation: of the individuals
+    :param problem: to be solved
+    :param offspring_pipeline: for creating new offspring from the pop
+    :param inserter: function with signature (new_individual, pop, popsize)
+           used to insert newly evaluated individuals into the population;
+           defaults to greedy_insert_into_pop()
+    :param count_nonviable: True if we want to count non-viable individuals
+           towards the birth budget
+    :param evaluated_probe: is a function taking an individual that is given
+           the next evaluated individual; can be used to print newly evaluated
+           individuals
+    :param pop_probe: is an optional function that writes a snapshot of the
+           population to a CSV formatted stream ever N births
+    :param max_in_flight: the most evaluations to have submitted at once;
+           defaults to `init_pop_size`, but is usually best set to the number
+           of workers (or a small multiple of it)
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+           saves the population, the unevaluated individuals, and the state
+           of `inserter` every few births (and at the end), and that resumes
+           from its last checkpoint if it has one to resume from
+    :param context: for storing count of non-viable individuals
+    :return: the population containing the final individuals
+    """
+    if max_in_flight is None:
+        max_in_flight = init_pop_size
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, but got {max_in_flight}.")
+
+    if checkpointer is not None and checkpointer.can_resume():
+        # Pick up where the checkpointed run left off; the individuals that
+        # were being evaluated are evaluated again
+        state = checkpointer.load()
+        pop = state['population']
+        backlog = state['unevaluated']
+        births = state['births']
+        restore_object_state(inserter, state['inserter'])
+    else:
+        # Initial individuals that are waiting for a free slot
+        backlog = representation.create_population(init_pop_size,
+                                                   problem=problem)
+        backlog.reverse()  # So that pop() hands them out in order
+
+        # This is where we'll be putting evaluated individuals
+        pop = []
+        births = 0
+
+    # Maps each outstanding future to the individuals it is evaluating
+    in_flight = {}
+
+    def submit(individuals):
+        for chunk, future in submit_population(individuals, executor):
+            in_flight[future] = chunk
+
+    # Bookkeeping for tracking the number of max_births towards are fixed
+    # birth budget.
+    birth_counter = util.inc_births(context, start=births)
+
+    def refill():
+        # Fill the free slots, first with the rest of the initial
+        # population, and then with offspring while the budget allows; there
+        # is nothing to breed from until an individual has been inserted, so
+        # until then the slots beyond the initial population stay free
+        while backlog and len(in_flight) < max_in_flight:
+            submit([backlog.pop()])
+
+        while pop and len(in_flight) < max_in_flight and \
+                birth_counter.births() < max_births:
+            offspring = toolz.pipe(pop, *offspring_pipeline)
+
+            logger.debug('created offspring: ')
+            [logger.debug('%s', str(o.genome)) for o in offspring]
+
+            if not offspring:
+                break
+            submit(offspring)
+
+            # Be sure to count the new kids against the birth budget
+            birth_counter.do_increment(len(offspring))
+
+    def state():
+        # Outstanding individuals go back in the backlog, in order
+        unevaluated = [ind for chunk in in_flight.values() for ind in chunk]
+        return {'population': pop,
+                'unevaluated': backlog + unevaluated[::-1],
+                'births': birth_counter.births(),
+                'inserter': object_state(inserter, context)}
+
+    refill()
+
+    i = 0
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+        for evaluated_future in done:
+            individuals = in_flight.pop(evaluated_future)
+            apply_results(individuals, evaluated_future.result(), context)
+
+            for evaluated in individuals:
+                if evaluated_probe is not None:
+                    # Give a chance to do something extra with the newly
+                    # evaluated individual
+                    evaluated_probe(evaluated)
+
+                logger.debug('%d evaluated: %s %s', i, str(evaluated.genome),
+                             str(evaluated.fitness))
+                i += 1
+
+                if not is_viable(evaluated) and not count_nonviable:
+                    # if we want the non-viables to not count towards the
+                    # budget then we need to decrement the birth counter to
+                    # ensure that a new individual is spawned to replace it.
+                    births = birth_counter.do_decrement()
+                    logger.debug(f'Non-viable individual, birth count now {births}')
+
+                inserter(evaluated, pop, pop_size)
+
+                if pop_probe is not None:
+                    pop_probe(pop)
+
+        refill()
+
+        if checkpointer is not None:
+            checkpointer.step(birth_counter.births(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(birth_counter.births(), state, force=True)
+
+    return pop
@@ -15,6 +15,10 @@ def log_worker_location(stream=sys.stdout, header=True):
     Suitable for being passed as the `evaluated_probe` argument for
     leap.distrib.asynchronous.steady_state().
 
+    This is called for every evaluated individual, and flushes `stream` each
+    time, so on a slow shared file system you may want to wrap `stream` in a
+    `leap_ec.sink.BackgroundWriter` to keep it from holding up the algorithm.
+
     :param stream: to which we want to write the machine details
     :param header: True if we want a header for the CSV file
     :return: a function for recording where individuals are evaluated
@@ -59,7 +63,8 @@ def log_pop(update_interval, stream=sys.stdout, header=True):
     population.
 
     This is useful for asynchronous.steady_state() to regularly probe the
-    regularly updated population.
+    regularly updated population.  As with `log_worker_location()`, `stream`
+    can be a `leap_ec.sink.BackgroundWriter`.
 
     :param update_interval: how often should we write a row?
     :param stream: open stream to which to write rows
@@ -96,9 +101,9 @@ def log_pop(update_interval, stream=sys.stdout, header=True):
                                  'stop_eval_time': individual.stop_eval_time,
                                  'fitness': individual.fitness})
 
-        # On some systems, such as Summit, we need to force a flush else there
-        # will be no output until the very end of the run.
-        stream.flush()
+            # On some systems, such as Summit, we need to force a flush else
+            # there will be no output until the very end of the run.
+            stream.flush()
 
         interval += 1
 
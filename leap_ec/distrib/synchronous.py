@@ -8,7 +8,7 @@ from leap_ec import leap_logger_name
 from leap_ec.global_vars import context
 from leap_ec.util import wrap_curry
 
-from .evaluate import evaluate
+from .evaluate import evaluate, lookup_cached_fitness, cache_fitness
 from leap_ec import ops
 
 logger = logging.getLogger(leap_logger_name)
@@ -34,8 +34,14 @@ def eval_population(population, client, context=context):
     :param context: for storing count of non-viable individuals
     :return: evaluated population
     """
+    # Individuals whose fitnesses are already in a CachedProblem don't need
+    # to be sent out at all
+    from_cache = [lookup_cached_fitness(individual) for individual in population]
+    to_evaluate = [individual for individual, hit in zip(population, from_cache)
+                   if not hit]
+
     # farm out population to worker nodes for evaluation
-    worker_futures = client.map(evaluate(context=context), population,
+    worker_futures = client.map(evaluate(context=context), to_evaluate,
                                 pure=False)
 
     # now gather all the *completed* evaluations; note that some of the
@@ -43,7 +49,16 @@ def eval_population(population, client, context=context):
     # related computational resources will idle until the last offspring is
     # evaluated.  If this is a problem, please consider using async_eval_pool,
     # instead.
-    evaluated_individuals = client.gather(worker_futures)
+    evaluated = iter(client.gather(worker_futures))
+
+    evaluated_individuals = []
+    for individual, hit in zip(population, from_cache):
+        if not hit:
+            # The worker sent back a copy, along with a copy of its problem
+            evaluated_individual = next(evaluated)
+            cache_fitness(individual.problem, evaluated_individual)
+            individual = evaluated_individual
+        evaluated_individuals.append(individual)
 
     return evaluated_individuals
 
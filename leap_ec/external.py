@@ -0,0 +1,176 @@
+"""
+    Defines the binary wire format that `ExternalProcessProblem` and
+    `PersistentExternalProcessProblem` use with `protocol='binary'`, along
+    with a reference client, `serve()`, for external simulators written in
+    Python.
+
+    With the binary protocol, phenomes and fitnesses are exchanged as
+    *frames*, each holding one flat array:
+
+    ======  =======  ====================================================
+    bytes   type     contents
+    ======  =======  ====================================================
+    1       char     ``f`` for float64 elements, or ``i`` for int64
+    8       uint64   the number of elements, `n`
+    8 * n   array    the elements
+    ======  =======  ====================================================
+
+    All numbers are little-endian.  LEAP writes one frame per phenome to the
+    simulator's stdin, and the simulator writes one frame per phenome to its
+    stdout in the same order, holding a single fitness or, for
+    multi-objective problems, a vector of fitnesses.  Unlike the CSV text
+    protocol, this loses no precision and does no string formatting or
+    parsing, which matters for phenomes with thousands of elements.
+
+    This module only depends on numpy, so it can also be copied into a
+    simulator's own code base.
+"""
+import struct
+import sys
+
+import numpy as np
+
+
+_header = struct.Struct('<cQ')
+_dtypes = {b'f': np.dtype('<f8'), b'i': np.dtype('<i8')}
+_native_dtypes = {b'f': np.float64, b'i': np.int64}
+
+
+##############################
+# Function encode_array
+##############################
+def encode_array(array):
+    """ Encode a flat array of numbers as a frame.
+
+    Integer and boolean arrays are sent as int64; everything else is sent as
+    float64.
+
+    >>> len(encode_array([1.5, 2.0]))  # A 9 byte header plus 8 bytes each
+    25
+
+    :param array: a number or a sequence of numbers
+    :return: the frame, as bytes
+    """
+    array = np.ravel(array)
+    if array.dtype.kind in 'biu':
+        code = b'i'
+    else:
+        code = b'f'
+    array = array.astype(_dtypes[code], copy=False)
+    return _header.pack(code, array.size) + array.tobytes()
+
+
+##############################
+# Function decode_arrays
+##############################
+def decode_arrays(buffer):
+    """ Decode as many whole frames as there are at the start of `buffer`.
+
+    This is meant for reading a stream a chunk at a time: whatever is left
+    over is returned, to be prepended to the next chunk.
+
+    >>> frames = encode_array([1, 2]) + encode_array(3.5)
+    >>> arrays, rest = decode_arrays(frames + b'f')
+    >>> arrays
+    [array([1, 2]), array([3.5])]
+    >>> rest
+    b'f'
+
+    :param buffer: bytes that start at the beginning of a frame
+    :return: a list of the decoded arrays, and the bytes of any trailing
+        partial frame
+    """
+    arrays = []
+    start = 0
+    while len(buffer) - start >= _header.size:
+        code, size = _header.unpack_from(buffer, start)
+        if code not in _dtypes:
+            raise ValueError(f"Unknown array type {code} in binary frame.")
+        end = start + _header.size + 8 * size
+        if len(buffer) < end:
+            break
+        arrays.append(np.frombuffer(buffer, dtype=_dtypes[code], count=size,
+                                    offset=start + _header.size)
+                      .astype(_native_dtypes[code]))
+        start = end
+    return arrays, bytes(buffer[start:])
+
+
+##############################
+# Function write_array
+##############################
+def write_array(stream, array):
+    """ Write `array` as a frame to the binary `stream`.
+
+    :param stream: a binary stream, such as `sys.stdout.buffer`
+    :param array: a number or a sequence of numbers
+    """
+    stream.write(encode_array(array))
+
+
+##############################
+# Function read_array
+##############################
+def read_array(stream):
+    """ Read one frame from the binary `stream`.
+
+    :param stream: a binary stream, such as `sys.stdin.buffer`
+    :return: the decoded array, or `None` if the stream has ended
+    """
+    header = stream.read(_header.size)
+    if len(header) < _header.size:
+        return None
+    code, size = _header.unpack(header)
+    if code not in _dtypes:
+        raise ValueError(f"Unknown array type {code} in binary frame.")
+    data = stream.read(8 * size)
+    if len(data) < 8 * size:
+        raise EOFError("The stream ended in the middle of a binary frame.")
+    return np.frombuffer(data, dtype=_dtypes[code]).astype(_native_dtypes[code])
+
+
+##############################
+# Function serve
+##############################
+def serve(fitness_function, stdin=None, stdout=None):
+    """ Run a simulator's side of the binary protocol.
+
+    This reads phenomes from `stdin` until it is closed, and writes back the
+    result of `fitness_function` for each one, flushing after each so that it
+    works with `PersistentExternalProcessProblem`.  A simulator written in
+    Python can be as simple as::
+
+        from leap_ec.external import serve
+
+        def simulate(phenome):
+            ...
+            return fitness
+
+        if __name__ == '__main__':
+            serve(simulate)
+
+    >>> import io
+    >>> stdin = io.BytesIO(encode_array([1.0, 2.0]) + encode_array([3, 4]))
+    >>> stdout = io.BytesIO()
+    >>> serve(lambda phenome: (phenome.sum(), phenome.max()), stdin, stdout)
+    >>> decode_arrays(stdout.getvalue())
+    ([array([3., 2.]), array([7., 4.])], b'')
+
+    :param fitness_function: takes a phenome, as a numpy array, and returns
+        its fitness, or a sequence of fitnesses
+    :param stdin: binary stream to read phenomes from; defaults to
+        `sys.stdin.buffer`
+    :param stdout: binary stream to write fitnesses to; defaults to
+        `sys.stdout.buffer`
+    """
+    if stdin is None:
+        stdin = sys.stdin.buffer
+    if stdout is None:
+        stdout = sys.stdout.buffer
+
+    while True:
+        phenome = read_array(stdin)
+        if phenome is None:
+            break
+        write_array(stdout, np.asarray(fitness_function(phenome), dtype=float))
+        stdout.flush()
@@ -0,0 +1,277 @@
+"""
+    Summary statistics of fitnesses, for probes and other instrumentation.
+
+    `fitness_stats()` summarizes a whole population's fitnesses at once, from
+    a single fitness array (which, for a `Population`, is the array it already
+    holds), and `RunningFitnessStats` keeps the same statistics up to date as
+    fitnesses are added and removed one at a time, which suits the
+    steady-state algorithms.  Both work with multiobjective fitnesses, for
+    which each statistic is a vector with one value per objective.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from leap_ec.population import Population
+
+
+##############################
+# Class FitnessStats
+##############################
+FitnessStats = namedtuple('FitnessStats', ['count', 'mean', 'std', 'min', 'max'])
+FitnessStats.__doc__ = """ Summary statistics of a set of fitnesses.
+
+    For multiobjective fitnesses, `mean`, `std`, `min`, and `max` are arrays
+    with one value for each objective.  `std` is the population (not sample)
+    standard deviation.
+"""
+
+
+##############################
+# Function population_fitnesses
+##############################
+def population_fitnesses(population):
+    """ Return the fitnesses of a population as a numpy array, with one row
+    per individual.
+
+    For a `Population` this is its `fitnesses` array itself.  Otherwise the
+    fitnesses are collected into a new array, keeping their type, so that
+    integer fitnesses stay integers:
+
+    >>> from leap_ec.data import test_population
+    >>> population_fitnesses(test_population)
+    array([3, 1, 4, 2])
+
+    :param population: a sequence of evaluated individuals
+    :return: an array of shape `(n,)`, or `(n, m)` for multiobjective
+        fitnesses
+    """
+    if isinstance(population, Population):
+        return population.fitnesses
+    return np.asarray([ind.fitness for ind in population])
+
+
+##############################
+# Function fitness_stats
+##############################
+def fitness_stats(fitnesses):
+    """ Compute the count, mean, standard deviation, minimum, and maximum of
+    an array of fitnesses.
+
+    Each statistic is its own numpy reduction over the array, so these are
+    several passes over it, but none of them copies it or goes through the
+    individuals.
+
+    >>> fitness_stats([4, 0, 2, 4])
+    FitnessStats(count=4, mean=2.5, std=1.6583123951777, min=0, max=4)
+
+    The statistics of multiobjective fitnesses are taken over each objective
+    separately:
+
+    >>> import numpy as np
+    >>> stats = fitness_stats(np.array([[1.0, 10.0], [3.0, 30.0]]))
+    >>> stats.mean
+    array([ 2., 20.])
+    >>> stats.max
+    array([ 3., 30.])
+
+    Non-viable (NaN) fitnesses make all the statistics NaN, just as they do
+    with `np.mean()` and friends.
+
+    :param fitnesses: an array-like of shape `(n,)` or `(n, m)`
+    :return: a `FitnessStats`
+    """
+    fitnesses = np.asarray(fitnesses)
+    if len(fitnesses) == 0:
+        raise ValueError("Cannot compute the statistics of an empty set of fitnesses.")
+
+    return FitnessStats(count=len(fitnesses),
+                        mean=fitnesses.mean(axis=0),
+                        std=fitnesses.std(axis=0),
+                        min=fitnesses.min(axis=0),
+                        max=fitnesses.max(axis=0))
+
+
+##############################
+# Class RunningFitnessStats
+##############################
+class RunningFitnessStats:
+    """ Keeps running fitness statistics, updated one fitness (or one batch
+    of fitnesses) at a time in constant time and memory.
+
+    The mean and variance are maintained with Welford's algorithm, which
+    doesn't lose precision the way summing squares does, and batches are
+    merged in with Chan et al.'s parallel variant of it.  Fitnesses can also
+    be taken out again with `remove()` and `replace()`, which reverse
+    Welford's update, so that the statistics can follow a steady-state
+    population as its members are replaced.
+
+    >>> stats = RunningFitnessStats()
+    >>> for fitness in [4, 0, 2]:
+    ...     stats.add(fitness)
+    >>> stats.add_many([4])
+    >>> stats.stats()
+    FitnessStats(count=4, mean=2.5, std=1.6583123951777, min=0.0, max=4.0)
+
+    Non-viable (NaN) fitnesses are counted in `num_nonviable`, but are
+    otherwise left out, so that one failed evaluation doesn't spoil the
+    statistics for the rest of a run:
+
+    >>> stats.add(float('nan'))
+    >>> stats.num_nonviable, stats.stats().count
+    (1, 4)
+
+    For multiobjective fitnesses, a fitness vector counts as non-viable if
+    any of its values is NaN.
+
+    The minimum and maximum can't be recovered once the fitness that set
+    them is removed, so they are reported as NaN until `refresh_bounds()` is
+    given the fitnesses that remain:
+
+    >>> stats.replace(0, 3)
+    >>> stats.stats() # doctest: +ELLIPSIS
+    FitnessStats(count=4, mean=3.25, std=0.829156..., min=nan, max=nan)
+    >>> stats.refresh_bounds([4, 3, 2, 4])
+    >>> stats.stats().min
+    2.0
+    """
+    def __init__(self):
+        self.count = 0
+        self.num_nonviable = 0
+        self.mean = None
+        self.min = None
+        self.max = None
+        self._m2 = None
+        self._bounds_known = True
+
+    def add(self, fitness):
+        """ Add one fitness to the statistics.
+
+        :param fitness: a number, or a vector for multiobjective fitnesses
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        if np.isnan(fitness).any():
+            self.num_nonviable += 1
+            return
+
+        self.count += 1
+        if self.count == 1:
+            self.mean = fitness.copy()
+            self._m2 = np.zeros_like(fitness)
+            self.min = fitness.copy()
+            self.max = fitness.copy()
+            return
+
+        delta = fitness - self.mean
+        self.mean = self.mean + delta / self.count
+        self._m2 = self._m2 + delta * (fitness - self.mean)
+        self.min = np.minimum(self.min, fitness)
+        self.max = np.maximum(self.max, fitness)
+
+    def add_many(self, fitnesses):
+        """ Add a batch of fitnesses to the statistics.
+
+        :param fitnesses: an array-like of shape `(n,)` or `(n, m)`
+        """
+        fitnesses = np.asarray(fitnesses, dtype=float)
+        nan_rows = np.isnan(fitnesses.reshape(len(fitnesses), -1)).any(axis=1)
+        self.num_nonviable += int(nan_rows.sum())
+        fitnesses = fitnesses[~nan_rows]
+        if len(fitnesses) == 0:
+            return
+
+        count = len(fitnesses)
+        mean = fitnesses.mean(axis=0)
+        m2 = ((fitnesses - mean) ** 2).sum(axis=0)
+        if self.count == 0:
+            self.count, self.mean, self._m2 = count, mean, m2
+            self.min = fitnesses.min(axis=0)
+            self.max = fitnesses.max(axis=0)
+            return
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self._m2 = self._m2 + m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = np.minimum(self.min, fitnesses.min(axis=0))
+        self.max = np.maximum(self.max, fitnesses.max(axis=0))
+
+    def remove(self, fitness):
+        """ Remove a fitness that was added before from the statistics.
+
+        :param fitness: a number, or a vector for multiobjective fitnesses
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        if np.isnan(fitness).any():
+            self.num_nonviable -= 1
+            return
+        assert(self.count > 0)
+
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.min = self.max = self._m2 = None
+            self._bounds_known = True
+            return
+
+        delta = fitness - self.mean
+        self.mean = self.mean - delta / self.count
+        # Rounding can leave a tiny negative sum of squares
+        self._m2 = np.maximum(self._m2 - delta * (fitness - self.mean), 0.0)
+        if np.any(fitness <= self.min) or np.any(fitness >= self.max):
+            self._bounds_known = False
+
+    def replace(self, old_fitness, new_fitness):
+        """ Replace a fitness that was added before with a new one.
+
+        :param old_fitness: the fitness to remove
+        :param new_fitness: the fitness to add in its place
+        """
+        self.remove(old_fitness)
+        self.add(new_fitness)
+
+    def refresh_bounds(self, fitnesses):
+        """ Set the minimum and maximum from the fitnesses currently counted,
+        after `remove()` has lost track of them.
+
+        :param fitnesses: an array-like of shape `(n,)` or `(n, m)`, holding
+            the same viable fitnesses as the statistics (and, optionally,
+            non-viable ones, which are ignored)
+        """
+        fitnesses = np.asarray(fitnesses, dtype=float)
+        nan_rows = np.isnan(fitnesses.reshape(len(fitnesses), -1)).any(axis=1)
+        fitnesses = fitnesses[~nan_rows]
+        assert(len(fitnesses) == self.count)
+        if self.count > 0:
+            self.min = fitnesses.min(axis=0)
+            self.max = fitnesses.max(axis=0)
+        self._bounds_known = True
+
+    @property
+    def bounds_known(self):
+        """Whether the minimum and maximum are up to date."""
+        return self._bounds_known
+
+    @property
+    def std(self):
+        """The population standard deviation of the fitnesses so far."""
+        if self.count == 0:
+            return None
+        return np.sqrt(self._m2 / self.count)
+
+    def stats(self):
+        """:return: a `FitnessStats` of the fitnesses so far, or `None` if
+        there aren't any yet"""
+        if self.count == 0:
+            return None
+        low, high = self.min, self.max
+        if not self._bounds_known:
+            low = high = np.full_like(self.mean, np.nan)
+        return FitnessStats(count=self.count, mean=_unwrap(self.mean),
+                            std=_unwrap(self.std), min=_unwrap(low),
+                            max=_unwrap(high))
+
+
+def _unwrap(value):
+    """Turn 0-d arrays into numpy scalars, leaving vectors alone."""
+    return value[()] if np.ndim(value) == 0 else value
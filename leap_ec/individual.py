@@ -5,8 +5,11 @@
 from math import nan
 from copy import copy, deepcopy
 from functools import total_ordering
+import itertools
 import uuid
 
+import numpy as np
+
 from leap_ec.decoder import IdentityDecoder
 
 
@@ -71,9 +74,13 @@ class Individual:
         self.fitness = None
         self._phenome = None
         
-        self.uuid = uuid.uuid4() # every individual gets a unique ID
+        self.uuid = self._new_uuid() # every individual gets a unique ID
         self.parents = set() # set of uuids of parents
 
+    @staticmethod
+    def _new_uuid():
+        """:return: a fresh unique ID for a new individual"""
+        return uuid.uuid4()
 
     @property
     def phenome(self):
@@ -126,7 +133,8 @@ class Individual:
 
         A deep copy of the genome will be created, so if your `Individual`
         has a custom genome type, it's important that it implements the
-        `__deepcopy__()` method.
+        `__deepcopy__()` method.  (numpy genomes that don't hold Python
+        objects are copied with the much cheaper `ndarray.copy()`.)
 
         >>> from leap_ec.binary_rep.problems import MaxOnes
         >>> from leap_ec.decoder import IdentityDecoder
@@ -142,10 +150,10 @@ class Individual:
         True
         """
         cloned = copy(self)
-        cloned.genome = deepcopy(self.genome)
+        cloned.genome = _copy_genome(self.genome)
         cloned.fitness = None
 
-        cloned.uuid = uuid.uuid4()
+        cloned.uuid = self._new_uuid()
         cloned.parents = {self.uuid}
 
         return cloned
@@ -260,6 +268,141 @@ class Individual:
                f"{self.decoder.__repr__()}, {self.problem.__repr__()})"
 
 
+def _copy_genome(genome):
+    """:return: an independent copy of `genome`, using `ndarray.copy()` for
+    numpy arrays of plain values and `deepcopy()` for everything else"""
+    if isinstance(genome, np.ndarray) and genome.dtype != object:
+        return genome.copy()
+    return deepcopy(genome)
+
+
+##############################
+# Class CompactIndividual
+##############################
+class CompactIndividual(Individual):
+    """
+        A memory-lean `Individual` for runs with very many births.
+
+        The core attributes are stored in `__slots__`, which are smaller and
+        quicker to reach than entries in an attribute dictionary.  Since
+        `Individual` isn't slotted, a `CompactIndividual` can still hold
+        ancillary attributes, so it has room for a dictionary; but nothing
+        here reads its `__dict__`, so (on Python 3.11 and later, where one
+        is only built when asked for) no dictionary object is created for it.
+        Instead of a `uuid.uuid4()`, each individual's `uuid` is a cheap
+        integer taken from a counter shared by the whole class:
+
+        >>> import numpy as np
+        >>> from leap_ec.binary_rep.problems import MaxOnes
+        >>> ind = CompactIndividual(np.array([0, 1, 1]), problem=MaxOnes())
+        >>> child = ind.clone()
+        >>> child.uuid == ind.uuid + 1
+        True
+
+        The IDs are only unique within the process that created the
+        individuals, so make offspring on a single client if you rely on them
+        (as the distributed EAs in `leap_ec.distrib` already do).
+
+        Lineage tracking is off by default: `parents` is always an empty
+        `frozenset`, and assignments to it (such as those made by crossover)
+        are ignored.
+
+        >>> child.parents
+        frozenset()
+
+        Set the `track_lineage` class attribute to `True` (on
+        `CompactIndividual` or on a subclass) to record parent IDs like
+        `Individual` does:
+
+        >>> class TrackedIndividual(CompactIndividual):
+        ...     track_lineage = True
+        >>> ind = TrackedIndividual(np.array([0, 1, 1]), problem=MaxOnes())
+        >>> ind.clone().parents == {ind.uuid}
+        True
+
+        Ancillary attributes (`is_viable`, `rank`, etc.) can still be assigned
+        as usual, but unlike with `Individual`, they aren't copied to clones
+        unless the `copy_ancillary` class attribute is set to `True`, since
+        copying them means reading the parent's `__dict__`.
+    """
+    __slots__ = ('genome', 'problem', 'decoder', 'fitness', '_phenome',
+                 'uuid', '_parents')
+
+    # Shared by all instances (of subclasses, too), so IDs never collide
+    _ids = itertools.count()
+
+    # Whether to record the uuids of each individual's parents
+    track_lineage = False
+
+    # Whether clones get (shallow) copies of ancillary attributes
+    copy_ancillary = False
+
+    def __init__(self, genome, decoder=IdentityDecoder(), problem=None):
+        super().__init__(genome, decoder=decoder, problem=problem)
+
+    @staticmethod
+    def _new_uuid():
+        return next(CompactIndividual._ids)
+
+    @property
+    def parents(self):
+        """The set of uuids of this individual's parents, or an empty
+        `frozenset` if lineage is not being tracked."""
+        if not self.track_lineage:
+            return frozenset()
+        return self._parents
+
+    @parents.setter
+    def parents(self, value):
+        if self.track_lineage:
+            self._parents = set(value)
+
+    def clone(self):
+        """Create a 'clone' of this `CompactIndividual`, copying the genome,
+        but not the fitness.
+
+        This avoids the generic `copy()` machinery: numpy genomes are copied
+        with `ndarray.copy()`, the clone gets the next integer ID, and its
+        phenome is left to be decoded from the new genome.
+
+        >>> import numpy as np
+        >>> from leap_ec.binary_rep.problems import MaxOnes
+        >>> ind = CompactIndividual(np.array([0, 1, 1]), problem=MaxOnes())
+        >>> ind.is_viable = True
+        >>> child = ind.clone()
+        >>> child.genome[0] = 1
+        >>> ind.genome, child.genome, hasattr(child, 'is_viable')
+        (array([0, 1, 1]), array([1, 1, 1]), False)
+
+        Ancillary attributes are shallow-copied, as with `Individual.clone()`,
+        only if `copy_ancillary` is `True`:
+
+        >>> class CopyingIndividual(CompactIndividual):
+        ...     copy_ancillary = True
+        >>> ind = CopyingIndividual(np.array([0, 1, 1]), problem=MaxOnes())
+        >>> ind.is_viable = True
+        >>> ind.clone().is_viable
+        True
+        """
+        cls = type(self)
+        cloned = cls.__new__(cls)
+        cloned.genome = _copy_genome(self.genome)
+        cloned.problem = self.problem
+        cloned.decoder = self.decoder
+        cloned.fitness = None
+        cloned._phenome = None
+        cloned.uuid = self._new_uuid()
+        if self.track_lineage:
+            cloned._parents = {self.uuid}
+
+        if self.copy_ancillary:
+            ancillary = self.__dict__
+            if ancillary:
+                cloned.__dict__.update(ancillary)
+
+        return cloned
+
+
 ##############################
 # Class RobustIndividual
 ##############################
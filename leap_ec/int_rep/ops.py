@@ -1,12 +1,13 @@
 """Evolutionary operators for maniuplating integer-vector genomes."""
 from collections.abc import Iterable
 import random
-from typing import Iterator
+from typing import Iterator, List
 
 import numpy as np
 
 from leap_ec.util import wrap_curry
-from leap_ec.ops import compute_expected_probability, iteriter_op, random_bernoulli_vector
+from leap_ec.ops import compute_expected_probability, iteriter_op, listlist_op, random_bernoulli_vector
+from leap_ec.population import genome_matrix, set_genomes
 from leap_ec.real_rep.ops import apply_hard_bounds
 
 
@@ -109,6 +110,68 @@ def individual_mutate_randint(genome,
 
 
 
+##############################
+# Function batch_mutate_randint
+##############################
+@wrap_curry
+@listlist_op
+def batch_mutate_randint(population: List, bounds,
+                         expected_num_mutations=None,
+                         probability=None) -> List:
+    """Perform randint mutation on a whole batch of individuals at once.
+
+    This is a vectorized counterpart of :py:func:`mutate_randint` that
+    operates on a list (or :py:class:`~leap_ec.population.Population`) of
+    individuals instead of an iterator.  One Bernoulli mask is drawn for all
+    the genes in the batch and one vector of uniform integers for the
+    selected genes, so each gene is mutated with the same distribution as with
+    `mutate_randint`.
+
+    All the genomes must be integer numpy arrays of the same length:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([1, 1])), Individual(np.array([5, 5]))]
+    >>> pop = batch_mutate_randint(pop, bounds=[(0, 10), (0, 10)],
+    ...                            expected_num_mutations=1)
+    >>> len(pop)
+    2
+
+    :param population: the individuals to mutate (usually clones)
+    :param bounds: test_sequence of bounds tuples; e.g., [(1,2),(3,4)]
+    :param expected_num_mutations: on average how many mutations done (specificy either this or probability, but not both)
+    :param probability: the probability of mutating any given gene (specificy either this or expected_num_mutations, but not both)
+    :return: the mutated population
+    """
+    if (expected_num_mutations is not None) and (probability is not None):
+        raise ValueError("Received parameters for 'probability' and 'expected_num_mutations', but can only use one or the other.")
+    if (expected_num_mutations is None) and (probability is None):
+        raise ValueError("Received no value for 'probability' or 'expected_num_mutations'.  Must have one.")
+    if (probability is not None) and ((probability < 0) or (probability > 1)):
+        raise ValueError(f"The value of 'probability' is {probability}, but must be >= 0 and <= 1.")
+
+    genomes = genome_matrix(population)
+
+    if probability is None:
+        p = compute_expected_probability(expected_num_mutations, genomes[0])
+    else:
+        p = probability
+
+    indices_to_mutate = random_bernoulli_vector(shape=genomes.shape, p=p)
+
+    bounds = np.broadcast_to(np.array(bounds, dtype=int),
+                             genomes.shape + (2,))
+    selected_bounds = bounds[indices_to_mutate]
+    low = selected_bounds[:, 0]
+    # add one since bounds are inclusive but randint is exclusive
+    high = selected_bounds[:, 1] + 1
+    genomes[indices_to_mutate] = np.random.randint(low, high,
+                                                   size=low.shape[0])
+
+    set_genomes(population, genomes)
+    return population
+
+
 ##############################
 # Function mutate_binomial
 ##############################
@@ -294,6 +357,82 @@ def genome_mutate_binomial(std,
     return mutator
 
 
+##############################
+# Function batch_mutate_binomial
+##############################
+@wrap_curry
+@listlist_op
+def batch_mutate_binomial(population: List, std, bounds: list,
+                          expected_num_mutations: float = None,
+                          probability: float = None,
+                          n: int = 10000) -> List:
+    """Perform additive binomial mutation on a whole batch of individuals at
+    once.
+
+    This is a vectorized counterpart of :py:func:`mutate_binomial` that
+    operates on a list (or :py:class:`~leap_ec.population.Population`) of
+    individuals instead of an iterator.  One Bernoulli mask is drawn for all
+    the genes in the batch and one binomial sample for the selected genes,
+    so each gene is mutated with the same distribution as with
+    `mutate_binomial`.
+
+    All the genomes must be integer numpy arrays of the same length:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([1, 1])), Individual(np.array([5, 5]))]
+    >>> pop = batch_mutate_binomial(pop, std=[2.5, 3.0],
+    ...                             bounds=[(0, 10), (0, 10)],
+    ...                             expected_num_mutations=1)
+    >>> len(pop)
+    2
+
+    :param population: the individuals to mutate (usually clones)
+    :param std: standard deviation of the binomial distribution, either a
+        scalar or a list with a value for each gene
+    :param bounds: list of pairs of hard bounds to clip each gene by
+    :param expected_num_mutations: on average how many mutations done (specificy either this or probability, but not both)
+    :param probability: the probability of mutating any given gene (specificy either this or expected_num_mutations, but not both)
+    :param int n: the number of "coin flips" to use in the binomial process (defaults to 10000)
+    :return: the mutated population
+    """
+    if (expected_num_mutations is not None) and (probability is not None):
+        raise ValueError("Received parameters for 'probability' and 'expected_num_mutations', but can only use one or the other.")
+    if (expected_num_mutations is None) and (probability is None):
+        raise ValueError("Received no value for 'probability' or 'expected_num_mutations'.  Must have one.")
+    if (probability is not None) and ((probability < 0) or (probability > 1)):
+        raise ValueError(f"The value of 'probability' is {probability}, but must be >= 0 and <= 1.")
+
+    if isinstance(std, Iterable):
+        p = np.array([_binomial_p_from_std(n, s) for s in std])
+    else:
+        p = _binomial_p_from_std(n, std)
+
+    genomes = genome_matrix(population)
+    datatype = genomes.dtype
+
+    if probability is None:
+        prob = compute_expected_probability(expected_num_mutations, genomes[0])
+    else:
+        prob = probability
+
+    indices_to_mutate = random_bernoulli_vector(shape=genomes.shape, p=prob)
+
+    # Compute binomial parameters for each selected gene
+    selected_p_values = p if np.ndim(p) == 0 \
+        else np.broadcast_to(p, genomes.shape)[indices_to_mutate]
+    binom_mean = n*selected_p_values
+
+    additive = np.random.binomial(n, selected_p_values,
+                                  size=np.count_nonzero(indices_to_mutate)) \
+        - np.floor(binom_mean)
+    genomes[indices_to_mutate] = genomes[indices_to_mutate] + additive
+    genomes[:] = apply_hard_bounds(genomes, bounds).astype(datatype)
+
+    set_genomes(population, genomes)
+    return population
+
+
 def _binomial_p_from_std(n, std):
     """Given a number of 'coin flips' n, compute the value of p that is
     needed to achieve a desired standard deviation."""
@@ -0,0 +1,284 @@
+"""
+    A bounded external archive of the nondominated individuals found during a
+    run.
+
+    A `ParetoArchive` keeps the objective values of its members in one numpy
+    array, so that a new individual is checked against all of them at once:
+    it's rejected if any member is at least as good on every objective, and
+    otherwise it's added, and the members it dominates are dropped.  Given a
+    `capacity`, the archive never grows past it; when it would, the member
+    that contributes least to the front, by crowding distance or by
+    hypervolume, is evicted.
+
+    >>> from leap_ec.individual import Individual
+    >>> from leap_ec.multiobjective.problems import SCHProblem
+    >>> archive = ParetoArchive(capacity=3)
+    >>> for x in [3.0, 0.0, 2.0, 1.0, 4.0, 0.5]:
+    ...     ind = Individual(x, problem=SCHProblem())
+    ...     _ = ind.evaluate()
+    ...     _ = archive.add(ind)
+    >>> sorted(ind.genome for ind in archive.individuals)
+    [0.0, 1.0, 2.0]
+
+    Since each insertion compares the new individual against the archive's
+    members, and not the members against each other, an archive with a
+    capacity takes time linear in the number of insertions, which keeps it
+    cheap enough for millions of them over a long asynchronous run.
+
+    An archive is a pipeline probe: called on a population, it offers it all
+    of its individuals and returns it unchanged, and called on an iterator,
+    it offers it each individual as it passes through.  Its `add()` method
+    can also be given to the asynchronous `steady_state()` as its
+    `evaluated_probe`.
+
+    `save()` and `load()` snapshot the archive to disk and read it back, and
+    since its state is all in picklable attributes, it can also be given to a
+    `leap_ec.checkpoint.Checkpointer` as one of its `stateful` objects.
+"""
+import pickle
+from typing import Iterator
+
+import numpy as np
+
+from leap_ec.checkpoint import atomic_pickle, object_state, restore_object_state
+from leap_ec.fitness_stats import population_fitnesses
+from leap_ec.multiobjective.ranking import _covers, crowding_distances, \
+    nondominated_ranks
+
+
+##############################
+# Class ParetoArchive
+##############################
+class ParetoArchive:
+    """ An archive of mutually nondominated individuals, of bounded size.
+
+    The objectives' directions are taken from the `maximize` vector of the
+    first individual's `MultiObjectiveProblem`.  Individuals with a NaN
+    objective value (i.e. non-viable ones) are never archived.
+
+    :param capacity: the most individuals to hold, or `None` for no bound
+    :param eviction: how to choose a member to evict when the archive is
+        over capacity: `'crowding'` evicts the one with the smallest crowding
+        distance, and `'hypervolume'` the one whose exclusive contribution to
+        the front's hypervolume is smallest (for two objectives only)
+    :param reference_point: the hypervolume's reference point, in the
+        problem's own objective values; without one the two extreme members
+        are never evicted
+    """
+    def __init__(self, capacity: int = None, eviction: str = 'crowding',
+                 reference_point=None):
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"The capacity must be at least 1, but was {capacity}.")
+        if eviction not in ('crowding', 'hypervolume'):
+            raise ValueError(f"Unknown eviction method '{eviction}'; expected 'crowding' or 'hypervolume'.")
+        self.capacity = capacity
+        self.eviction = eviction
+        self.reference_point = reference_point
+
+        self.maximize = None
+        # Members' fitnesses, oriented so that every objective is maximized,
+        # in the first `size` rows of a buffer that grows by doubling
+        self._keys = None
+        self._individuals = []
+        self.insertions = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._individuals)
+
+    def __call__(self, population):
+        """ Offer every individual of `population` to the archive, and pass
+        the population on.
+
+        :param population: a list of evaluated individuals, or an iterator
+            of them
+        :return: the same population, or an iterator over the same
+            individuals
+        """
+        if isinstance(population, Iterator):
+            return self._probe_iterator(population)
+        self.add_many(population)
+        return population
+
+    def _probe_iterator(self, next_individual):
+        for ind in next_individual:
+            self.add(ind)
+            yield ind
+
+    @property
+    def individuals(self):
+        """:return: a list of the archive's members"""
+        return list(self._individuals)
+
+    @property
+    def fitnesses(self):
+        """:return: an `(n, m)` array of the members' fitnesses"""
+        if self._keys is None:
+            return np.empty((0, 0))
+        return self._keys[:len(self)] * self.maximize
+
+    ##############################
+    # Insertion
+    ##############################
+    def add(self, individual):
+        """ Offer one evaluated individual to the archive.
+
+        :param individual: to add
+        :return: True if it was archived (though it may have been evicted
+            again right away), or False if it was rejected
+        """
+        key = self._key(individual)
+        self.insertions += 1
+        if key is None:
+            return False
+
+        n = len(self)
+        if n > 0:
+            members = self._keys[:n]
+            if _covers(-members, -key[np.newaxis, :]).any():
+                return False  # Some member is at least as good everywhere
+            self._remove(_covers(-key[np.newaxis, :], -members)[0])
+
+        self._append(key[np.newaxis, :], [individual])
+        self._evict()
+        return True
+
+    def add_many(self, individuals):
+        """ Offer a batch of evaluated individuals to the archive.
+
+        This sorts the batch first, so that only its own nondominated members
+        are compared with the archive's, which is much faster than adding the
+        individuals one at a time.
+
+        :param individuals: a sequence of individuals to add
+        :return: the number of them that were archived
+        """
+        individuals = list(individuals)
+        self.insertions += len(individuals)
+        if len(individuals) == 0:
+            return 0
+        if self.maximize is None:
+            self._key(individuals[0])
+
+        keys = population_fitnesses(individuals) * self.maximize
+        viable = np.flatnonzero(~np.isnan(keys).any(axis=1))
+        keys = keys[viable]
+        if len(keys) == 0:
+            return 0
+
+        # Keep the batch's first copy of each of its nondominated fitnesses
+        best = np.flatnonzero(nondominated_ranks(keys) == 1)
+        _, first = np.unique(keys[best], axis=0, return_index=True)
+        chosen = best[np.sort(first)]
+        keys = keys[chosen]
+
+        n = len(self)
+        if n > 0:
+            members = self._keys[:n]
+            accepted = ~self._any_covers(members, keys)
+            chosen, keys = chosen[accepted], keys[accepted]
+            if len(keys) == 0:
+                return 0
+            self._remove(self._any_covers(keys, members))
+
+        self._append(keys, [individuals[i] for i in viable[chosen].tolist()])
+        self._evict()
+        return len(keys)
+
+    @staticmethod
+    def _any_covers(keys, others):
+        """:return: a mask of the rows of `others` that some row of `keys` is
+        at least as good as on every objective, comparing a block at a
+        time"""
+        result = np.zeros(len(others), dtype=bool)
+        block = max(1, 2 ** 22 // max(1, len(others)))
+        for start in range(0, len(keys), block):
+            result |= _covers(-keys[start:start + block], -others).any(axis=0)
+        return result
+
+    def _key(self, individual):
+        """:return: the individual's oriented fitness, or None if it's
+        non-viable"""
+        if self.maximize is None:
+            self.maximize = np.asarray(individual.problem.maximize)
+        key = np.asarray(individual.fitness, dtype=float) * self.maximize
+        return None if np.isnan(key).any() else key
+
+    def _append(self, keys, individuals):
+        n, k = len(self), len(keys)
+        if self._keys is None:
+            self._keys = np.empty((max(16, k), keys.shape[1]))
+        elif n + k > len(self._keys):
+            grown = np.empty((max(2 * len(self._keys), n + k), keys.shape[1]))
+            grown[:n] = self._keys[:n]
+            self._keys = grown
+        self._keys[n:n + k] = keys
+        self._individuals.extend(individuals)
+
+    def _remove(self, mask):
+        """Drop the members where `mask` is True."""
+        removed = np.flatnonzero(mask)
+        if len(removed) == 0:
+            return
+        n = len(self)
+        kept = self._keys[:n][~mask]
+        self._keys[:len(kept)] = kept
+        for i in removed[::-1].tolist():
+            del self._individuals[i]
+
+    ##############################
+    # Eviction
+    ##############################
+    def _evict(self):
+        while self.capacity is not None and len(self) > self.capacity:
+            keys = self._keys[:len(self)]
+            if self.eviction == 'crowding':
+                contributions = crowding_distances(keys)
+            else:
+                contributions = self._hypervolume_contributions(keys)
+            mask = np.zeros(len(keys), dtype=bool)
+            mask[np.argmin(contributions)] = True
+            self._remove(mask)
+            self.evictions += 1
+
+    def _hypervolume_contributions(self, keys):
+        """:return: the hypervolume that each member alone dominates"""
+        if keys.shape[1] != 2:
+            raise ValueError(f"'hypervolume' eviction needs two objectives, but there are {keys.shape[1]}; use 'crowding' instead.")
+        if self.reference_point is None:
+            reference = np.full(2, -np.inf)
+        else:
+            reference = np.asarray(self.reference_point, dtype=float) * self.maximize
+
+        # Mutually nondominated points, sorted by increasing first objective,
+        # are in decreasing order of the second
+        order = np.argsort(keys[:, 0])
+        x, y = keys[order, 0], keys[order, 1]
+        widths = x - np.concatenate(([reference[0]], x[:-1]))
+        heights = y - np.concatenate((y[1:], [reference[1]]))
+        contributions = np.empty(len(keys))
+        contributions[order] = widths * heights
+        return contributions
+
+    ##############################
+    # Snapshots
+    ##############################
+    def save(self, path):
+        """ Atomically write a snapshot of the archive to `path`.
+
+        :param path: of the snapshot file
+        """
+        atomic_pickle(path, object_state(self))
+
+    @classmethod
+    def load(cls, path):
+        """ Read an archive from a snapshot written by `save()`.
+
+        :param path: of the snapshot file
+        :return: the archive
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        archive = cls()
+        restore_object_state(archive, state)
+        return archive
@@ -1,23 +1,92 @@
+from concurrent.futures import Executor
+
 import numpy as np
 from leap_ec import ops, util
 from leap_ec.global_vars import context
 from leap_ec.individual import Individual
 from leap_ec.multiobjective.problems import MultiObjectiveProblem
-from leap_ec.multiobjective.ops import fast_nondominated_sort, per_rank_crowding_calc
+from leap_ec.multiobjective.ranking import crowding_distances, dominance_matrix
 from leap_ec.global_vars import context
 from leap_ec.distrib.asynchronous import steady_state
+from leap_ec.distrib import executor as executor_backend
+
+
+##############################
+# Class _Layer
+##############################
+class _Layer(list):
+    """
+    One nondomination layer for the ENLU inserter: a list of individuals,
+    with their fitnesses kept alongside in an array (oriented so that every
+    objective is maximized, and with non-viable NaNs as the worst values) so
+    that dominance can be tested against the whole layer at once, and their
+    crowding distances.
+
+    Layers aren't modified in place; `take()` and `concatenate()` build new
+    ones from the rows of existing ones, without recomputing anything.
+    """
+    def __init__(self, individuals, fitnesses=None, distances=None):
+        super().__init__(individuals)
+        if fitnesses is None:
+            fitnesses = np.array([_oriented_fitness(ind) for ind in self])
+        if distances is None:
+            distances = np.array([getattr(ind, 'distance', np.nan)
+                                  for ind in self], dtype=float)
+        self.fitnesses = fitnesses
+        self.distances = distances
+        # The best value on each objective, to rule out dominance quickly
+        self.upper = fitnesses.max(axis=0) if len(self) > 0 else None
+
+    def take(self, indices):
+        """Return a new layer of the given rows (or mask) of this one."""
+        indices = np.flatnonzero(indices) if np.asarray(indices).dtype == bool \
+            else np.asarray(indices)
+        return _Layer([self[i] for i in indices.tolist()],
+                      self.fitnesses[indices], self.distances[indices])
 
+    @staticmethod
+    def concatenate(layers):
+        """Return a new layer of the rows of `layers`, in order."""
+        layers = [layer for layer in layers if len(layer) > 0]
+        return _Layer([ind for layer in layers for ind in layer],
+                      np.concatenate([layer.fitnesses for layer in layers]),
+                      np.concatenate([layer.distances for layer in layers]))
 
-def _find_start_layer(ind, layer_pops):
+    def dominates(self, fitness):
+        """Is an (oriented) fitness dominated by any member of this layer?"""
+        if len(self) == 0 or (fitness > self.upper).any():
+            return False
+        F = self.fitnesses
+        return bool(((F >= fitness).all(axis=1) & (F > fitness).any(axis=1)).any())
+
+    def update_crowding(self):
+        """Recompute the layer's crowding distances, and set the `distance` of
+        each member whose distance has changed."""
+        distances = crowding_distances(self.fitnesses)
+        # NaN marks members that haven't had a distance in this layer yet
+        for i in np.flatnonzero(distances != self.distances).tolist():
+            self[i].distance = float(distances[i])
+        self.distances = distances
+
+
+def _oriented_fitness(ind):
+    """An individual's fitness with every objective turned into maximization,
+    and NaNs the worst values."""
+    fitness = np.asarray(ind.fitness * ind.problem.maximize, dtype=float)
+    return np.where(np.isnan(fitness), -np.inf, fitness)
+
+
+def _find_start_layer(fitness, layer_pops):
     """
-    Finds the highest layer in which ind is not dominated.
+    Finds the highest layer in which an individual with the (oriented)
+    fitness is not dominated.
     """
     lo = 0
     hi = len(layer_pops) - 1
     
     while lo <= hi:
         mid = (lo + hi) // 2
-        if not any(i > ind for i in layer_pops[mid]):
+        if not layer_pops[mid].dominates(fitness):
             hi = mid - 1
         else:
             lo = mid + 1
@@ -30,30 +99,20 @@ def _split_dominated(moving_points, layer):
     zenith of moving_points. We use a maximization rather than minimization
     objective versus ENLU, so this is zenith / max vs nadir / min
     """
-    zenith = np.max([
-        ind.fitness * ind.problem.maximize
-        for ind in moving_points
-    ], axis=0)
-    
-    dominated = []
-    nondominated = []
-    for ind in layer:
-        ord_fitness = ind.fitness * ind.problem.maximize
-        if all(zenith >= ord_fitness) and any(zenith > ord_fitness):
-            dominated.append(ind)
-        else:
-            nondominated.append(ind)
-    
-    return nondominated, dominated
+    zenith = moving_points.fitnesses.max(axis=0)
+    F = layer.fitnesses
+    dominated = (zenith >= F).all(axis=1) & (zenith > F).any(axis=1)
+
+    return layer.take(~dominated), layer.take(dominated)
 
 def _set_domination(pop_a, pop_b):
     """
     Checks for each individual in pop_b whether it was dominated by an individual in pop_a.
     """
-    return [
-        any(li > ri for li in pop_a)
-        for ri in pop_b
-    ]
+    if len(pop_b) == 0:
+        return np.zeros(0, dtype=bool)
+    # dominance_matrix() minimizes, so flip the orientation back
+    return dominance_matrix(-pop_a.fitnesses, -pop_b.fitnesses).any(axis=0)
     
 def enlu_inds_rank(start_point, layer_pops):
     """ Performs the incremental non-dominated sorting ranking process.
@@ -61,23 +120,29 @@ def enlu_inds_rank(start_point, layer_pops):
     Based on the ENLU insertion algorithm with the modification of a binary search for the start point.
     Locates the highest layer where the individual is nondominated and inserts it, propagating
     layer composition changes down the rankings.
+
+    Each layer keeps its members' fitnesses in an array, so the dominance tests compare an
+    individual (or a set of them) with a whole layer at once, and only the individuals that
+    change layers have their `rank` updated.
     
         - K. Li, K. Deb, Q. Zhang and Q. Zhang, "Efficient Nondomination Level Update Method for
           Steady-State Evolutionary Multiobjective Optimization," in IEEE Transactions on
           Cybernetics, vol. 47, no. 9, pp. 2838-2849, Sept. 2017, doi: 10.1109/TCYB.2016.2621008.
     
     
-    :param moving points: the set of points descending in rank from the previous layer.
-        In the first recursion this is the inserted individual.
-    :param layer_pops: the population separated into non-dominating layers.
-    :param rank_func: the ranking function used to separate out the dominated group
-        at each recursion.
-    :param depth: the current layer depth the moving points set is dominating.
+    :param start_point: the individual to insert.
+    :param layer_pops: the population separated into non-dominating layers; plain lists of
+        individuals are replaced, in place, by layers that keep their fitnesses in arrays.
+    :return: the range of layers, `(start, end)`, whose members changed.
     """
-    
+    for i, layer in enumerate(layer_pops):
+        if not isinstance(layer, _Layer):
+            layer_pops[i] = _Layer(layer)
+
     # CASE I: Find the first layer where start_point is not dominated
-    start_depth = _find_start_layer(start_point, layer_pops)
-    moving_points = [start_point]
+    fitness = _oriented_fitness(start_point)
+    start_depth = _find_start_layer(fitness, layer_pops)
+    moving_points = _Layer([start_point], fitness[np.newaxis, :])
     
     depth = start_depth
     while depth < len(layer_pops):
@@ -100,20 +165,13 @@ def enlu_inds_rank(start_point, layer_pops):
         
         # CASE IV: Some points are dominated, propagate those onwards
         # The moving points stay in this layer, while those not dominated by the zenith
-        # remain unchanged
-        layer_pops[depth] = nondominated + moving_points
-        moving_points = []
-        
-        # The truly dominated go to the next layer down, while the rest are added to
-        # the current layer
-        for ind, dom in zip(dominated, true_dominated):
-            if dom:
-                moving_points.append(ind)
-            else:
-                layer_pops[depth].append(ind)
-                
-        for ind in layer_pops[depth]:
+        # remain unchanged, and the truly dominated go to the next layer down
+        layer_pops[depth] = _Layer.concatenate(
+            [nondominated, moving_points, dominated.take(~true_dominated)])
+        for ind in moving_points:
             ind.rank = depth + 1
+
+        moving_points = dominated.take(true_dominated)
         depth += 1
     
     # If any points make it all the way through, they form a new layer
@@ -125,6 +183,16 @@ def enlu_inds_rank(start_point, layer_pops):
 
 
 class ENLUInserter:
+    """ Inserts newly evaluated individuals into a steady-state population
+    ranked into nondomination layers, with `enlu_inds_rank()`, and drops the
+    most crowded individual of the last layer when the population is full.
+
+    Only the layers that an insertion changes have their crowding distances
+    recomputed, and only the individuals whose distances change are updated.
+
+    Like the other inserters, a call returns the individual that was dropped,
+    which may be the new one itself, or None if the population wasn't full.
+    """
 
     def __init__(self):
         # This is a 2d work list for ordering layers. Functionally it is the
@@ -137,16 +205,20 @@ class ENLUInserter:
         
         # Calculate crowding distance for updated layers
         for lp in self._layer_pops[start_depth:end_depth]:
-            per_rank_crowding_calc(lp, lp[0].problem.maximize)
+            lp.update_crowding()
         
         # If the population is too big, drop the most crowded
+        dropped = None
         if sum(len(lp) for lp in self._layer_pops) > pop_size:
-            rem_idx = min(range(len(self._layer_pops[-1])), key=lambda i: self._layer_pops[-1][i].distance)
-            self._layer_pops[-1].pop(rem_idx)
+            last = self._layer_pops[-1]
+            rem_idx = int(np.argmin(last.distances))
+            dropped = last[rem_idx]
             
-            if self._layer_pops[-1]:
+            if len(last) > 1:
                 # Since this layer is losing a member, needs recalculation of crowding
-                per_rank_crowding_calc(self._layer_pops[-1], self._layer_pops[-1][0].problem.maximize)
+                last = last.take(np.arange(len(last)) != rem_idx)
+                last.update_crowding()
+                self._layer_pops[-1] = last
             else:
                 del self._layer_pops[-1]
         
@@ -154,6 +226,7 @@ class ENLUInserter:
         flat_pop.clear()
         for lp in self._layer_pops:
             flat_pop.extend(lp)
+        return dropped
 
             
 def steady_state_nsga_2(
@@ -164,6 +237,8 @@ def steady_state_nsga_2(
             count_nonviable=False,
             evaluated_probe=None,
             pop_probe=None,
+            max_in_flight=None,
+            checkpointer=None,
             context=context
         ):
     """ A steady state version of the NSGA-II multi-objective evolutionary algorithm.
@@ -173,7 +248,9 @@ def steady_state_nsga_2(
           Steady-State Evolutionary Multiobjective Optimization," in IEEE Transactions on
           Cybernetics, vol. 47, no. 9, pp. 2838-2849, Sept. 2017, doi: 10.1109/TCYB.2016.2621008.
 
-    :param client: Dask client that should already be set-up
+    :param client: Dask client that should already be set-up, or a
+           `concurrent.futures.Executor` (such as a `ProcessPoolExecutor`), in
+           which case `leap_ec.distrib.executor.steady_state` is used
     :param max_births: how many births are we allowing?
     :param init_pop_size: size of initial population sent directly to workers
            at start
@@ -188,6 +265,10 @@ def steady_state_nsga_2(
            individuals
     :param pop_probe: is an optional function that writes a snapshot of the
            population to a CSV formatted stream ever N births
+    :param max_in_flight: the most evaluations to have outstanding at once;
+           only used with an `Executor`
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` for
+           saving the run every few births and resuming it
     :return: the population containing the final individuals
     """
 
@@ -196,9 +277,17 @@ def steady_state_nsga_2(
     
     # This is just a wrapper around steady state, all of the logic is the same
     # with the exception of a special inserter
+    if isinstance(client, Executor):
+        return executor_backend.steady_state(
+                client, max_births, init_pop_size, pop_size,
+                representation, problem, offspring_pipeline,
+                inserter, count_nonviable, evaluated_probe,
+                pop_probe, max_in_flight, checkpointer, context
+            )
+
     return steady_state(
             client, max_births, init_pop_size, pop_size,
             representation, problem, offspring_pipeline,
             inserter, count_nonviable, evaluated_probe,
-            pop_probe, context
+            pop_probe, checkpointer=checkpointer, context=context
         )
@@ -0,0 +1,248 @@
+"""
+    Quality indicators for the approximations of a Pareto front that a
+    multiobjective run produces.
+
+    The *hypervolume* of a set of fitnesses is the volume of the region of
+    objective space that they dominate, bounded by a reference point that is
+    worse than all of them on every objective; the bigger the better.
+
+    >>> import numpy as np
+    >>> fitnesses = np.array([[1.0, 3.0], [2.0, 2.0], [3.0, 1.0]])
+    >>> hypervolume(fitnesses, reference_point=[4.0, 4.0], maximize=[-1, -1])
+    6.0
+
+    It's computed exactly by a sweep in :math:`O(n \\log n)` time for two
+    objectives, and by the WFG algorithm of While et al. for three to five,
+    which reduces the number of objectives by one at each level of recursion.
+    Beyond five objectives exact computation becomes too expensive, and by
+    default it's estimated by Monte Carlo sampling instead.
+
+    The *inverted generational distance* (IGD) is the mean distance from each
+    point of a reference front (usually a sampling of the true Pareto front)
+    to the nearest of the fitnesses, and *IGD+* is its weakly
+    Pareto-compliant variant of Ishibuchi et al., which only counts the
+    amounts by which the fitnesses are worse than the reference point; the
+    smaller the better.  The ZDT problems provide their true fronts:
+
+    >>> from leap_ec.multiobjective.problems import ZDT1Problem
+    >>> problem = ZDT1Problem()
+    >>> front = problem.pareto_front(num_points=5)
+    >>> round(igd(front, front, problem.maximize), 6)
+    0.0
+    >>> igd_plus(front + 0.1, front, problem.maximize)
+    0.1414...
+
+    Throughout, `maximize` is a vector with 1 for each objective that is to
+    be maximized and -1 for each that is to be minimized, as in a
+    `MultiObjectiveProblem`; `None` maximizes them all.  Rows with NaN
+    (i.e. non-viable) objective values are ignored.
+
+    `leap_ec.multiobjective.probe.IndicatorsCSVProbe` records these
+    indicators for a population each generation.
+
+    - L. While, L. Bradstreet, and L. Barone. 2012. "A Fast Way of
+      Calculating Exact Hypervolumes." IEEE Transactions on Evolutionary
+      Computation 16, no. 1: 86-95.
+    - H. Ishibuchi, H. Masuda, Y. Tanigaki, and Y. Nojima. 2015. "Modified
+      Distance Calculation in Generational Distance and Inverted
+      Generational Distance." In Evolutionary Multi-Criterion Optimization,
+      110-125.
+"""
+import numpy as np
+
+from leap_ec.multiobjective.ranking import _BLOCK_ELEMENTS, _MATRIX_MAX_ROWS, \
+    _covers, nondominated_ranks
+
+
+# Above this many objectives, 'auto' estimates the hypervolume
+_EXACT_MAX_OBJECTIVES = 5
+
+
+##############################
+# Function hypervolume
+##############################
+def hypervolume(fitnesses, reference_point, maximize=None,
+                method: str = 'auto', samples: int = 100_000):
+    """ Compute the hypervolume dominated by the rows of a fitness matrix.
+
+    Rows that aren't strictly better than `reference_point` on every
+    objective add nothing.
+
+    >>> import numpy as np
+    >>> fitnesses = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    >>> hypervolume(fitnesses, reference_point=[-1, -1, -1])
+    4.0
+
+    The Monte Carlo estimate draws `samples` points uniformly from the box
+    between the best values and the reference point (with numpy's global
+    random number generator), and counts how many are dominated:
+
+    >>> estimate = hypervolume(fitnesses, [-1, -1, -1], method='monte_carlo')
+    >>> bool(abs(estimate - 4.0) < 0.1)
+    True
+
+    :param fitnesses: an array-like of shape `(n, m)`
+    :param reference_point: a vector of length `m`, worse than the fitnesses
+        on every objective
+    :param maximize: a vector of 1s and -1s of length `m`; `None` maximizes
+        every objective
+    :param method: `'exact'`, `'monte_carlo'`, or `'auto'`, which is exact
+        for up to five objectives
+    :param samples: how many points the Monte Carlo estimate draws
+    :return: the hypervolume
+    """
+    costs, reference = _as_costs(fitnesses, maximize, reference_point)
+    costs = costs[(costs < reference).all(axis=1)]
+
+    if method == 'auto':
+        method = 'exact' if costs.shape[1] <= _EXACT_MAX_OBJECTIVES \
+            else 'monte_carlo'
+    if method == 'exact':
+        if costs.shape[1] > 2:
+            costs = _nondominated(costs)
+        return float(_exact_hypervolume(costs, reference))
+    if method == 'monte_carlo':
+        return float(_monte_carlo_hypervolume(_nondominated(costs), reference,
+                                              samples))
+    raise ValueError(f"Unknown hypervolume method '{method}'; expected 'auto', 'exact', or 'monte_carlo'.")
+
+
+def _exact_hypervolume(costs, reference):
+    """The WFG algorithm, for minimized `costs` that are all better than
+    `reference`, and (beyond two objectives) distinct and mutually
+    nondominated."""
+    n, m = costs.shape
+    if n == 0:
+        return 0.0
+    if m == 1:
+        return reference[0] - costs[:, 0].min()
+    if m == 2:
+        return _hypervolume_2d(costs, reference)
+    if n == 1:
+        return np.prod(reference - costs[0])
+
+    # Taking the points in order of decreasing last objective, each point's
+    # exclusive hypervolume, over the points after it, is a slab whose
+    # cross-section is an (m - 1)-dimensional exclusive hypervolume
+    costs = costs[np.argsort(-costs[:, -1], kind='stable')]
+    heads, lasts = costs[:, :-1], costs[:, -1]
+    volume = 0.0
+    for k in range(n):
+        limits = np.maximum(heads[k + 1:], heads[k])
+        if m > 3:
+            limits = _nondominated(limits)
+        cross_section = np.prod(reference[:-1] - heads[k]) \
+            - _exact_hypervolume(limits, reference[:-1])
+        volume += (reference[-1] - lasts[k]) * cross_section
+    return volume
+
+
+def _hypervolume_2d(costs, reference):
+    """Sweep along the first objective, keeping the best second objective so
+    far; dominated points add nothing, so they needn't be removed first."""
+    order = np.lexsort((costs[:, 1], costs[:, 0]))
+    x, y = costs[order, 0], np.minimum.accumulate(costs[order, 1])
+    widths = np.diff(np.append(x, reference[0]))
+    return np.sum(widths * (reference[1] - y))
+
+
+def _monte_carlo_hypervolume(costs, reference, samples):
+    if len(costs) == 0:
+        return 0.0
+    lower = costs.min(axis=0)
+    block = max(1, _BLOCK_ELEMENTS // len(costs))
+    hits = 0
+    for start in range(0, samples, block):
+        points = np.random.uniform(lower, reference,
+                                   size=(min(block, samples - start), len(lower)))
+        hits += np.count_nonzero(_covers(costs, points).any(axis=0))
+    return np.prod(reference - lower) * hits / samples
+
+
+##############################
+# Functions igd and igd_plus
+##############################
+def igd(fitnesses, reference_front, maximize=None):
+    """ Compute the inverted generational distance of the rows of a fitness
+    matrix from a reference front: the mean, over the points of the front, of
+    the Euclidean distance to the nearest row.
+
+    >>> import numpy as np
+    >>> igd([[0.0, 1.0], [1.0, 0.0]], [[0.0, 1.0], [0.5, 0.5], [1.0, 0.0]])
+    0.2357...
+
+    :param fitnesses: an array-like of shape `(n, m)`
+    :param reference_front: an array-like of shape `(r, m)`
+    :param maximize: a vector of 1s and -1s of length `m`; `None` maximizes
+        every objective
+    :return: the IGD, or `inf` if there are no viable rows
+    """
+    return _mean_distance_to_nearest(fitnesses, reference_front, maximize,
+                                     plus=False)
+
+
+def igd_plus(fitnesses, reference_front, maximize=None):
+    """ Compute the IGD+ of the rows of a fitness matrix from a reference
+    front.
+
+    This is like `igd()`, but counts only the amounts by which a row is worse
+    than the front's point on each objective, so rows that dominate the
+    front have distance 0:
+
+    >>> import numpy as np
+    >>> igd_plus([[1.0, 1.0]], [[0.0, 1.0], [1.0, 0.0]])
+    0.0
+
+    :param fitnesses: an array-like of shape `(n, m)`
+    :param reference_front: an array-like of shape `(r, m)`
+    :param maximize: a vector of 1s and -1s of length `m`; `None` maximizes
+        every objective
+    :return: the IGD+, or `inf` if there are no viable rows
+    """
+    return _mean_distance_to_nearest(fitnesses, reference_front, maximize,
+                                     plus=True)
+
+
+def _mean_distance_to_nearest(fitnesses, reference_front, maximize, plus):
+    costs, front = _as_costs(fitnesses, maximize, reference_front)
+    costs = costs[~np.isnan(costs).any(axis=1)]
+    if len(costs) == 0:
+        return np.inf
+
+    # Compare a block of the front's points with all the rows at a time
+    front = np.atleast_2d(front)
+    block = max(1, _BLOCK_ELEMENTS // costs.size)
+    nearest = np.empty(len(front))
+    for start in range(0, len(front), block):
+        differences = costs[np.newaxis, :, :] \
+            - front[start:start + block, np.newaxis, :]
+        if plus:
+            np.maximum(differences, 0.0, out=differences)
+        nearest[start:start + block] = \
+            np.sqrt(np.einsum('ijk,ijk->ij', differences, differences).min(axis=1))
+    return float(nearest.mean())
+
+
+##############################
+# Helpers
+##############################
+def _as_costs(fitnesses, maximize, others):
+    """:return: `fitnesses` and `others`, as objective values to be
+    minimized"""
+    fitnesses = np.asarray(fitnesses, dtype=float)
+    if fitnesses.ndim != 2:
+        raise ValueError(f"Expected an (n, m) matrix of fitnesses, but got an array of shape {fitnesses.shape}.")
+    signs = -np.ones(fitnesses.shape[1]) if maximize is None \
+        else -np.asarray(maximize, dtype=float)
+    return fitnesses * signs, np.asarray(others, dtype=float) * signs
+
+
+def _nondominated(costs):
+    """:return: the distinct rows of `costs` that no other row dominates"""
+    if len(costs) <= 1:
+        return costs
+    costs = np.unique(costs, axis=0)
+    if len(costs) <= _MATRIX_MAX_ROWS:
+        # Distinct rows cover only themselves, unless they're dominated
+        return costs[_covers(costs, costs).sum(axis=0) == 1]
+    return costs[nondominated_ranks(costs, -np.ones(costs.shape[1])) == 1]
@@ -25,6 +25,7 @@ def generalized_nsga_2(max_generations: int,
                        stop=lambda x: False,
                        init_evaluate=Individual.evaluate_population,
                        start_generation: int = 0,
+                       checkpointer=None,
                        context=context):
     """ NSGA-II multi-objective evolutionary algorithm.
 
@@ -40,8 +41,9 @@ def generalized_nsga_2(max_generations: int,
     slightly from the canonical algorithm, in that we default to a faster sorting
     algorithm devised by Burlacu (2022).
 
-    If you wish the algorithm to use the original NSGA-II behavior instead (which runs much
-    slower), you can select the original operator by passing in `rank_func=fast_nondominated_sort`.
+    If you wish the algorithm to use the original NSGA-II operator instead, you can select it by
+    passing in `rank_func=fast_nondominated_sort`.  Both give identical ranks, and both now compute
+    them from the population's fitness matrix with `leap_ec.multiobjective.ranking.nondominated_ranks()`.
 
     >>> from leap_ec.representation import Representation
     >>> from leap_ec.ops import random_selection, clone, evaluate, pool
@@ -95,23 +97,38 @@ def generalized_nsga_2(max_generations: int,
     :param start_generation: index of the first generation to count from (defaults to 0).
         You might want to change this, for example, in experiments that involve stopping
         and restarting an algorithm.
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+        saves the population every few generations (and at the end), and
+        that resumes from its last checkpoint if it has one to resume from.
 
     :return: a list of the final population
     """
     # Ensure that we're dealing with a multi-objective Problem.
     assert isinstance(problem, MultiObjectiveProblem)
 
-    # Initialize a population of pop_size individuals of the same type as
-    # individual_cls
-    parents = representation.create_population(pop_size, problem=problem)
+    if checkpointer is not None and checkpointer.can_resume():
+        # Pick up where the checkpointed run left off
+        state = checkpointer.load()
+        parents = state['population']
+        generation_counter = util.inc_generation(start_generation=state['generation'],
+                                                 context=context)
+    else:
+        # Initialize a population of pop_size individuals of the same type as
+        # individual_cls
+        parents = representation.create_population(pop_size, problem=problem)
+
+        # Set up a generation counter that records the current generation to
+        # context
+        generation_counter = util.inc_generation(start_generation=start_generation,
+                                                 context=context)
+
+        # Evaluate initial population
+        parents = init_evaluate(parents)
+
+    def state():
+        return {'population': parents,
+                'generation': generation_counter.generation()}
 
-    # Set up a generation counter that records the current generation to
-    # context
-    generation_counter = util.inc_generation(start_generation=start_generation,
-                                             context=context)
-
-    # Evaluate initial population
-    parents = init_evaluate(parents)
     while (generation_counter.generation() < max_generations) and \
             not stop(parents):
         offspring = pipe(parents,
@@ -130,4 +147,10 @@ def generalized_nsga_2(max_generations: int,
 
         generation_counter()  # Increment to the next generation
 
+        if checkpointer is not None:
+            checkpointer.step(generation_counter.generation(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(generation_counter.generation(), state, force=True)
+
     return parents
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+    Implementation of the reference-point based many-objective NSGA-III.
+
+    NSGA-II's crowding distance stops telling individuals apart once there
+    are more than about three objectives, since nearly the whole population
+    ends up in the first front.  NSGA-III keeps NSGA-II's nondominated sorting,
+    but instead fills the last front that fits with the individuals that are
+    nearest to the least crowded of a set of well-spread reference
+    directions.  Here that survival step is the `reference_point_survival()`
+    operator, which does its normalization, association, and niching on the
+    whole population at once with numpy, and `generalized_nsga_3()` is the
+    algorithm that uses it.
+
+    - K. Deb and H. Jain. 2014. "An Evolutionary Many-Objective Optimization
+      Algorithm Using Reference-Point-Based Nondominated Sorting Approach,
+      Part I: Solving Problems With Box Constraints." IEEE Transactions on
+      Evolutionary Computation 18, no. 4: 577-601.
+    - I. Das and J. E. Dennis. 1998. "Normal-Boundary Intersection: A New
+      Method for Generating the Pareto Surface in Nonlinear Multicriteria
+      Optimization Problems." SIAM Journal on Optimization 8, no. 3: 631-657.
+"""
+from itertools import combinations
+from math import comb
+
+import numpy as np
+from toolz import pipe
+
+from leap_ec import util
+from leap_ec.fitness_stats import population_fitnesses
+from leap_ec.global_vars import context
+from leap_ec.individual import Individual
+from leap_ec.ops import listlist_op
+from leap_ec.population import Population
+from leap_ec.util import wrap_curry
+from leap_ec.multiobjective.ops import rank_ordinal_sort
+from leap_ec.multiobjective.problems import MultiObjectiveProblem
+
+
+##############################
+# Function das_dennis_reference_points
+##############################
+def das_dennis_reference_points(num_objectives: int, divisions: int,
+                                inner_divisions: int = None):
+    """ Generate Das and Dennis's evenly spaced points on the unit simplex.
+
+    Each point's coordinates are multiples of `1/divisions` that sum to 1,
+    and every such point is generated, so there are
+    :math:`\\binom{divisions + m - 1}{m - 1}` of them:
+
+    >>> das_dennis_reference_points(3, 2)
+    array([[0. , 0. , 1. ],
+           [0. , 0.5, 0.5],
+           [0. , 1. , 0. ],
+           [0.5, 0. , 0.5],
+           [0.5, 0.5, 0. ],
+           [1. , 0. , 0. ]])
+
+    With many objectives, few enough divisions to keep the number of points
+    manageable would put them all on the simplex's boundary.  Following Deb
+    and Jain, `inner_divisions` adds a second layer of points, shrunk halfway
+    toward the simplex's center:
+
+    >>> len(das_dennis_reference_points(8, 3, inner_divisions=2))
+    156
+
+    :param num_objectives: the dimension of the points
+    :param divisions: how many parts to divide each objective's range into
+    :param inner_divisions: the divisions of an optional inner layer
+    :return: an array of shape `(k, num_objectives)`
+    """
+    if num_objectives < 1 or divisions < 1:
+        raise ValueError(f"Expected at least one objective and one division, but got {num_objectives} and {divisions}.")
+
+    # Each point is a way to place `num_objectives - 1` bars among
+    # `divisions` stars; the gaps between the bars are its coordinates
+    slots = divisions + num_objectives - 1
+    bars = list(combinations(range(slots), num_objectives - 1))
+    bars = np.array(bars, dtype=int).reshape(len(bars), num_objectives - 1)
+    ends = np.ones((len(bars), 1), dtype=int)
+    bars = np.hstack([-ends, bars, slots * ends])
+    points = (np.diff(bars, axis=1) - 1) / divisions
+
+    if inner_divisions is not None:
+        inner = das_dennis_reference_points(num_objectives, inner_divisions)
+        points = np.vstack([points, inner / 2 + 0.5 / num_objectives])
+    return points
+
+
+def _default_reference_points(num_objectives, pop_size):
+    """The Das-Dennis points with the most divisions that give no more
+    points than the population size."""
+    divisions = 1
+    while comb(divisions + num_objectives, num_objectives - 1) <= pop_size:
+        divisions += 1
+    return das_dennis_reference_points(num_objectives, divisions)
+
+
+##############################
+# Function normalize_objectives
+##############################
+def normalize_objectives(costs, ranks=None):
+    """ Normalize a matrix of minimized objective values as NSGA-III does.
+
+    Each objective is translated so that its best value is 0.  Then the
+    *extreme point* for each objective, the row that minimizes the
+    achievement scalarizing function with that objective's axis as its
+    weight vector, is found, and the objectives are divided by the intercepts
+    of the hyperplane through those points.  Where the hyperplane is
+    degenerate, the worst values of the first front (or, where those are
+    zero, of all the rows) are used instead.
+
+    >>> import numpy as np
+    >>> normalize_objectives(np.array([[1.0, 5.0], [2.0, 3.0], [3.0, 1.0]]))
+    array([[0. , 1. ],
+           [0.5, 0.5],
+           [1. , 0. ]])
+
+    :param costs: an array of shape `(n, m)`, of finite values to minimize
+    :param ranks: the rows' nondominated ranks, which are used for the
+        fallback; `None` treats them all as one front
+    :return: the normalized array
+    """
+    costs = np.asarray(costs, dtype=float)
+    translated = costs - costs.min(axis=0)
+    m = costs.shape[1]
+
+    # The achievement scalarizing function of every row for every axis
+    weights = np.full((m, m), 1e-6)
+    np.fill_diagonal(weights, 1.0)
+    asf = (translated[:, np.newaxis, :] / weights[np.newaxis, :, :]).max(axis=2)
+    extremes = translated[np.argmin(asf, axis=0)]
+
+    try:
+        intercepts = 1.0 / np.linalg.solve(extremes, np.ones(m))
+    except np.linalg.LinAlgError:
+        intercepts = np.full(m, np.nan)
+    if not np.all(np.isfinite(intercepts) & (intercepts > 1e-6)):
+        first = translated if ranks is None \
+            else translated[np.asarray(ranks) == np.min(ranks)]
+        intercepts = first.max(axis=0)
+        worst = translated.max(axis=0)
+        intercepts = np.where(intercepts > 1e-6, intercepts, worst)
+        intercepts[intercepts <= 1e-6] = 1.0
+    return translated / intercepts
+
+
+##############################
+# Function associate
+##############################
+def associate(normalized, reference_points):
+    """ Associate each row of a normalized objective matrix with its nearest
+    reference direction.
+
+    The distance from a row to a reference direction is its perpendicular
+    distance to the line from the origin through the reference point.
+
+    >>> import numpy as np
+    >>> niches, distances = associate(np.array([[1.0, 0.1], [0.5, 0.5]]),
+    ...                               np.array([[1.0, 0.0], [0.5, 0.5]]))
+    >>> niches, distances.round(6)
+    (array([0, 1]), array([0.1, 0. ]))
+
+    :param normalized: an array of shape `(n, m)`, as from
+        `normalize_objectives()`
+    :param reference_points: an array of shape `(k, m)`
+    :return: a pair of arrays of shape `(n,)`: the index of each row's
+        nearest reference direction, and its distance from it
+    """
+    directions = np.asarray(reference_points, dtype=float)
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
+    # |f|^2 = (f . w)^2 + d^2 for each unit direction w, which finds the
+    # nearest directions with one matrix product; the distances to them are
+    # then computed directly, which is more precise
+    projections = normalized @ directions.T
+    squared = np.sum(normalized ** 2, axis=1, keepdims=True) - projections ** 2
+    niches = np.argmin(squared, axis=1)
+    nearest = directions[niches]
+    residuals = normalized - np.sum(normalized * nearest, axis=1,
+                                    keepdims=True) * nearest
+    return niches, np.linalg.norm(residuals, axis=1)
+
+
+##############################
+# reference_point_survival operator
+##############################
+@wrap_curry
+@listlist_op
+def reference_point_survival(population: list, size: int,
+                             reference_points) -> list:
+    """ Select `size` individuals by NSGA-III's nondominated sorting and
+    reference-point niching.
+
+    The individuals must have had their ranks assigned, e.g. by
+    `rank_ordinal_sort()`.  Whole fronts are taken in order of rank for as
+    long as they fit.  The rest are taken from the next front, by repeatedly
+    picking the reference direction with the fewest individuals associated
+    with it so far (breaking ties at random) and adding its nearest member of
+    that front, if it has none yet, or else a random one.
+
+    Rather than looping over the picks, this gives each candidate the niche
+    count it would be picked at, i.e. its direction's count plus its place in
+    the direction's order of picking, and takes the candidates with the
+    lowest, with random tie-breaking, which chooses the same way.
+
+    :param population: the ranked individuals to select from
+    :param size: how many to select
+    :param reference_points: an array of shape `(k, m)` of reference points,
+        e.g. from `das_dennis_reference_points()`
+    :return: the selected individuals, in their order in `population`
+    """
+    # Ensure that we're dealing with a multi-objective Problem.
+    assert isinstance(population[0].problem, MultiObjectiveProblem)
+
+    if isinstance(population, Population) and population.ranks is not None:
+        ranks = np.asarray(population.ranks)
+    else:
+        ranks = np.array([ind.rank for ind in population])
+    if size >= len(population):
+        return list(population)
+
+    # Take the fronts that fit whole, and find the last front
+    order = np.argsort(ranks, kind='stable')
+    last_rank = ranks[order[size - 1]]
+    accepted = ranks < last_rank
+    candidates = np.flatnonzero(ranks == last_rank)
+    remaining = size - np.count_nonzero(accepted)
+    if remaining == len(candidates):
+        return [population[i] for i in np.flatnonzero(ranks <= last_rank).tolist()]
+
+    # Normalize and associate the viable members of the fronts considered
+    maximize = np.asarray(population[0].problem.maximize)
+    costs = -np.asarray(population_fitnesses(population), dtype=float) * maximize
+    considered = np.flatnonzero((ranks <= last_rank)
+                                & np.isfinite(costs).all(axis=1))
+    niches = np.full(len(population), -1)
+    distances = np.full(len(population), np.inf)
+    if len(considered) > 0:
+        normalized = normalize_objectives(costs[considered], ranks[considered])
+        niches[considered], distances[considered] = \
+            associate(normalized, reference_points)
+
+    chosen = _niche_select(candidates, remaining, niches, distances,
+                           accepted, len(reference_points))
+    accepted[chosen] = True
+    return [population[i] for i in np.flatnonzero(accepted).tolist()]
+
+
+def _niche_select(candidates, remaining, niches, distances, accepted,
+                  num_references):
+    """Choose `remaining` of the `candidates` by niching, all at once."""
+    counts = np.bincount(niches[accepted & (niches >= 0)],
+                         minlength=num_references)
+    cand_niches = niches[candidates]
+    viable = cand_niches >= 0
+
+    # Within each direction, pick the nearest candidate first if the
+    # direction is empty, and the others in random order
+    keys = np.random.random(len(candidates))
+    by_distance = np.lexsort((distances[candidates], cand_niches))
+    firsts = by_distance[np.r_[True, np.diff(cand_niches[by_distance]) != 0]]
+    firsts = firsts[viable[firsts] & (counts[cand_niches[firsts].clip(0)] == 0)]
+    keys[firsts] = -1.0
+
+    within = np.lexsort((keys, cand_niches))
+    starts = np.r_[True, np.diff(cand_niches[within]) != 0]
+    places = np.empty(len(candidates), dtype=int)
+    positions = np.arange(len(candidates))
+    places[within] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+    picked_at = np.where(viable, counts[cand_niches.clip(0)] + places, np.inf)
+    # Ties in niche count go to a random direction, which the same random
+    # number for all the candidates of a direction gives
+    direction_keys = np.random.random(num_references)[cand_niches.clip(0)]
+    selected = np.lexsort((direction_keys, picked_at))[:remaining]
+    return candidates[selected]
+
+
+##############################
+# Function generalized_nsga_3
+##############################
+def generalized_nsga_3(max_generations: int,
+                       pop_size: int,
+                       problem: MultiObjectiveProblem,
+                       representation,
+                       pipeline,
+                       reference_points=None,
+                       rank_func=rank_ordinal_sort,
+                       stop=lambda x: False,
+                       init_evaluate=Individual.evaluate_population,
+                       start_generation: int = 0,
+                       checkpointer=None,
+                       context=context):
+    """ NSGA-III many-objective evolutionary algorithm.
+
+        - K. Deb and H. Jain. 2014. "An Evolutionary Many-Objective
+          Optimization Algorithm Using Reference-Point-Based Nondominated
+          Sorting Approach, Part I: Solving Problems With Box Constraints."
+          IEEE Transactions on Evolutionary Computation 18, no. 4: 577-601.
+
+    This is `generalized_nsga_2()` with NSGA-III's survival step in place of
+    crowding distance: after `rank_func` ranks the offspring and parents
+    together, `reference_point_survival()` keeps `pop_size` of them.  Deb and
+    Jain recommend a population size close to the number of reference
+    points, and mating selection at random.
+
+    >>> from leap_ec.representation import Representation
+    >>> from leap_ec.ops import random_selection, clone, evaluate, pool
+    >>> from leap_ec.real_rep.initializers import create_real_vector
+    >>> from leap_ec.real_rep.ops import mutate_gaussian
+    >>> from leap_ec.multiobjective.problems import SCHProblem
+    >>> pop_size = 10
+    >>> final_pop = generalized_nsga_3(
+    ...     max_generations=5, pop_size=pop_size,
+    ...     problem=SCHProblem(),
+    ...     representation=Representation(
+    ...         initialize=create_real_vector(bounds=[(-10, 10)])
+    ...     ),
+    ...     pipeline=[
+    ...         random_selection,
+    ...         clone,
+    ...         mutate_gaussian(std=0.5, expected_num_mutations=1),
+    ...         evaluate,
+    ...         pool(size=pop_size),
+    ...     ]
+    ... )
+    >>> len(final_pop)
+    10
+
+    :param int max_generations: The max number of generations to run the algorithm for.
+        Can pass in float('Inf') to run forever or until the `stop` condition is reached.
+    :param int pop_size: Size of the initial population
+    :param `Problem` problem: the Problem that should be used to evaluate
+        individuals' fitness
+    :param representation: How the problem is represented in individuals
+    :param list pipeline: a list of operators that are applied (in order) to
+        create the offspring population at each generation
+    :param reference_points: an array of shape `(k, m)` of reference points;
+        defaults to the Das-Dennis points with the most divisions that give
+        at most `pop_size` points
+    :param rank_func: the function used to calculate non-domination rankings for the
+        individuals of the population.
+    :param stop: A function that accepts a population and
+        returns True iff it's time to stop evolving.
+    :param init_evaluate: a function used to evaluate the initial population,
+        before the main pipeline is run.
+    :param start_generation: index of the first generation to count from (defaults to 0).
+    :param checkpointer: an optional `leap_ec.checkpoint.Checkpointer` that
+        saves the population every few generations (and at the end), and
+        that resumes from its last checkpoint if it has one to resume from.
+
+    :return: a list of the final population
+    """
+    # Ensure that we're dealing with a multi-objective Problem.
+    assert isinstance(problem, MultiObjectiveProblem)
+
+    if reference_points is None:
+        reference_points = _default_reference_points(len(problem.maximize),
+                                                      pop_size)
+
+    if checkpointer is not None and checkpointer.can_resume():
+        # Pick up where the checkpointed run left off
+        state = checkpointer.load()
+        parents = state['population']
+        generation_counter = util.inc_generation(start_generation=state['generation'],
+                                                 context=context)
+    else:
+        parents = representation.create_population(pop_size, problem=problem)
+        generation_counter = util.inc_generation(start_generation=start_generation,
+                                                 context=context)
+        parents = init_evaluate(parents)
+
+    def state():
+        return {'population': parents,
+                'generation': generation_counter.generation()}
+
+    while (generation_counter.generation() < max_generations) and \
+            not stop(parents):
+        offspring = pipe(parents,
+                         *pipeline,
+                         rank_func(parents=parents),
+                         reference_point_survival(size=len(parents),
+                                                  reference_points=reference_points))
+
+        parents = offspring
+
+        generation_counter()
+
+        if checkpointer is not None:
+            checkpointer.step(generation_counter.generation(), state)
+
+    if checkpointer is not None:
+        checkpointer.step(generation_counter.generation(), state, force=True)
+
+    return parents
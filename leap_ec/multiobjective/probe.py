@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """ Visualization pipeline operators tailored for multiple objectives
 """
+import sys
+
 import numpy as np
 from matplotlib import pyplot as plt
 
+from leap_ec import ops as op
+from leap_ec.fitness_stats import population_fitnesses
+from leap_ec.multiobjective.indicators import hypervolume, igd, igd_plus
+from leap_ec.multiobjective.ranking import nondominated_ranks
 from leap_ec.util import get_step
 from leap_ec.probe import PopulationMetricsPlotProbe
 from leap_ec.global_vars import context
@@ -62,6 +68,110 @@ class ParetoPlotProbe2D(PopulationMetricsPlotProbe):
         self.y = np.array([])
 
 
+##############################
+# Class IndicatorsCSVProbe
+##############################
+class IndicatorsCSVProbe(op.Operator):
+    """
+    A probe that records quality indicators of a population's first front
+    (its nondominated, viable members) to a text stream in CSV format, or to
+    a columnar sink.
+
+    Given a `reference_point`, it records the front's hypervolume, and given
+    a `reference_front`, its IGD and IGD+, along with the size of the front:
+
+    >>> import io
+    >>> from leap_ec.individual import Individual
+    >>> from leap_ec.multiobjective.problems import ZDT1Problem
+    >>> from leap_ec.global_vars import context
+    >>> context['leap']['generation'] = 10
+    >>> problem = ZDT1Problem(n=2)
+    >>> pop = [Individual(np.array([x, 0.0]), problem=problem)
+    ...        for x in [0.0, 0.5, 1.0]]
+    >>> pop = Individual.evaluate_population(pop)
+    >>> stream = io.StringIO()
+    >>> probe = IndicatorsCSVProbe(stream, reference_point=[1.1, 1.1],
+    ...                            reference_front=problem.pareto_front(3))
+    >>> probe(pop) is pop
+    True
+    >>> print(stream.getvalue())
+    step, front_size, hypervolume, igd, igd_plus
+    10, 3, 0.5635..., 0.0, 0.0
+    <BLANKLINE>
+
+    :param stream: the file object to write to (defaults to sys.stdout)
+    :param reference_point: the reference point for `hypervolume()`, or
+        `None` to leave that column out
+    :param reference_front: an array of points on the true Pareto front, such
+        as from a ZDT problem's `pareto_front()`, for `igd()` and
+        `igd_plus()`, or `None` to leave those columns out
+    :param hypervolume_method: passed on to `hypervolume()` as its `method`
+    :param header: whether to print column names in the first line
+    :param job: optional constant job ID, which will be printed as the
+        first column
+    :param notes: a dict of optional constant-value columns to include in all
+        rows
+    :param modulo: only record every `modulo` steps
+    :param sink: an optional `leap_ec.sink.ColumnarSink` to write rows of raw
+        values to instead of writing CSV text to `stream`
+    :param context: a LEAP context object, used to retrieve the current
+        generation (i.e. `context['leap']['generation']`)
+    """
+    def __init__(self, stream=sys.stdout, reference_point=None,
+                 reference_front=None, hypervolume_method: str = 'auto',
+                 header=True, job: str = None, notes=None, modulo: int = 1,
+                 sink=None, context=context):
+        assert (sink is not None or hasattr(stream, 'write'))
+        if reference_point is None and reference_front is None:
+            raise ValueError("At least one of 'reference_point' and 'reference_front' must be given.")
+        self.stream = stream
+        self.sink = sink
+        self.reference_point = reference_point
+        self.reference_front = reference_front
+        self.hypervolume_method = hypervolume_method
+        self.job = job
+        self.notes = notes if notes else {}
+        self.modulo = modulo
+        self.context = context
+
+        if header and sink is None:
+            columns = (['job'] if job is not None else []) \
+                + list(self.notes.keys()) + ['step', 'front_size']
+            if reference_point is not None:
+                columns.append('hypervolume')
+            if reference_front is not None:
+                columns.extend(['igd', 'igd_plus'])
+            stream.write(', '.join(columns) + '\n')
+
+    def __call__(self, population):
+        assert (population is not None)
+        step = self.context['leap']['generation']
+        if step % self.modulo != 0:
+            return population
+
+        maximize = population[0].problem.maximize
+        fitnesses = np.asarray(population_fitnesses(population), dtype=float)
+        viable = ~np.isnan(fitnesses).any(axis=1)
+        front = fitnesses[viable & (nondominated_ranks(fitnesses, maximize) == 1)]
+
+        row = {}
+        if self.job is not None:
+            row['job'] = self.job
+        row.update(self.notes)
+        row['step'] = step
+        row['front_size'] = len(front)
+        if self.reference_point is not None:
+            row['hypervolume'] = hypervolume(front, self.reference_point,
+                                             maximize, self.hypervolume_method)
+        if self.reference_front is not None:
+            row['igd'] = igd(front, self.reference_front, maximize)
+            row['igd_plus'] = igd_plus(front, self.reference_front, maximize)
+
+        if self.sink is not None:
+            self.sink.write_row(row)
+        else:
+            self.stream.write(', '.join(str(v) for v in row.values()) + '\n')
+        return population
 
 
 if __name__ == '__main__':
@@ -189,6 +189,15 @@ class ZDTBenchmarkProblem(MultiObjectiveProblem):
         """
         pass
 
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: an array of shape `(num_points, 2)` of points spread along
+            the problem's Pareto-optimal front, e.g. as the reference front for
+            `leap_ec.multiobjective.indicators.igd()`
+        """
+        raise NotImplementedError
+
 ##############################
 # Class ZDT1Problem
 ##############################
@@ -245,7 +254,14 @@ class ZDT1Problem(ZDTBenchmarkProblem):
 
         return fitness
 
-
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: points on the front :math:`f_2 = 1 - \\sqrt{f_1}`, for
+            :math:`f_1 \\in [0, 1]`
+        """
+        f1 = np.linspace(0, 1, num_points)
+        return np.column_stack([f1, 1 - np.sqrt(f1)])
 
 ##############################
 # Class ZDT2Problem
@@ -303,6 +319,14 @@ class ZDT2Problem(ZDTBenchmarkProblem):
 
         return fitness
 
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: points on the front :math:`f_2 = 1 - f_1^2`, for
+            :math:`f_1 \\in [0, 1]`
+        """
+        f1 = np.linspace(0, 1, num_points)
+        return np.column_stack([f1, 1 - f1 ** 2])
 
 ##############################
 # Class ZDT3Problem
@@ -362,6 +386,20 @@ class ZDT3Problem(ZDTBenchmarkProblem):
 
         return fitness
 
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: points spread over the five disconnected pieces of the
+            curve :math:`f_2 = 1 - \\sqrt{f_1} - f_1\\sin(10\\pi f_1)` that no
+            other point of it dominates
+        """
+        f1 = np.linspace(0, 1, max(10_000, 100 * num_points))
+        f2 = 1 - np.sqrt(f1) - f1 * np.sin(10 * np.pi * f1)
+        # Sweeping along f1, a point is on the front if its f2 is below all
+        # the ones before it
+        best_before = np.minimum.accumulate(np.concatenate(([np.inf], f2[:-1])))
+        front = np.column_stack([f1, f2])[f2 < best_before]
+        return front[np.linspace(0, len(front) - 1, num_points).round().astype(int)]
 
 ##############################
 # Class ZDT4Problem
@@ -421,6 +459,14 @@ class ZDT4Problem(ZDTBenchmarkProblem):
 
         return fitness
 
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: points on the front :math:`f_2 = 1 - \\sqrt{f_1}`, for
+            :math:`f_1 \\in [0, 1]`, which is the same as ZDT1's
+        """
+        f1 = np.linspace(0, 1, num_points)
+        return np.column_stack([f1, 1 - np.sqrt(f1)])
 
 ##############################
 # Class ZDT5Problem
@@ -517,6 +563,14 @@ class ZDT5Problem(ZDTBenchmarkProblem):
 
         return fitness
 
+    def pareto_front(self, num_points: int = None):
+        """
+        :param num_points: ignored, since this front is discrete
+        :returns: the 31 points of the front, :math:`f_1 = 1, \\ldots, 31` and
+            :math:`f_2 = (n - 1)/f_1`
+        """
+        f1 = np.arange(1, 32, dtype=float)
+        return np.column_stack([f1, (self.n - 1) / f1])
 
 ##############################
 # Class ZDT6Problem
@@ -572,4 +626,58 @@ class ZDT6Problem(ZDTBenchmarkProblem):
             
         fitness[1] = g_x * h
 
-        return fitness
\ No newline at end of file
+        return fitness
+
+    def pareto_front(self, num_points: int = 100):
+        """
+        :param num_points: how many points of the front to return
+        :returns: points on the front :math:`f_2 = 1 - f_1^2`, for :math:`f_1`
+            between its smallest attainable value (about 0.2808) and 1
+        """
+        x1 = np.linspace(0, 1, 100_001)
+        f1_min = (1 - np.exp(-4 * x1) * np.sin(6 * np.pi * x1) ** 6).min()
+        f1 = np.linspace(f1_min, 1, num_points)
+        return np.column_stack([f1, 1 - f1 ** 2])
+
+##############################
+# Class ExternalMultiObjectiveProblem
+##############################
+class ExternalMultiObjectiveProblem(MultiObjectiveProblem):
+    """ Use an external simulator that returns a vector of objectives as a
+    multi-objective problem.
+
+    This wraps an `ExternalProcessProblem` or a
+    `PersistentExternalProcessProblem` that uses `protocol='binary'`, whose
+    simulator writes a frame of all the objectives for each phenome, and
+    compares the resulting fitnesses by Pareto dominance.  (The `maximize` of
+    the wrapped problem is ignored.)
+
+    :param external_problem: evaluates phenomes with the simulator
+    :param maximize: a list of booleans where True indicates a given
+        objective is to be maximized, else minimized
+    """
+    def __init__(self, external_problem, maximize: Sequence[bool]):
+        super().__init__(maximize=maximize)
+        assert(external_problem is not None)
+        self.external_problem = external_problem
+
+    def evaluate(self, phenome):
+        """
+        :param phenome: to be sent to the simulator
+        :returns: the simulator's vector of fitnesses
+        """
+        return self.evaluate_multiple([ phenome ])[0]
+
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """Send all the phenomes to the simulator in one group.  Phenomes
+        that a `PersistentExternalProcessProblem` couldn't evaluate get a
+        vector of NaNs."""
+        num_objectives = len(self.maximize)
+        fitnesses = []
+        for f in self.external_problem.evaluate_vectors(phenomes):
+            if not isinstance(f, np.ndarray):
+                f = np.full(num_objectives, f, dtype=float)
+            if f.shape != (num_objectives,):
+                raise ValueError(f"Expected {num_objectives} objectives from the external simulation, but received {f.size}.")
+            fitnesses.append(f)
+        return fitnesses
@@ -25,7 +25,10 @@ import toolz
 from leap_ec.util import wrap_curry
 
 from leap_ec import leap_logger_name
+from leap_ec.decoder import IdentityDecoder
 from leap_ec.global_vars import context
+from leap_ec.population import Population, fitness_array, genome_matrix, set_genomes
+from leap_ec.problem import ScalarProblem
 
 
 # Set up a logger using LEAP's global logger name
@@ -274,23 +277,51 @@ def grouped_evaluate(population: list, max_individuals_per_chunk: int = None) ->
     a fitness function so they can be evaluated simultaneously.
 
     This is useful, for example, as a way to evaluate individuals in parallel
-    on a GPU."""
+    on a GPU, or with a problem whose `evaluate_multiple()` is vectorized.  By
+    default the whole population is sent to the problem in a single call.
+
+    If the population is a :py:class:`leap_ec.population.Population` whose
+    individuals use an `IdentityDecoder`, its genome matrix is passed to the
+    problem directly (sliced into chunks), rather than being rebuilt one
+    phenome at a time.
+
+    >>> import numpy as np
+    >>> from leap_ec.population import Population
+    >>> from leap_ec.real_rep.problems import SpheroidProblem
+    >>> pop = Population(np.array([[0.5, 0.8], [1.0, 2.0]]),
+    ...                  problem=SpheroidProblem())
+    >>> pop = grouped_evaluate(pop)
+    >>> pop.fitnesses
+    array([0.89, 5.  ])
+
+    :param population: the individuals to evaluate
+    :param max_individuals_per_chunk: the largest number of individuals to
+        pass to `problem.evaluate_multiple()` at once; defaults to the
+        whole population
+    :return: the evaluated population
+    """
     if max_individuals_per_chunk is None:
         max_individuals_per_chunk = len(population)
 
-    def chunks(lst, n):
-        """Yield successive n-sized chunks from lst."""
-        for i in range(0, len(lst), n):
-            yield lst[i:i + n]
-
     problem = population[0].problem
     assert(all([ind.problem == problem for ind in population])), f"Two or more individuals in the population have different problem references; cannot perform grouped evaluation!"
 
+    if isinstance(population, Population) and \
+            all([isinstance(ind.decoder, IdentityDecoder) for ind in population]):
+        # The genomes are the phenomes, and they're already in one matrix
+        phenomes = population.genomes
+    else:
+        # Decode afresh, as Individual.evaluate() does, since a clone carries
+        # its parent's cached phenome
+        phenomes = [ind.decode() for ind in population]
+
     fitnesses = []
-    for chunk in chunks(population, max_individuals_per_chunk):
+    for start in range(0, len(population), max_individuals_per_chunk):
+        stop = start + max_individuals_per_chunk
         # XXX Always passing individuals along to the problem.
         #     Does this create problems with dask, even when we aren't using individuals?
-        fit = problem.evaluate_multiple([c.phenome for c in chunk], individuals=chunk)
+        fit = problem.evaluate_multiple(phenomes[start:stop],
+                                        individuals=population[start:stop])
         fitnesses.extend(fit)
 
     for fit, ind in zip(fitnesses, population):
@@ -612,6 +643,142 @@ class NAryCrossover(Crossover):
         return parent_a, parent_b
 
 
+##############################
+# Function batch_uniform_crossover
+##############################
+@wrap_curry
+@listlist_op
+def batch_uniform_crossover(population: List, p_swap: float = 0.2,
+                            p_xover: float = 1.0) -> List:
+    """Parameterized uniform crossover applied to a whole batch of offspring
+    at once.
+
+    This is a vectorized counterpart of :py:class:`UniformCrossover`.
+    Consecutive individuals are paired up (0 with 1, 2 with 3, and so on;
+    with an odd number of individuals, the last one is left alone), and a
+    single Bernoulli mask over all the pairs' genes decides which genes are
+    swapped.  The distribution of offspring is the same as with
+    `UniformCrossover`, but the random numbers are drawn for the whole batch
+    with a handful of numpy calls instead of several per pair.
+
+    All the genomes must be numpy arrays of the same length.  Like the
+    per-individual operators, this modifies the individuals it is given, so
+    it should be fed clones:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([0, 0, 0, 0])),
+    ...        Individual(np.array([1, 1, 1, 1]))]
+    >>> pop = batch_uniform_crossover(pop, p_swap=1.0)
+    >>> pop[0].genome, pop[1].genome
+    (array([1, 1, 1, 1]), array([0, 0, 0, 0]))
+
+    When given a :py:class:`leap_ec.population.Population`, its genome matrix
+    is recombined in place.
+
+    :param population: the offspring to recombine, in pairs
+    :param p_swap: how likely are we to swap each pair of genes when crossover
+        is performed
+    :param float p_xover: the probability that crossover is performed on each
+        pair in the first place
+    :return: the recombined population
+    """
+    genomes = genome_matrix(population)
+    num_pairs = len(genomes) // 2
+    first, second = genomes[0:2*num_pairs:2], genomes[1:2*num_pairs:2]
+
+    do_xover = np.random.uniform(size=num_pairs) <= p_xover
+    swap = random_bernoulli_vector(first.shape, p_swap) & do_xover[:, np.newaxis]
+
+    tmp = first[swap]
+    first[swap] = second[swap]
+    second[swap] = tmp
+
+    _write_crossed_pairs(population, genomes, np.flatnonzero(do_xover))
+    return population
+
+
+##############################
+# Function batch_n_ary_crossover
+##############################
+@wrap_curry
+@listlist_op
+def batch_n_ary_crossover(population: List, num_points: int = 2,
+                          p_xover: float = 1.0) -> List:
+    """N-point crossover applied to a whole batch of offspring at once.
+
+    This is a vectorized counterpart of :py:class:`NAryCrossover`.
+    Consecutive individuals are paired up (0 with 1, 2 with 3, and so on;
+    with an odd number of individuals, the last one is left alone), and the
+    crossover points of every pair are drawn together as one matrix.  As in
+    `NAryCrossover`, each pair gets `num_points` distinct points chosen
+    uniformly from the loci, and the genes between every other pair of points
+    are exchanged.
+
+    All the genomes must be numpy arrays of the same length.  Like the
+    per-individual operators, this modifies the individuals it is given, so
+    it should be fed clones:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([0, 0, 0, 0])),
+    ...        Individual(np.array([1, 1, 1, 1]))]
+    >>> pop = batch_n_ary_crossover(pop, num_points=1)
+    >>> pop[0].genome + pop[1].genome
+    array([1, 1, 1, 1])
+
+    When given a :py:class:`leap_ec.population.Population`, its genome matrix
+    is recombined in place.
+
+    :param population: the offspring to recombine, in pairs
+    :param num_points: how many crossing points do we use?
+    :param float p_xover: the probability that crossover is performed on each
+        pair in the first place
+    :return: the recombined population
+    """
+    genomes = genome_matrix(population)
+    num_pairs, genome_length = len(genomes) // 2, genomes.shape[1]
+    if genome_length < num_points:
+        raise RuntimeError(
+            'Invalid number of crossover points for n_ary_crossover')
+    first, second = genomes[0:2*num_pairs:2], genomes[1:2*num_pairs:2]
+
+    do_xover = np.random.uniform(size=num_pairs) <= p_xover
+
+    # The positions of the num_points smallest of a row of uniform draws are
+    # a uniformly random subset of the loci, i.e. points chosen without
+    # replacement
+    draws = np.random.rand(num_pairs, genome_length)
+    if num_points < genome_length:
+        xpts = np.argpartition(draws, num_points, axis=1)[:, :num_points]
+    else:
+        xpts = np.argsort(draws, axis=1)
+    # A gene is swapped if an odd number of crossover points lie at or before
+    # it, i.e. it is in every other section
+    toggles = np.zeros((num_pairs, genome_length), dtype=np.int8)
+    np.put_along_axis(toggles, xpts, 1, axis=1)
+    swap = (np.cumsum(toggles, axis=1) % 2 == 1) & do_xover[:, np.newaxis]
+
+    tmp = first[swap]
+    first[swap] = second[swap]
+    second[swap] = tmp
+
+    _write_crossed_pairs(population, genomes, np.flatnonzero(do_xover))
+    return population
+
+
+def _write_crossed_pairs(population, genomes, pairs):
+    """Helper for the batch crossover operators: write the recombined
+    genomes back, merge the lineage of each crossed pair, and invalidate their
+    fitness."""
+    rows = np.stack([2 * pairs, 2 * pairs + 1], axis=1).ravel()
+    set_genomes(population, genomes, rows)
+    for pair in pairs:
+        first, second = population[2 * pair], population[2 * pair + 1]
+        first.parents |= second.parents
+        second.parents |= first.parents
+
+
 ##############################
 # Function proportional_selection
 ##############################
@@ -772,6 +939,88 @@ def sus_selection(population: List, n=None, shuffle: bool = True,
         yield population[population_idx-1]
 
 
+##############################
+# Function selection_keys
+##############################
+def selection_keys(population, key=None):
+    """Compute a sort key for every individual in a population, for use by
+    vectorized selection operators.
+
+    Without a `key`, individuals that share a `ScalarProblem` instance are
+    keyed by `ScalarProblem.ordering_key()` (their fitness signed so that
+    larger is better, with NaN as the worst), unless the problem over-rides
+    `worse_than()` without over-riding `ordering_key()` too:
+
+    >>> from leap_ec.individual import Individual
+    >>> from leap_ec.real_rep.problems import SpheroidProblem
+    >>> import numpy as np
+    >>> problem = SpheroidProblem()
+    >>> pop = [Individual(np.array([0.0, 1.0]), problem=problem),
+    ...        Individual(np.array([2.0, 2.0]), problem=problem)]
+    >>> pop = Individual.evaluate_population(pop)
+    >>> selection_keys(pop)
+    array([-1., -8.])
+
+    A `key` function may return numbers, or tuples of numbers, which are
+    replaced by their lexicographic (dense) ranks:
+
+    >>> selection_keys(pop, key=lambda x: (x.genome[0], -x.genome[1]))
+    array([0., 1.])
+
+    :param population: a list of individuals
+    :param key: an optional function that computes keys to sort over
+    :return: a float array with one key per individual such that larger is
+        better, or `None` if the individuals can only be ordered by comparing
+        them (or their keys) directly, e.g. for multiobjective problems
+    """
+    if key is not None:
+        keys = [key(ind) for ind in population]
+        try:
+            if keys and isinstance(keys[0], tuple):
+                return _lexicographic_ranks(np.array(keys, dtype=float))
+            keys = np.array(keys, dtype=float)
+        except (TypeError, ValueError):  # Keys that aren't numbers
+            return None
+        if keys.ndim != 1:
+            return None
+        # NaN keys are always the worst
+        return np.where(np.isnan(keys), -np.inf, keys)
+
+    problem = population[0].problem
+    if not isinstance(problem, ScalarProblem) or \
+            any(ind.problem is not problem for ind in population):
+        return None
+    fitnesses = fitness_array(population)
+    if fitnesses.ndim != 1:
+        return None
+    return problem.ordering_key(fitnesses)
+
+
+def _best_k(population, k, key=None):
+    """:return: the `k` best individuals of `population`, best first, using
+    `selection_keys()` if possible and `toolz.topk()` otherwise; ties are
+    broken in favor of individuals that come earlier in `population`"""
+    keys = selection_keys(population, key)
+    if keys is None:
+        if key:
+            return list(toolz.itertoolz.topk(k, population, key=key))
+        return list(toolz.itertoolz.topk(k, population))
+    order = np.argsort(-keys, kind='stable')[:k]
+    return [population[i] for i in order.tolist()]
+
+
+def _lexicographic_ranks(keys):
+    """:return: the dense rank (0 for the smallest) of each row of the 2-D
+    array `keys`, ordering rows lexicographically; equal rows get equal
+    ranks"""
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    distinct = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    ranks = np.empty(len(keys))
+    ranks[order] = np.concatenate([[0], np.cumsum(distinct)])
+    return ranks
+
+
 ##############################
 # Function truncation_selection
 ##############################
@@ -801,6 +1050,12 @@ def truncation_selection(offspring: List, size: int,
 
         >>> truncated = truncation_selection(pop, 2)
 
+        When the individuals share a `ScalarProblem` (or `key` returns
+        numbers), the whole population is ranked at once by
+        `selection_keys()` with a stable `np.argsort()`, so ties go to the
+        individual that comes first (offspring before parents).  Otherwise
+        individuals are compared directly.
+
         TODO Do we want an optional context to over-ride the 'parents' parameter?
 
         :param offspring: offspring to truncate down to a smaller population
@@ -809,18 +1064,9 @@ def truncation_selection(offspring: List, size: int,
                                   with population for downsizing
         :return: truncated population
     """
-    if key:
-        if parents is not None:
-            return list(toolz.itertoolz.topk(
-                size, itertools.chain(offspring, parents), key=key))
-        else:
-            return list(toolz.itertoolz.topk(size, offspring, key=key))
-    else:
-        if parents is not None:
-            return list(toolz.itertoolz.topk(
-                size, itertools.chain(offspring, parents)))
-        else:
-            return list(toolz.itertoolz.topk(size, offspring))
+    if parents is not None:
+        offspring = list(itertools.chain(offspring, parents))
+    return _best_k(offspring, size, key)
 
 
 ##############################
@@ -886,18 +1132,12 @@ def elitist_survival(offspring: List, parents: List, k: int = 1, key = None) ->
     original_num_offspring = len(offspring)
 
     # Append the requested number of best parents to the offspring.
-    if key:
-        elites = list(toolz.itertoolz.topk(k, parents, key=key))
-    else:
-        elites = list(toolz.itertoolz.topk(k, parents))
+    elites = _best_k(parents, k, key)
     offspring.extend(elites)
 
     # Now return the offspring (plus possibly an elite) truncating the least
     # fit individual.
-    if key:
-        return list(toolz.itertoolz.topk(original_num_offspring, offspring, key))
-    else:
-        return list(toolz.itertoolz.topk(original_num_offspring, offspring))
+    return _best_k(offspring, original_num_offspring, key)
 
 
 ##############################
@@ -953,6 +1193,83 @@ def tournament_selection(population: list, k: int = 2, key = None, select_worst:
         yield population[best_idx]
 
 
+##############################
+# Function batch_tournament_selection
+##############################
+@wrap_curry
+@listiter_op
+def batch_tournament_selection(population: list, k: int = 2, key = None,
+                               select_worst: bool = False, indices = None,
+                               batch_size: int = None) -> Iterator:
+    """A vectorized version of `tournament_selection()` that runs a whole batch
+    of tournaments at once.
+
+    A sort key is computed for every individual once, up front.  Then the
+    contestants of `batch_size` tournaments are drawn together as an index
+    matrix, and all the tournaments are resolved with a single `argmax` (or
+    `argmin`), instead of with pairwise `Individual` comparisons.  When a
+    batch runs out, a new one is drawn, so like `tournament_selection()` this
+    yields individuals indefinitely.
+
+    >>> from leap_ec import Individual
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> import numpy as np
+
+    >>> pop = [Individual(np.array([0, 0, 0]), problem=MaxOnes()),
+    ...        Individual(np.array([0, 0, 1]), problem=MaxOnes())]
+    >>> pop = Individual.evaluate_population(pop)
+    >>> selected = batch_tournament_selection(pop, k=2)
+    >>> next(selected) in pop
+    True
+
+    The semantics are the same as `tournament_selection()`'s.  The keys come
+    from `selection_keys()`: for a `ScalarProblem` they are the fitnesses,
+    signed by the problem's `maximize` direction and with NaN fitnesses as
+    the worst possible.  Ties go to whichever tied contestant was drawn
+    first.  A custom `key` may return numbers or tuples of numbers (which are
+    compared lexicographically).  For other problems with no `key`, such as
+    multiobjective ones, the index matrix is still drawn in one go, but each
+    tournament is resolved by comparing `Individual`\\ s.
+
+    :param population: the population to select from.  Should be a list, not an iterator.
+    :param int k: number of contestants in each tournament.
+    :param key: an optional function that computes keys to sort over.  Defaults to None,
+        in which case fitnesses are compared.
+    :param bool select_worst: if True, select the worst individual from each tournament
+        instead of the best.
+    :param list indices: an optional list that will be populated with the index of the
+        selected individual.
+    :param int batch_size: how many tournaments to draw at a time; defaults to the size
+        of the population.
+    :return: the best of k individuals drawn from population, batch by batch
+    """
+    assert((indices is None) or (isinstance(indices, list))), f"Only a list should be passed to batch_tournament_selection() for indices, but received {indices}."
+    n = len(population)
+    if batch_size is None:
+        batch_size = n
+
+    keys = selection_keys(population, key)
+    judge = min if select_worst else max
+
+    while True:
+        contestants = np.random.randint(n, size=(batch_size, k))
+        if keys is not None:
+            contestant_keys = keys[contestants]
+            columns = contestant_keys.argmin(axis=1) if select_worst \
+                else contestant_keys.argmax(axis=1)
+            winners = contestants[np.arange(batch_size), columns]
+        else:
+            winners = [judge(row, key=lambda x: population[x])
+                       for row in contestants.tolist()]
+
+        for best_idx in winners:
+            if indices is not None:
+                indices.clear()  # Nuke whatever is in there
+                indices.append(int(best_idx))  # Add the index of the individual we're about to return
+
+            yield population[best_idx]
+
+
 ##############################
 # Function insertion_selection
 ##############################
@@ -976,22 +1293,47 @@ def insertion_selection(offspring: List, parents: List, key = None) -> List:
     :param key: optional key for determining max() by other criteria such as
         for parsimony pressure
     :return: the updated parent population
+
+    >>> from leap_ec.individual import Individual
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> import numpy as np
+    >>> parents = Individual.evaluate_population(
+    ...     [Individual(np.array([0, 0]), problem=MaxOnes())])
+    >>> offspring = Individual.evaluate_population(
+    ...     [Individual(np.array([0, 1]), problem=MaxOnes()),
+    ...      Individual(np.array([1, 1]), problem=MaxOnes())])
+    >>> survivors = insertion_selection(offspring, parents=parents)
+    >>> survivors[0].genome
+    array([1, 1])
     """
     copied_parents = copy(parents)
-    for child in offspring:
-        selected_parent_index = random.randrange(len(copied_parents))
-        if key:
-            copied_parents[selected_parent_index] = max(child,
-                                                        copied_parents[
-                                                            selected_parent_index],
-                                                        key=key)
-        else:
-            copied_parents[selected_parent_index] = max(child,
-                                                        copied_parents[
-                                                            selected_parent_index])
-
+    selected_parent_indices = [random.randrange(len(copied_parents))
+                               for _ in range(len(offspring))]
+
+    child_keys = selection_keys(offspring, key) if offspring else None
+    parent_keys = selection_keys(copied_parents, key) if offspring else None
+    if child_keys is None or parent_keys is None:
+        for child, selected_parent_index in zip(offspring, selected_parent_indices):
+            if key:
+                copied_parents[selected_parent_index] = max(child,
+                                                            copied_parents[
+                                                                selected_parent_index],
+                                                            key=key)
+            else:
+                copied_parents[selected_parent_index] = max(child,
+                                                            copied_parents[
+                                                                selected_parent_index])
         return copied_parents
 
+    # Compare precomputed keys instead; the child wins ties, as with max()
+    slot_keys = parent_keys.tolist()
+    for child, child_key, selected_parent_index in zip(offspring, child_keys.tolist(), selected_parent_indices):
+        if not slot_keys[selected_parent_index] > child_key:
+            copied_parents[selected_parent_index] = child
+            slot_keys[selected_parent_index] = child_key
+
+    return copied_parents
+
 
 ##############################
 # Function naive_cyclic_selection
@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+"""
+    Defines `Population`, an array-backed container of individuals.
+
+    A plain `list` of `Individual`\\ s spreads its genomes across many small
+    numpy arrays, so operators and probes that want to work on the whole
+    population at once have to `np.stack()` them first.  A `Population` keeps
+    every genome in one contiguous 2-D matrix (one row per individual), and
+    fitness, rank, and crowding distance in parallel arrays.
+
+    `Population` is a sub-class of `list`, and its elements are lightweight
+    `Individual` views onto the rows of those arrays, so it can be handed to
+    any existing pipeline operator.  Vectorized code can skip the views and
+    read the arrays directly; `genome_matrix()` and `fitness_array()` do this
+    for a `Population` and fall back to stacking for ordinary lists.
+"""
+from copy import copy
+from functools import lru_cache
+
+import numpy as np
+
+from leap_ec.decoder import IdentityDecoder
+from leap_ec.individual import Individual
+
+
+# Attributes of an individual that a `Population` stores in its arrays rather
+# than in the individual itself
+_ARRAY_FIELDS = ('genome', 'fitness', 'rank', 'distance')
+
+# Attributes of a view that only make sense inside its population
+_VIEW_FIELDS = ('_population', '_index')
+
+
+##############################
+# Class IndividualView
+##############################
+class IndividualView(Individual):
+    """
+        An `Individual` whose genome, fitness, rank, and distance are stored in
+        a row of a `Population`'s arrays.
+
+        Views are created by `Population`; you shouldn't need to make them
+        yourself.  Reading `genome` returns a numpy view of the underlying row,
+        and assigning to `genome`, `fitness`, `rank` or `distance` writes
+        through to the population's arrays.  Any other attributes (`uuid`,
+        `parents`, `is_viable`, etc.) are stored on the view as usual.
+
+        Copying, cloning or pickling a view yields a free-standing individual
+        of the population's `individual_cls`, so offspring never alias the
+        parent population's memory:
+
+        >>> import numpy as np
+        >>> pop = Population(np.array([[0, 1], [1, 1]]))
+        >>> child = pop[0].clone()
+        >>> type(child).__name__
+        'Individual'
+        >>> child.genome[0] = 1
+        >>> pop.genomes
+        array([[0, 1],
+               [1, 1]])
+    """
+
+    def __init__(self, population, index, decoder=IdentityDecoder(),
+                 problem=None):
+        # Deliberately not calling Individual.__init__(), because the genome
+        # and fitness already live in the population's arrays.
+        self._population = population
+        self._index = index
+        self.problem = problem
+        self.decoder = decoder
+        self._phenome = None
+
+        self.uuid = self._new_uuid()
+        self.parents = set()
+
+    @property
+    def genome(self):
+        """A (writeable) numpy view of this individual's row in the genome
+        matrix."""
+        return self._population.genomes[self._index]
+
+    @genome.setter
+    def genome(self, value):
+        self._population.genomes[self._index] = value
+
+    @property
+    def fitness(self):
+        """This individual's fitness, or `None` if it hasn't been set."""
+        population = self._population
+        if not population.evaluated[self._index]:
+            return None
+        return population.fitnesses[self._index]
+
+    @fitness.setter
+    def fitness(self, value):
+        self._population._store_fitness(self._index, value)
+
+    @property
+    def rank(self):
+        """This individual's entry in the population's `ranks` array."""
+        if self._population.ranks is None:
+            raise AttributeError("'rank' has not been assigned")
+        return self._population.ranks[self._index]
+
+    @rank.setter
+    def rank(self, value):
+        population = self._population
+        if population.ranks is None:
+            population.ranks = np.zeros(len(population), dtype=int)
+        population.ranks[self._index] = value
+
+    @property
+    def distance(self):
+        """This individual's entry in the population's `distances` array."""
+        if self._population.distances is None:
+            raise AttributeError("'distance' has not been assigned")
+        return self._population.distances[self._index]
+
+    @distance.setter
+    def distance(self, value):
+        population = self._population
+        if population.distances is None:
+            population.distances = np.zeros(len(population))
+        population.distances[self._index] = value
+
+    def clone(self):
+        """Clone a free-standing copy of this individual, so that the clone
+        (of any `individual_cls`) never aliases the population's arrays."""
+        return copy(self).clone()
+
+    def _detached_state(self):
+        """:return: the attributes of an equivalent free-standing individual"""
+        state = {k: v for k, v in _attributes(self).items()
+                 if k not in _VIEW_FIELDS}
+        state['genome'] = self.genome.copy()
+        fitness = self.fitness
+        state['fitness'] = fitness.copy() \
+            if isinstance(fitness, np.ndarray) else fitness
+        if self._population.ranks is not None:
+            state['rank'] = self.rank
+        if self._population.distances is not None:
+            state['distance'] = self.distance
+        return state
+
+    def _detach(self):
+        """Turn this view, in place, into a free-standing individual that no
+        longer refers to its population."""
+        state = self._detached_state()
+        self.__class__ = self._population.individual_cls
+        self.__dict__.clear()
+        _set_attributes(self, state)
+
+    def __reduce__(self):
+        return _rebuild_individual, (self._population.individual_cls,
+                                     self._detached_state())
+
+
+def _rebuild_individual(cls, state):
+    """Create an instance of `cls` from an attribute dictionary without
+    calling its constructor."""
+    individual = cls.__new__(cls)
+    _set_attributes(individual, state)
+    return individual
+
+
+@lru_cache(maxsize=None)
+def _slot_descriptors(cls):
+    """:return: a dict mapping the names of the `__slots__` declared by `cls`
+    and its bases (e.g. those of `CompactIndividual`) to their descriptors"""
+    slots = {}
+    for klass in reversed(cls.__mro__):
+        names = klass.__dict__.get('__slots__', ())
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            if name not in ('__dict__', '__weakref__'):
+                slots[name] = klass.__dict__[name]
+    return slots
+
+
+def _attributes(obj):
+    """:return: all the instance attributes of `obj`, whether they are stored
+    in its `__dict__` or in slots"""
+    state = dict(obj.__dict__)
+    for name, slot in _slot_descriptors(type(obj)).items():
+        try:
+            state[name] = slot.__get__(obj)
+        except AttributeError:  # An empty slot
+            pass
+    return state
+
+
+def _set_attributes(obj, state):
+    """Store the attribute dictionary `state` on `obj`, bypassing any
+    properties, as unpickling would."""
+    slots = _slot_descriptors(type(obj))
+    for name, value in state.items():
+        if name in slots:
+            slots[name].__set__(obj, value)
+        else:
+            obj.__dict__[name] = value
+
+
+@lru_cache(maxsize=None)
+def _view_class(individual_cls):
+    """:return: a view class that behaves like `individual_cls` (e.g. uses its
+    `evaluate()`), but stores its genome and fitness in a `Population`"""
+    if issubclass(individual_cls, IndividualView):
+        raise ValueError(f"Expected a free-standing individual class, but got "
+                         f"the view class {individual_cls}.")
+    if individual_cls is Individual:
+        return IndividualView
+    return type(f'{individual_cls.__name__}View',
+                (IndividualView, individual_cls), {})
+
+
+def _individual_state(individual):
+    """:return: the attributes of `individual` that are kept on a view, i.e.
+    everything except the array-backed fields"""
+    if isinstance(individual, IndividualView):
+        state = {k: v for k, v in _attributes(individual).items()
+                 if k not in _VIEW_FIELDS}
+    else:
+        state = {k: v for k, v in _attributes(individual).items()
+                 if k not in _ARRAY_FIELDS}
+    for name in ('parents', '_parents'):
+        if isinstance(state.get(name), set):
+            # Crossover updates parents in place, so don't share the set
+            state[name] = set(state[name])
+    return state
+
+
+##############################
+# Class Population
+##############################
+class Population(list):
+    """
+        A list of individuals whose genomes are stored in one contiguous
+        2-D numpy matrix.
+
+        This is intended for fixed-length real-valued, integer, and binary
+        representations.  Fitnesses are held in a parallel `fitnesses` array
+        (of shape `(n,)`, or `(n, m)` for multiobjective problems), alongside a
+        boolean `evaluated` mask that distinguishes unevaluated individuals
+        (whose `fitness` is `None`) from non-viable ones (whose fitness is
+        NaN).  The `ranks` and `distances` arrays used by NSGA-II are
+        allocated the first time an individual is assigned a `rank` or
+        `distance`.
+
+        >>> import numpy as np
+        >>> from leap_ec.binary_rep.problems import MaxOnes
+        >>> pop = Population(np.array([[0, 0, 1], [1, 1, 1]]), problem=MaxOnes())
+        >>> pop = Individual.evaluate_population(pop)
+        >>> pop.fitnesses
+        array([1., 3.])
+
+        The elements of the population are `Individual`\\ s, so everything
+        that works with a list of individuals works with a `Population`:
+
+        >>> best = max(pop)
+        >>> best.genome
+        array([1, 1, 1])
+
+        and changes made through an element are made to the arrays:
+
+        >>> best.genome[0] = 0
+        >>> best.fitness = None
+        >>> pop.genomes
+        array([[0, 0, 1],
+               [0, 1, 1]])
+        >>> pop.evaluated
+        array([ True, False])
+
+        Assigning an individual to a slot copies it into that row, and the
+        individual previously held there becomes a free-standing copy:
+
+        >>> from leap_ec.individual import Individual
+        >>> old = pop[1]
+        >>> pop[1] = Individual(np.array([1, 0, 0]), problem=MaxOnes())
+        >>> pop.genomes
+        array([[0, 0, 1],
+               [1, 0, 0]])
+        >>> old.genome
+        array([0, 1, 1])
+
+        Slicing or concatenating a `Population` yields an ordinary `list`
+        (of views), and copying one copies its arrays.  To turn the output of a
+        pipeline back into a `Population`, use
+        `Population.from_individuals()`, which can itself be used as a
+        pipeline operator.
+
+        :param genomes: a 2-D array-like with one genome per row; an existing
+            C-contiguous numpy array is used directly, without being copied
+        :param decoder: the decoder to attach to every individual
+        :param problem: the problem to attach to every individual
+        :param individual_cls: the class that views emulate, and that detached
+            copies of them are instances of
+    """
+
+    def __init__(self, genomes, decoder=IdentityDecoder(), problem=None,
+                 individual_cls=Individual):
+        genomes = np.ascontiguousarray(genomes)
+        if genomes.ndim != 2:
+            raise ValueError(f"Expected a 2-D matrix of genomes, but got an "
+                             f"array of shape {genomes.shape}.")
+        self.individual_cls = individual_cls
+        self._set_arrays(genomes, np.full(len(genomes), np.nan),
+                         np.zeros(len(genomes), dtype=bool), None, None)
+
+        view_cls = _view_class(individual_cls)
+        super().__init__(view_cls(self, i, decoder, problem)
+                         for i in range(len(genomes)))
+
+    @classmethod
+    def from_individuals(cls, individuals, individual_cls=None):
+        """
+        Pack a collection of individuals into a new `Population`, copying
+        their genomes into a single matrix.
+
+        Fitnesses, ranks, distances, UUIDs, and any other attributes are
+        carried over.  This has the signature of a pipeline operator, so it
+        can be placed at the end of a pipeline to keep the next generation
+        array-backed:
+
+        >>> import numpy as np
+        >>> from leap_ec.binary_rep.problems import MaxOnes
+        >>> inds = [Individual(np.array([0, 1]), problem=MaxOnes()),
+        ...         Individual(np.array([1, 1]), problem=MaxOnes())]
+        >>> inds[1].fitness = 2
+        >>> pop = Population.from_individuals(inds)
+        >>> pop.genomes
+        array([[0, 1],
+               [1, 1]])
+        >>> pop[0].fitness is None, pop[1].fitness
+        (True, 2.0)
+        >>> pop[1].uuid == inds[1].uuid
+        True
+
+        :param individuals: an iterable of individuals with fixed-length numpy
+            genomes of the same shape
+        :param individual_cls: the class of individual to emulate; defaults to
+            the class of the first individual
+        :return: a new `Population`
+        """
+        individuals = list(individuals)
+        if not individuals:
+            raise ValueError("Cannot create a Population from zero "
+                             "individuals.")
+        first = individuals[0]
+        if individual_cls is None:
+            individual_cls = _free_class(first)
+
+        population = cls(np.stack([ind.genome for ind in individuals]),
+                         decoder=first.decoder, problem=first.problem,
+                         individual_cls=individual_cls)
+        for i, individual in enumerate(individuals):
+            population._write_attributes(i, individual)
+        return population
+
+    @classmethod
+    def create(cls, n, initialize, decoder, problem,
+               individual_cls=Individual):
+        """
+        Initialize a new `Population`, analogous to
+        `Individual.create_population()`.
+
+        The individuals are created by `individual_cls` before being packed,
+        so any bookkeeping done in its constructor is preserved.
+
+        :param n: the size of the population to generate
+        :param initialize: a function f() that initializes a genome
+        :param decoder: the decoder to attach individuals to
+        :param problem: the problem to attach individuals to
+        :param individual_cls: the class of individual to create
+        :return: a `Population` of n individuals
+        """
+        return cls.from_individuals(
+            individual_cls.create_population(n, initialize=initialize,
+                                             decoder=decoder,
+                                             problem=problem),
+            individual_cls=individual_cls)
+
+    ##############################
+    # Array bookkeeping
+    ##############################
+    def _set_arrays(self, genomes, fitnesses, evaluated, ranks, distances):
+        self.genomes = genomes
+        self.fitnesses = fitnesses
+        self.evaluated = evaluated
+        self.ranks = ranks
+        self.distances = distances
+
+    def _store_fitness(self, index, value):
+        """Write `value` into the fitness array, reshaping the array the first
+        time a multiobjective fitness vector is assigned."""
+        if value is None:
+            self.evaluated[index] = False
+            return
+
+        value = np.asarray(value, dtype=float)
+        if value.shape != self.fitnesses.shape[1:]:
+            if self.evaluated.any():
+                raise ValueError(
+                    f"Expected a fitness of shape {self.fitnesses.shape[1:]} "
+                    f"but got one of shape {value.shape}.")
+            self.fitnesses = np.full((len(self.evaluated),) + value.shape,
+                                     np.nan)
+        self.fitnesses[index] = value
+        self.evaluated[index] = True
+
+    def _write_attributes(self, index, individual):
+        """Copy the fitness, rank, distance, and ancillary state of
+        `individual` into slot `index` (but not its genome)."""
+        self._write_captured(index, _capture(individual))
+
+    def _write_captured(self, index, captured):
+        """Write the output of `_capture()` into slot `index`."""
+        fitness, fields, state = captured
+        view = list.__getitem__(self, index)
+        self._store_fitness(index, fitness)
+        for field, value in fields.items():
+            setattr(view, field, value)
+        _set_attributes(view, state)
+
+    def _reorder(self, order):
+        """Rearrange (or drop) rows so that row i holds what was in row
+        `order[i]`.  Views that are dropped must already be detached."""
+        order = np.asarray(order, dtype=int)
+        views = [list.__getitem__(self, i) for i in order]
+        self._set_arrays(self.genomes[order], self.fitnesses[order],
+                         self.evaluated[order],
+                         None if self.ranks is None else self.ranks[order],
+                         None if self.distances is None
+                         else self.distances[order])
+        for i, view in enumerate(views):
+            view._index = i
+        list.__setitem__(self, slice(None), views)
+
+    def _grow(self, individuals):
+        """Append copies of `individuals` to the end of the arrays."""
+        individuals = list(individuals)
+        if not individuals:
+            return
+        n, k = len(self), len(individuals)
+
+        def extend(array, fill):
+            return np.concatenate(
+                [array, np.full((k,) + array.shape[1:], fill,
+                                dtype=array.dtype)])
+
+        genomes = np.concatenate(
+            [self.genomes, np.stack([ind.genome for ind in individuals])])
+        self._set_arrays(genomes, extend(self.fitnesses, np.nan),
+                         extend(self.evaluated, False),
+                         None if self.ranks is None
+                         else extend(self.ranks, 0),
+                         None if self.distances is None
+                         else extend(self.distances, 0))
+
+        view_cls = _view_class(self.individual_cls)
+        for i, individual in enumerate(individuals, start=n):
+            list.append(self, view_cls(self, i, individual.decoder,
+                                       individual.problem))
+            self._write_attributes(i, individual)
+
+    def _normalize_index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Population index out of range')
+        return index
+
+    ##############################
+    # list interface
+    ##############################
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+            value = list(value)
+            if len(value) != len(indices):
+                raise ValueError("Slice assignment cannot change the size of "
+                                 "a Population.")
+            for i, individual in zip(indices, value):
+                self[i] = individual
+            return
+
+        index = self._normalize_index(key)
+        old = list.__getitem__(self, index)
+        if value is old:
+            return
+        # Read everything we need from value before touching the row, in case
+        # value is itself a view onto this population
+        genome = np.array(value.genome, dtype=self.genomes.dtype)
+        captured = _capture(value)
+        old._detach()
+        list.__setitem__(self, index, _view_class(self.individual_cls)(
+            self, index, value.decoder, value.problem))
+        self.genomes[index] = genome
+        self._write_captured(index, captured)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            doomed = set(range(*key.indices(len(self))))
+        else:
+            doomed = {self._normalize_index(key)}
+        for i in doomed:
+            list.__getitem__(self, i)._detach()
+        self._reorder([i for i in range(len(self)) if i not in doomed])
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        if n <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (n - 1))
+        return self
+
+    def __copy__(self):
+        population = Population.__new__(type(self))
+        population.individual_cls = self.individual_cls
+        population._set_arrays(
+            self.genomes.copy(), self.fitnesses.copy(), self.evaluated.copy(),
+            None if self.ranks is None else self.ranks.copy(),
+            None if self.distances is None else self.distances.copy())
+        view_cls = _view_class(self.individual_cls)
+        for i, view in enumerate(self):
+            copied = view_cls.__new__(view_cls)
+            _set_attributes(copied, _individual_state(view))
+            copied._population = population
+            copied._index = i
+            list.append(population, copied)
+        return population
+
+    def copy(self):
+        """:return: a copy of this population, with its own arrays"""
+        return self.__copy__()
+
+    def __reduce__(self):
+        return _rebuild_population, (
+            type(self), self.individual_cls, self.genomes, self.fitnesses,
+            self.evaluated, self.ranks, self.distances,
+            [_individual_state(view) for view in self])
+
+    def append(self, individual):
+        self._grow([individual])
+
+    def extend(self, individuals):
+        self._grow(individuals)
+
+    def insert(self, index, individual):
+        n = len(self)
+        index = max(0, min(n, index + n if index < 0 else index))
+        self._grow([individual])
+        self._reorder(list(range(index)) + [n] + list(range(index, n)))
+
+    def pop(self, index=-1):
+        index = self._normalize_index(index)
+        individual = list.__getitem__(self, index)
+        del self[index]
+        return individual
+
+    def remove(self, individual):
+        del self[self.index(individual)]
+
+    def clear(self):
+        del self[:]
+
+    def reverse(self):
+        self._reorder(range(len(self) - 1, -1, -1))
+
+    def sort(self, *, key=None, reverse=False):
+        views = list.__iter__(self)
+        keyed = [(view if key is None else key(view), i)
+                 for i, view in enumerate(views)]
+        order = [i for _, i in sorted(keyed, key=lambda pair: pair[0],
+                                      reverse=reverse)]
+        self._reorder(order)
+
+
+def _rebuild_population(cls, individual_cls, genomes, fitnesses, evaluated,
+                        ranks, distances, states):
+    """Reconstruct a pickled `Population`."""
+    population = cls.__new__(cls)
+    population.individual_cls = individual_cls
+    population._set_arrays(genomes, fitnesses, evaluated, ranks, distances)
+    view_cls = _view_class(individual_cls)
+    for i, state in enumerate(states):
+        view = view_cls.__new__(view_cls)
+        _set_attributes(view, state)
+        view._population = population
+        view._index = i
+        list.append(population, view)
+    return population
+
+
+def _capture(individual):
+    """:return: the fitness, the rank and distance (if any), and the other
+    attributes of `individual`"""
+    fitness = individual.fitness
+    if isinstance(fitness, np.ndarray):
+        fitness = fitness.copy()
+    fields = {f: getattr(individual, f) for f in ('rank', 'distance')
+              if hasattr(individual, f)}
+    return fitness, fields, _individual_state(individual)
+
+
+def _free_class(individual):
+    """:return: the free-standing class of `individual`, even if it is a
+    view"""
+    if isinstance(individual, IndividualView):
+        return individual._population.individual_cls
+    return type(individual)
+
+
+##############################
+# Function genome_matrix
+##############################
+def genome_matrix(population):
+    """
+    Return the genomes of a population as a 2-D numpy matrix.
+
+    For a `Population` this is its `genomes` array itself (not a copy), so it
+    costs nothing; for any other collection of individuals the genomes are
+    stacked into a new matrix.
+
+    >>> import numpy as np
+    >>> inds = [Individual(np.array([0, 1])), Individual(np.array([1, 1]))]
+    >>> genome_matrix(inds)
+    array([[0, 1],
+           [1, 1]])
+
+    :param population: a `Population` or a sequence of individuals with
+        equal-length genomes
+    :return: a matrix with one genome per row
+    """
+    if isinstance(population, Population):
+        return population.genomes
+    return np.stack([ind.genome for ind in population])
+
+
+##############################
+# Function fitness_array
+##############################
+def fitness_array(population):
+    """
+    Return the fitnesses of a population as a float numpy array of shape
+    `(n,)`, or `(n, m)` for multiobjective fitnesses.
+
+    For a `Population` this is its `fitnesses` array itself (not a copy).
+    Unevaluated individuals should be avoided: they show up as NaN in a
+    `Population`, and cause an error for ordinary lists.
+
+    >>> import numpy as np
+    >>> inds = [Individual(np.array([0, 1])), Individual(np.array([1, 1]))]
+    >>> inds[0].fitness, inds[1].fitness = 1, 2
+    >>> fitness_array(inds)
+    array([1., 2.])
+
+    :param population: a `Population` or a sequence of evaluated individuals
+    :return: an array with one fitness per row
+    """
+    if isinstance(population, Population):
+        return population.fitnesses
+    return np.array([ind.fitness for ind in population], dtype=float)
+
+
+##############################
+# Function set_genomes
+##############################
+def set_genomes(population, matrix, rows=None):
+    """
+    Write the rows of a genome matrix back to a population, and invalidate
+    the fitness of those individuals (since their genomes have changed).
+
+    This is the counterpart of `genome_matrix()` for operators that modify a
+    whole batch of genomes at once.  If `population` is a `Population` whose
+    own matrix was modified in place, only the fitnesses need resetting;
+    otherwise each individual is given its row of `matrix`.
+
+    >>> import numpy as np
+    >>> inds = [Individual(np.array([0, 1])), Individual(np.array([1, 1]))]
+    >>> matrix = genome_matrix(inds)
+    >>> matrix[:, 0] = 5
+    >>> set_genomes(inds, matrix)
+    >>> inds[0].genome, inds[1].genome
+    (array([5, 1]), array([5, 1]))
+
+    :param population: a `Population` or a sequence of individuals
+    :param matrix: a matrix with one genome per individual
+    :param rows: the indices of the individuals to update; defaults to all
+        of them
+    """
+    if rows is None:
+        rows = range(len(population))
+
+    if isinstance(population, Population):
+        if matrix is not population.genomes:
+            population.genomes[rows] = matrix[rows]
+        population.evaluated[rows] = False
+        return
+
+    for i in rows:
+        individual = population[i]
+        individual.genome = matrix[i]
+        individual.fitness = None
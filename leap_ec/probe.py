@@ -17,6 +17,9 @@ from leap_ec import Individual
 from leap_ec.global_vars import context
 from leap_ec import ops as op
 from leap_ec.ops import iteriter_op, listlist_op
+from leap_ec.fitness_stats import RunningFitnessStats, fitness_stats, population_fitnesses
+from leap_ec.population import genome_matrix
+from leap_ec.problem import ScalarProblem
 
 
 ##############################
@@ -261,6 +264,8 @@ class FitnessStatsCSVProbe(op.Operator):
         a python list before printing. This is intended for multiobjective fitnesses,
         where large numpy arrays are normally split across csv rows with the default
         formatter.
+    :param sink: an optional `leap_ec.sink.ColumnarSink` to write rows of raw
+        values to instead of writing CSV text to `stream`
     :param context: a LEAP context object, used to retrieve the current generation
         from the EA state (i.e. from `context['leap']['generation']`)
 
@@ -324,12 +329,14 @@ class FitnessStatsCSVProbe(op.Operator):
                  notes: Dict = None,
                  modulo: int = 1,
                  numpy_as_list=True,
+                 sink=None,
                  context: Dict = context):
-        assert (stream is not None)
-        assert (hasattr(stream, 'write'))
+        assert (sink is not None or stream is not None)
+        assert (sink is not None or hasattr(stream, 'write'))
         assert (context is not None)
 
         self.stream = stream
+        self.sink = sink
         self.context = context
         self.bsf_ind = None
         self.modulo = modulo
@@ -339,7 +346,7 @@ class FitnessStatsCSVProbe(op.Operator):
         self.comment = comment
         self.numpy_as_list = numpy_as_list
 
-        if header:
+        if header and sink is None:
             self.write_comment(stream)
             self.write_header(stream)
 
@@ -367,8 +374,12 @@ class FitnessStatsCSVProbe(op.Operator):
         # If numpy_as_list is true, then numpy arrays are printed as lists in this scope
         with _maybe_list(self.numpy_as_list):
 
+            # Collect the fitnesses once, for both the best-so-far and the
+            # statistics
+            fitnesses = population_fitnesses(population)
+
             # Always update the best-so-far variable
-            best_ind = best_of_gen(population)
+            best_ind = _best_of(population, fitnesses)
             if self.bsf_ind is None or (best_ind > self.bsf_ind):
                 self.bsf_ind = best_ind
 
@@ -379,25 +390,134 @@ class FitnessStatsCSVProbe(op.Operator):
                 return population
             else:
                 # Do write fitness info
+                row = {}
                 if self.job is not None:
-                    self.stream.write(str(self.job) + ', ')
-                for _, v in self.notes.items():
-                    self.stream.write(str(v) + ', ')
-
-                self.stream.write(str(generation) + ', ')
-
-                self.stream.write(str(self.bsf_ind.fitness) + ', ')
-
-                fitnesses = [x.fitness for x in population]
-                self.stream.write(str(np.mean(fitnesses)) + ', ')
-                self.stream.write(str(np.std(fitnesses)) + ', ')
-                self.stream.write(str(np.min(fitnesses)) + ', ')
-                self.stream.write(str(np.max(fitnesses)))
-                for _, f in self.extra_metrics.items():
-                    self.stream.write(', ' + str(f(population)))
-                self.stream.write('\n')
+                    row['job'] = self.job
+                row.update(self.notes)
+
+                row['step'] = generation
+                row['bsf'] = self.bsf_ind.fitness
+
+                stats = fitness_stats(fitnesses)
+                row['mean_fitness'] = stats.mean
+                row['std_fitness'] = stats.std
+                row['min_fitness'] = stats.min
+                row['max_fitness'] = stats.max
+                for name, f in self.extra_metrics.items():
+                    row[name] = f(population)
+
+                self.write_row(row)
                 return population
 
+    def write_row(self, row: Dict):
+        """Write a row of values to the sink, or as CSV text to the stream."""
+        if self.sink is not None:
+            self.sink.write_row(row)
+        else:
+            self.stream.write(', '.join(str(v) for v in row.values()) + '\n')
+
+
+##############################
+# Class RunningFitnessStatsCSVProbe
+##############################
+class RunningFitnessStatsCSVProbe(FitnessStatsCSVProbe):
+    """A probe that records the fitness statistics of a steady-state
+    population as it changes, in the same CSV format as
+    `FitnessStatsCSVProbe`.
+
+    It wraps the `inserter` of one of the asynchronous steady-state
+    algorithms, and is passed to the algorithm as its inserter in its place.
+    Each time an individual is inserted, the statistics, kept by
+    `leap_ec.fitness_stats.RunningFitnessStats`, are updated with the new
+    individual and the one that the inserter evicted, which the inserter
+    returns, rather than being recomputed over the whole population.  A row
+    is written every `modulo` insertions, and the `step` column counts the
+    insertions so far.  Non-viable individuals are counted, but their (NaN)
+    fitnesses are left out of the statistics, and `bsf` is the best
+    individual ever inserted.
+
+    >>> import io
+    >>> from leap_ec.data import test_population
+    >>> from leap_ec.distrib.asynchronous import greedy_insert_into_pop
+    >>> stream = io.StringIO()
+    >>> probe = RunningFitnessStatsCSVProbe(greedy_insert_into_pop,
+    ...                                     stream=stream, modulo=2)
+    >>> pop = []
+    >>> for ind in test_population:
+    ...     _ = probe(ind, pop, 3)
+    >>> print(stream.getvalue())
+    step, bsf, mean_fitness, std_fitness, min_fitness, max_fitness
+    2, 3, 2.0, 1.0, 1.0, 3.0
+    4, 4, 3.0, 0.81649..., 2.0, 4.0
+    <BLANKLINE>
+
+    Above, the last individual's fitness of 2 replaced the 1 in the full
+    population.
+
+    :param inserter: the inserter to wrap, with the signature
+        `(new_individual, pop, pop_size)`; it must return the individual
+        that it evicted from the population (or kept out of it), or None if
+        the population grew, as `leap_ec.distrib.asynchronous`'s inserters and
+        `leap_ec.multiobjective.asynchronous.ENLUInserter` do
+    :param stream: the file object to write to (defaults to sys.stdout)
+    :param header: whether to print column names in the first line
+    :param comment: an optional comment to write before the header
+    :param job: optional constant job ID, which will be printed as the
+        first column
+    :param notes: a dict of optional constant-value columns to include in
+        all rows
+    :param modulo: how many insertions to go between rows
+    :param numpy_as_list: if True, numpy arrays will be first converted to
+        a python list before printing
+    :param sink: an optional `leap_ec.sink.ColumnarSink` to write rows of raw
+        values to instead of writing CSV text to `stream`
+    """
+    def __init__(self, inserter, stream=sys.stdout, header=True,
+                 comment=None, job: str = None, notes: Dict = None,
+                 modulo: int = 1, numpy_as_list=True, sink=None):
+        super().__init__(stream=stream, header=header, comment=comment,
+                         job=job, notes=notes, modulo=modulo,
+                         numpy_as_list=numpy_as_list, sink=sink)
+        self.inserter = inserter
+        self.stats = RunningFitnessStats()
+        self.insertions = 0
+
+    def __call__(self, individual, pop, pop_size):
+        size_before = len(pop)
+        evicted = self.inserter(individual, pop, pop_size)
+        if evicted is None and len(pop) == size_before:
+            raise ValueError(f"The inserter didn't return the individual it evicted, so {type(self).__name__} can't follow the population.")
+
+        if evicted is not individual:
+            self.stats.add(individual.fitness)
+            if evicted is not None:
+                self.stats.remove(evicted.fitness)
+        if self.bsf_ind is None or (individual > self.bsf_ind):
+            self.bsf_ind = individual
+
+        self.insertions += 1
+        if self.insertions % self.modulo != 0 or self.stats.count == 0:
+            return evicted
+
+        if not self.stats.bounds_known:
+            self.stats.refresh_bounds(population_fitnesses(pop))
+        stats = self.stats.stats()
+
+        row = {}
+        if self.job is not None:
+            row['job'] = self.job
+        row.update(self.notes)
+        row['step'] = self.insertions
+        row['bsf'] = self.bsf_ind.fitness
+        row['mean_fitness'] = stats.mean
+        row['std_fitness'] = stats.std
+        row['min_fitness'] = stats.min
+        row['max_fitness'] = stats.max
+
+        with _maybe_list(self.numpy_as_list):
+            self.write_row(row)
+        return evicted
+
 
 ##############################
 # Class AttributesCSVProbe
@@ -436,6 +556,9 @@ class AttributesCSVProbe(op.Operator):
         a python list before printing. This is intended for large genomes and
         multiobjective fitnesses, where large numpy arrays would be split across
         multiple csv rows by the default formatter.
+    :param sink: an optional `leap_ec.sink.ColumnarSink` to write rows of raw
+        values to, which is much faster than CSV for large populations and
+        genomes; usually you'll also want to set `stream=None` along with it
     :param context: the algorithm context we use to read the current generation
         from (so we can write it to a column)
 
@@ -491,10 +614,12 @@ class AttributesCSVProbe(op.Operator):
                  do_genome=False,
                  notes=None, extra_metrics=None, job=None,
                  numpy_as_list=True,
+                 sink=None,
                  context=context):
         assert ((stream is None) or hasattr(stream, 'write'))
         self.context = context
         self.stream = stream
+        self.sink = sink
         self.attributes = attributes
         self.best_only = best_only
 
@@ -506,9 +631,9 @@ class AttributesCSVProbe(op.Operator):
         self.do_dataframe = do_dataframe
         self.numpy_as_list = numpy_as_list
 
-        if (not do_dataframe) and stream is None:
+        if (not do_dataframe) and stream is None and sink is None:
             raise ValueError(
-                "Both 'stream'=None and 'do_dataframe'=False, but at least one must be enabled.")
+                "Both 'stream'=None and 'do_dataframe'=False, and there's no 'sink', but at least one must be enabled.")
 
         fieldnames = []
         if job is not None:
@@ -558,7 +683,12 @@ class AttributesCSVProbe(op.Operator):
         assert ('generation' in self.context['leap'])
 
         individuals = [max(population)] if self.best_only else population
-        
+
+        if self.writer is None and not self.do_dataframe:
+            # Only the sink wants the rows, so skip any formatting
+            self.sink.write_rows(self.get_row_dict(ind) for ind in individuals)
+            return population
+
         # If numpy_as_list is true, then numpy arrays are printed as lists in this scope
         with _maybe_list(self.numpy_as_list):
             for ind in individuals:
@@ -569,10 +699,14 @@ class AttributesCSVProbe(op.Operator):
                 if self.do_dataframe:
                     self.data.append(row)
 
+                if self.sink is not None:
+                    self.sink.write_row(row)
+
         return population
 
     def get_row_dict(self, ind):
-        """Compute a full row of data from a given individual."""
+        """Compute a full row of data from a given individual, in the order of
+        `fieldnames`."""
         row = {'step': self.context['leap']['generation']}
 
         for attr in self.attributes:
@@ -593,7 +727,7 @@ class AttributesCSVProbe(op.Operator):
         for k, f in self.extra_metrics.items():
             row[k] = f(row)
 
-        return row
+        return {name: row[name] for name in self.fieldnames}
 
 
 ##############################
@@ -699,9 +833,8 @@ def pairwise_squared_distance_metric(population: list):
 
        \\mathcal{D}(\\text{population}) = \\sum_{i=1}^n \\sum_{j=1}^n \\| x_i - x_j \\|^2 = 2n \\sum_{i=1}^n \\| x_i - c \\|^2
     """
-    # Create one big matrix from the population
-    genomes = [ ind.genome for ind in population ]
-    genomes_matrix = np.stack(genomes)
+    # Create one big matrix from the population (free for a `Population`)
+    genomes_matrix = genome_matrix(population)
 
     centroid = np.mean(genomes_matrix, axis=0)  # Compute c
     distances = genomes_matrix - centroid       # Compute x_i - c for all i
@@ -725,9 +858,8 @@ def sum_of_variances_metric(population: list):
     This is a so-called "column-wise" metric, in the sense that it considers
     each element of the solution vectors independently.
     """
-    # Create one big matrix from the population
-    genomes = [ ind.genome for ind in population ]
-    genomes_matrix = np.stack(genomes)
+    # Create one big matrix from the population (free for a `Population`)
+    genomes_matrix = genome_matrix(population)
 
     variances = np.std(genomes_matrix, axis=0)**2
 
@@ -745,9 +877,8 @@ def num_fixated_metric(population: list):
     each element of the solution vectors independently.
     """
 
-    # Create one big matrix from the population
-    genomes = [ ind.genome for ind in population ]
-    genomes_matrix = np.stack(genomes)
+    # Create one big matrix from the population (free for a `Population`)
+    genomes_matrix = genome_matrix(population)
 
     variances = np.std(genomes_matrix, axis=0)**2
 
@@ -1312,9 +1443,28 @@ def best_of_gen(population):
     :param population: a list of individuals
     :param context: optional `dict` of auxiliary state (ignored)
 
+    When the individuals share a `ScalarProblem` whose `ordering_key()`
+    returns keys, this uses `leap_ec.ops.selection_keys()` to find the best
+    with one `np.argmax()` (returning the first of any tied individuals, as
+    `max()` does).
+
     >>> from leap_ec.data import test_population
     >>> print(best_of_gen(test_population))
     Individual<...> with fitness 4
     """
     assert (len(population) > 0)
-    return max(population)
+    keys = op.selection_keys(population)
+    if keys is None:
+        return max(population)
+    return population[int(np.argmax(keys))]
+
+
+def _best_of(population, fitnesses):
+    """`best_of_gen()`, using fitnesses that have already been collected."""
+    problem = population[0].problem
+    if fitnesses.ndim == 1 and isinstance(problem, ScalarProblem) and \
+            all(ind.problem is problem for ind in population):
+        keys = problem.ordering_key(fitnesses)
+        if keys is not None:
+            return population[int(np.argmax(keys))]
+    return best_of_gen(population)
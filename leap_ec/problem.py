@@ -4,16 +4,25 @@ and FunctionProblem.
 
 """
 from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
 import csv
+import hashlib
 from itertools import islice
 import logging
 from math import nan, floor, isclose, isnan
+import os
+import pickle
 import random
-from subprocess import Popen, PIPE, STDOUT
+import selectors
+from subprocess import Popen, PIPE, STDOUT, TimeoutExpired
+import threading
+import time
+import warnings
 
 import numpy as np
 
 from leap_ec import leap_logger_name, Individual
+from leap_ec import external
 from leap_ec.decoder import Decoder, IdentityDecoder
 from leap_ec.global_vars import context
 
@@ -55,12 +64,17 @@ class Problem(ABC):
         """
         raise NotImplementedError
 
-    def evaluate_multiple(self, phenomes):
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
         """Evaluate multiple phenomes all at once, returning a list of fitness
         values.
 
         By default this just calls `self.evaluate()` multiple times.  Override this
-        if you need to, say, send a group of individuals off to parallel """
+        if you need to, say, send a group of individuals off to parallel
+        processing, or to compute all of their fitnesses in one vectorized
+        pass.
+
+        Extra arguments (such as the `individuals` keyword passed by
+        `ops.grouped_evaluate()`) are ignored by default."""
         return [ self.evaluate(p) for p in phenomes ]
 
     @abstractmethod
@@ -138,6 +152,57 @@ class ScalarProblem(Problem):
         else: # fallback if one or more are not floats
             return first_fitness == second_fitness
 
+    def ordering_key(self, fitnesses):
+        """
+            Map an array of fitnesses to sort keys, so that whole populations
+            can be ranked with numpy instead of with `worse_than()`.
+
+            The key is the fitness signed so that larger is always better
+            (i.e. negated for minimization problems), with NaN (non-viable)
+            fitnesses mapped to `-inf`, the worst possible key:
+
+            >>> import numpy as np
+            >>> p = FunctionProblem(sum, maximize=False)
+            >>> p.ordering_key(np.array([3.0, np.nan, -1.0]))
+            array([ -3., -inf,   1.])
+
+            Ties are left as ties.  Operators that sort by this key break them
+            by position in the population (stably), so the earlier of two
+            equally fit individuals comes first.  (`worse_than()`, in contrast,
+            flips a coin when comparing two NaNs.)  Note that `+inf` fitnesses
+            of a minimization problem tie with NaNs.
+
+            If a subclass over-rides `worse_than()` but not this method, the
+            keys might not agree with it, so this returns `None` to make the
+            operators fall back to comparing individuals:
+
+            >>> class CloseToFive(FunctionProblem):
+            ...     def worse_than(self, first_fitness, second_fitness):
+            ...         return abs(first_fitness - 5) > abs(second_fitness - 5)
+            >>> print(CloseToFive(sum, maximize=True).ordering_key([5.0, 100.0]))
+            None
+
+            So if you over-ride `worse_than()`, please over-ride this too (a
+            method that just calls `super().ordering_key()` will do if your
+            `worse_than()` orders fitnesses the same way).
+
+            :param fitnesses: a 1-D array of fitness values
+            :return: a float array of the same length, where larger is better,
+                or `None`
+        """
+        # Use the keys only if this method is defined at least as far down
+        # the class hierarchy as worse_than()
+        for cls in type(self).__mro__:
+            if 'ordering_key' in vars(cls):
+                break
+            if 'worse_than' in vars(cls):
+                return None
+
+        keys = np.asarray(fitnesses, dtype=float)
+        if not self.maximize:
+            keys = -keys
+        return np.where(np.isnan(keys), -np.inf, keys)
+
 
 
 ##############################
@@ -207,6 +272,29 @@ class ConstantProblem(ScalarProblem):
         return ConstantProblem.__name__
 
 
+def _check_protocol(protocol):
+    """Raise a ValueError if `protocol` isn't a known external wire format."""
+    if protocol not in ('text', 'binary'):
+        raise ValueError(f"protocol must be 'text' or 'binary', but got {protocol!r}.")
+
+
+def _scalar_fitness(frame, command):
+    """Return a fitness frame of one value as a float, and raise a ValueError
+    for any other frame; failed evaluations' NaNs are passed through."""
+    if not isinstance(frame, np.ndarray):
+        return frame
+    if frame.size != 1:
+        raise ValueError(f"External simulation {command} returned {frame.size} fitness values for a phenome, but a scalar problem needs exactly one; wrap the problem in a multiobjective.problems.ExternalMultiObjectiveProblem to use vectors of objectives.")
+    return float(frame[0])
+
+
+def _check_vectors(protocol):
+    """Raise a ValueError if vectors of objectives can't be read with
+    `protocol`."""
+    if protocol != 'binary':
+        raise ValueError(f"Vectors of objectives need protocol='binary', but the protocol is {protocol!r}.")
+
+
 ################################
 # Class ExternalProcessProblem
 ################################
@@ -217,11 +305,27 @@ class ExternalProcessProblem(ScalarProblem):
 
     Assumes that individuals are represented with list phenomes with elements that can
     be cast to strings.
+
+    With `protocol='binary'`, phenomes and fitnesses are instead exchanged as
+    length-prefixed little-endian float64 or int64 arrays, as described in
+    `leap_ec.external`, which is lossless and much faster for long phenomes.
+    Each fitness frame must then hold one value; a simulator that returns
+    several objectives per phenome is used through
+    `leap_ec.multiobjective.problems.ExternalMultiObjectiveProblem`, which
+    calls `evaluate_vectors()`.
+
+    :param command: the program to run
+    :param maximize: True if larger fitnesses are better
+    :param args: command-line arguments for the program
+    :param protocol: the wire format, either `'text'` or `'binary'`
     """
-    def __init__(self, command: str, maximize: bool, args: list = None, ):
+    def __init__(self, command: str, maximize: bool, args: list = None,
+                 protocol: str = 'text'):
         super().__init__(maximize=maximize)
+        _check_protocol(protocol)
         self.command = command
         self.args = args[:] if args else []
+        self.protocol = protocol
 
     def evaluate(self, phenome):
         fitnesses = self.evaluate_multiple([ phenome ])
@@ -229,12 +333,34 @@ class ExternalProcessProblem(ScalarProblem):
         return fitnesses[0]
 
     def evaluate_multiple(self, phenomes, *args, **kwargs):
-        # Convert the phenomes into one big string
-        def phenome_to_str(p):
-            return ','.join([ str(x) for x in p ])
-        phenome_bytes = '\n'.join([ phenome_to_str(p) for p in phenomes ]).encode()
+        fitnesses = self._evaluate_frames(phenomes)
+        if self.protocol == 'binary':
+            fitnesses = [ _scalar_fitness(f, self.command) for f in fitnesses ]
+        return fitnesses
 
-        logger.debug(f"Input: {phenome_bytes}")
+    def evaluate_vectors(self, phenomes):
+        """ Evaluate phenomes with a simulator that writes a binary frame of
+        several objectives for each.
+
+        :param phenomes: to be sent to the simulator
+        :return: a list of float arrays, one per phenome
+        """
+        _check_vectors(self.protocol)
+        return [ f.astype(float) for f in self._evaluate_frames(phenomes) ]
+
+    def _evaluate_frames(self, phenomes):
+        """Run the program on `phenomes`, returning its fitnesses as floats,
+        or, with the binary protocol, as the arrays that it returned."""
+        if self.protocol == 'binary':
+            phenome_bytes = b''.join([ external.encode_array(p) for p in phenomes ])
+            logger.debug(f"Input: {len(phenome_bytes)} bytes")
+        else:
+            # Convert the phenomes into one big string
+            def phenome_to_str(p):
+                return ','.join([ str(x) for x in p ])
+            phenome_bytes = '\n'.join([ phenome_to_str(p) for p in phenomes ]).encode()
+
+            logger.debug(f"Input: {phenome_bytes}")
 
         # Start the external process and send the phenomes to its stdin
         p = Popen([self.command] + self.args, stdout=PIPE, stdin=PIPE, stderr=PIPE)
@@ -247,8 +373,14 @@ class ExternalProcessProblem(ScalarProblem):
         if p.returncode != 0:
             raise RuntimeError(f"Error in the external simulation during fitness evaluation.")
 
-        out_strs = outs.split(b'\n')[:-1]  # Ignoring  trailing newline
-        fitnesses = [ float(o) for o in out_strs]
+        if self.protocol == 'binary':
+            arrays, rest = external.decode_arrays(outs)
+            if rest:
+                raise RuntimeError(f"External simulation returned {len(rest)} bytes that aren't a whole binary frame.")
+            fitnesses = arrays
+        else:
+            out_strs = outs.split(b'\n')[:-1]  # Ignoring  trailing newline
+            fitnesses = [ float(o) for o in out_strs]
 
         if len(fitnesses) != len(phenomes):
             raise RuntimeError(f"Expected to receive {len(phenomes)} fitness values back from external simulation, but actually received {len(fitnesses)}.")
@@ -258,6 +390,245 @@ class ExternalProcessProblem(ScalarProblem):
         return fitnesses
 
 
+##########################################
+# Class PersistentExternalProcessProblem
+##########################################
+class PersistentExternalProcessProblem(ScalarProblem):
+    r"""
+    Evaluate individuals by streaming phenomes to a pool of long-lived external
+    programs, rather than launching a new program for every call as
+    `ExternalProcessProblem` does.
+
+    Each of the `num_processes` programs is started once (on first use) and
+    must keep reading phenomes from its stdin, one CSV row per line, and write
+    one fitness value per line to its stdout, *flushing* after each one, until
+    its stdin is closed.  A group of phenomes passed to `evaluate_multiple()`
+    is divided among the programs, which evaluate their shares concurrently.
+    This avoids paying the program's startup cost for every evaluation.
+
+    With `protocol='binary'`, the programs exchange binary frames instead of
+    lines, as described in `leap_ec.external`; `leap_ec.external.serve()`
+    implements the program's side of this for simulators written in Python.
+
+    If a program exits, or takes longer than `timeout` seconds to return any
+    one fitness, it is killed and replaced by a fresh one.  The phenomes it
+    hadn't finished are given a NaN fitness, and a `RuntimeWarning` is issued.
+
+    The programs are shut down by `close()`, which is also called on leaving a
+    `with` block:
+
+    >>> import sys
+    >>> script = ("import sys\n"
+    ...           "for line in sys.stdin:\n"
+    ...           "    print(sum(map(float, line.split(','))), flush=True)")
+    >>> with PersistentExternalProcessProblem(sys.executable, maximize=True,
+    ...                                       args=['-c', script],
+    ...                                       num_processes=2) as problem:
+    ...     problem.evaluate_multiple([[1, 2], [3, 4], [5, 6]])
+    [3.0, 7.0, 11.0]
+
+    The programs aren't pickled along with the problem; a copy sent to another
+    process starts its own programs when it is first used.
+
+    This relies on `select()` working with pipes, and so is not available on
+    Windows.
+
+    :param command: the program to run
+    :param maximize: True if larger fitnesses are better
+    :param args: command-line arguments for the program
+    :param num_processes: how many copies of the program to keep running
+    :param timeout: the most seconds to wait for each fitness, or `None` to
+        wait forever
+    :param protocol: the wire format, either `'text'` or `'binary'`
+    """
+    def __init__(self, command: str, maximize: bool, args: list = None,
+                 num_processes: int = 1, timeout: float = None,
+                 protocol: str = 'text'):
+        super().__init__(maximize=maximize)
+        if num_processes < 1:
+            raise ValueError(f"num_processes must be at least 1, but got {num_processes}.")
+        _check_protocol(protocol)
+        self.command = command
+        self.args = args[:] if args else []
+        self.num_processes = num_processes
+        self.timeout = timeout
+        self.protocol = protocol
+        self._processes = [None] * num_processes
+
+    def _start(self, i):
+        """Launch (or relaunch) the `i`th program."""
+        process = Popen([self.command] + self.args, stdin=PIPE, stdout=PIPE,
+                        bufsize=0)
+        os.set_blocking(process.stdin.fileno(), False)
+        os.set_blocking(process.stdout.fileno(), False)
+        self._processes[i] = process
+        return process
+
+    def _kill(self, i):
+        """Kill the `i`th program, so that it's relaunched when next needed."""
+        process = self._processes[i]
+        self._processes[i] = None
+        if process is not None:
+            process.kill()
+            process.wait()
+            process.stdin.close()
+            process.stdout.close()
+
+    def evaluate(self, phenome):
+        fitnesses = self.evaluate_multiple([ phenome ])
+        assert(len(fitnesses) == 1)
+        return fitnesses[0]
+
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        fitnesses = self._evaluate_frames(phenomes)
+        if self.protocol == 'binary':
+            fitnesses = [ _scalar_fitness(f, self.command) for f in fitnesses ]
+        return fitnesses
+
+    def evaluate_vectors(self, phenomes):
+        """ Evaluate phenomes with programs that write a binary frame of
+        several objectives for each.
+
+        :param phenomes: to be sent to the programs
+        :return: a list of float arrays, one per phenome, or NaN for each
+            phenome whose program failed
+        """
+        _check_vectors(self.protocol)
+        return [ f.astype(float) if isinstance(f, np.ndarray) else f
+                 for f in self._evaluate_frames(phenomes) ]
+
+    def _evaluate_frames(self, phenomes):
+        """Have the programs evaluate `phenomes`, returning their fitnesses
+        as floats, or, with the binary protocol, as the arrays that they
+        returned; phenomes whose program failed get NaN."""
+        def phenome_to_str(p):
+            return ','.join([ str(x) for x in p ])
+
+        fitnesses = [ nan ] * len(phenomes)
+
+        # Divide the phenomes as evenly as we can among the programs
+        shares = []
+        for i, indices in enumerate(np.array_split(np.arange(len(phenomes)),
+                                                   self.num_processes)):
+            if len(indices) == 0:
+                continue
+            process = self._processes[i]
+            if process is None or process.poll() is not None:
+                process = self._start(i)
+            if self.protocol == 'binary':
+                to_write = b''.join([ external.encode_array(phenomes[j]) for j in indices ])
+            else:
+                to_write = ''.join([ phenome_to_str(phenomes[j]) + '\n' for j in indices ]).encode()
+            logger.debug(f"Input to process {i}: {len(to_write)} bytes")
+            shares.append({ 'id': i, 'process': process, 'indices': list(indices),
+                            'to_write': to_write, 'received': b'',
+                            'num_done': 0 })
+
+        # Write phenomes and read fitnesses at the same time, so that neither a
+        # full stdin nor a full stdout pipe can deadlock us
+        with selectors.DefaultSelector() as selector:
+            now = time.monotonic()
+            for share in shares:
+                share['deadline'] = None if self.timeout is None else now + self.timeout
+                selector.register(share['process'].stdin, selectors.EVENT_WRITE, share)
+                selector.register(share['process'].stdout, selectors.EVENT_READ, share)
+
+            def fail(share, reason):
+                for stream in (share['process'].stdin, share['process'].stdout):
+                    if stream in selector.get_map():
+                        selector.unregister(stream)
+                self._kill(share['id'])
+                shares.remove(share)
+                warnings.warn(f"External process {self.command} {reason}; "
+                              f"restarting it, and assigning NaN fitness to the "
+                              f"{len(share['indices']) - share['num_done']} "
+                              f"phenomes it hadn't evaluated.", RuntimeWarning)
+
+            while shares:
+                deadlines = [ s['deadline'] for s in shares if s['deadline'] is not None ]
+                wait = None if not deadlines else max(0, min(deadlines) - time.monotonic())
+                for key, _ in selector.select(wait):
+                    share = key.data
+                    if share not in shares:
+                        continue  # Already failed during this round
+                    process = share['process']
+
+                    if key.fileobj is process.stdin:
+                        try:
+                            written = os.write(process.stdin.fileno(), share['to_write'][:65536])
+                        except BrokenPipeError:
+                            fail(share, 'exited before reading all its input')
+                            continue
+                        share['to_write'] = share['to_write'][written:]
+                        if not share['to_write']:
+                            selector.unregister(process.stdin)
+                        continue
+
+                    data = os.read(process.stdout.fileno(), 65536)
+                    if not data:
+                        fail(share, f"exited with code {process.wait()}")
+                        continue
+                    share['received'] += data
+                    try:
+                        if self.protocol == 'binary':
+                            results, share['received'] = external.decode_arrays(share['received'])
+                        else:
+                            *results, share['received'] = share['received'].split(b'\n')
+                            results = [ float(line) for line in results ]
+                        if share['num_done'] + len(results) > len(share['indices']):
+                            raise ValueError('more fitnesses than phenomes')
+                    except ValueError as e:
+                        fail(share, f"returned unexpected output ({e})")
+                        continue
+                    for fitness in results:
+                        fitnesses[share['indices'][share['num_done']]] = fitness
+                        share['num_done'] += 1
+                    if results and self.timeout is not None:
+                        share['deadline'] = time.monotonic() + self.timeout
+                    if share['num_done'] == len(share['indices']):
+                        selector.unregister(process.stdout)
+                        shares.remove(share)
+
+                now = time.monotonic()
+                for share in [ s for s in shares
+                               if s['deadline'] is not None and now >= s['deadline'] ]:
+                    fail(share, f"took longer than {self.timeout} seconds")
+
+        logger.debug(f"Fitnesses: {fitnesses}\n")
+
+        return fitnesses
+
+    def close(self):
+        """Shut down the programs by closing their stdin, killing any that
+        don't exit promptly."""
+        for i, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.stdin.close()
+            try:
+                process.wait(timeout=5)
+            except TimeoutExpired:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            self._processes[i] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        if hasattr(self, '_processes'):
+            self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_processes'] = [None] * self.num_processes
+        return state
+
+
 ####################################
 # Class FitnessOffsetProblem
 ####################################
@@ -376,6 +747,188 @@ class AverageFitnessProblem(Problem):
     def equivalent(self, first_fitness, second_fitness):
         return self.wrapped_problem.equivalent(first_fitness, second_fitness)
 
+########################
+# class CachedProblem
+########################
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class CachedProblem(Problem):
+    """Problem wrapper that remembers the fitnesses of the phenomes it has
+    evaluated, so that evaluating an identical phenome again costs a lookup
+    rather than a call to the wrapped problem.
+
+    This pays off whenever a run revisits the same phenomes, as with
+    unmutated clones, elites that are re-evaluated, and small binary or
+    integer search spaces, and especially when each evaluation is expensive
+    (as with an `ExternalProcessProblem`).  It must only wrap problems whose
+    fitness is a deterministic function of the phenome; cached fitnesses of a
+    noisy problem would never be resampled.
+
+    Phenomes are keyed by a hash of their bytes, and the `maxsize` most
+    recently used fitnesses are kept.  Exceptions are not cached.
+
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> p = CachedProblem(MaxOnes(), maxsize=100)
+    >>> p.evaluate(np.array([1, 0, 1]))
+    2
+    >>> p.evaluate_multiple([np.array([1, 0, 1]), np.array([1, 1, 1])])
+    [2, 3]
+    >>> p.cache_info()
+    CacheInfo(hits=1, misses=2, maxsize=100, currsize=2)
+
+    The cache isn't pickled along with the problem, so a copy sent to another
+    process (such as a dask worker) starts out empty.  The
+    `leap_ec.distrib.synchronous`, `leap_ec.distrib.asynchronous`, and
+    `leap_ec.distrib.executor` evaluators look fitnesses up on the client
+    side, and only send the misses out.
+
+    :param wrapped_problem: the problem whose fitnesses to cache
+    :param maxsize: the most fitnesses to keep, or `None` for no limit
+    """
+    def __init__(self, wrapped_problem, maxsize: int = 10_000):
+        super().__init__()
+        assert(wrapped_problem is not None)
+        assert(maxsize is None or maxsize > 0)
+        self.wrapped_problem = wrapped_problem
+        self.maxsize = maxsize
+        for attr in ('maximize', 'bounds'):
+            if hasattr(wrapped_problem, attr):
+                setattr(self, attr, getattr(wrapped_problem, attr))
+
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(phenome):
+        """:return: a hash of the phenome's bytes, used as its cache key
+
+        Numeric numpy arrays are hashed along with their dtype and shape;
+        anything else is pickled first.
+
+        >>> CachedProblem.key(np.array([1, 2])) == CachedProblem.key(np.array([1, 2]))
+        True
+        >>> CachedProblem.key(np.array([1, 2])) == CachedProblem.key(np.array([1.0, 2.0]))
+        False
+        """
+        if isinstance(phenome, np.ndarray) and phenome.dtype != object:
+            phenome = np.ascontiguousarray(phenome)
+            data = f'{phenome.dtype.str}{phenome.shape}'.encode() + phenome.tobytes()
+        else:
+            data = pickle.dumps(phenome, protocol=pickle.HIGHEST_PROTOCOL)
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def lookup(self, key):
+        """:return: the cached fitness for `key`, counting a hit
+        :raises KeyError: (and counts a miss) if it isn't cached
+        """
+        with self._lock:
+            try:
+                fitness = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return fitness
+
+    def store(self, key, fitness):
+        """Cache `fitness` under `key`, evicting the least recently used
+        fitness if the cache is full."""
+        with self._lock:
+            self._cache[key] = fitness
+            self._cache.move_to_end(key)
+            if self.maxsize is not None and len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def evaluate(self, phenome, *args, **kwargs):
+        """Return the cached fitness of `phenome`, or evaluate it with the
+        wrapped problem and cache the result."""
+        key = self.key(phenome)
+        try:
+            return self.lookup(key)
+        except KeyError:
+            fitness = self.wrapped_problem.evaluate(phenome, *args, **kwargs)
+            self.store(key, fitness)
+            return fitness
+
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """Look up all the phenomes, and pass the distinct ones that aren't
+        cached to the wrapped `evaluate_multiple()` in one group.
+
+        An `individuals` keyword argument, as passed by
+        `ops.grouped_evaluate()`, is cut down to match the phenomes that are
+        passed along.
+        """
+        keys = [self.key(p) for p in phenomes]
+        fitnesses = [None] * len(keys)
+        to_evaluate = {}  # Maps the key of each miss to its first index
+        for i, key in enumerate(keys):
+            if key in to_evaluate:
+                continue
+            try:
+                fitnesses[i] = self.lookup(key)
+            except KeyError:
+                to_evaluate[key] = i
+
+        if to_evaluate:
+            indices = list(to_evaluate.values())
+            if isinstance(phenomes, np.ndarray):
+                missed = phenomes[indices]
+            else:
+                missed = [phenomes[i] for i in indices]
+            if kwargs.get('individuals') is not None:
+                kwargs['individuals'] = [kwargs['individuals'][i] for i in indices]
+
+            new_fitnesses = self.wrapped_problem.evaluate_multiple(missed, *args, **kwargs)
+            for i, fitness in zip(indices, new_fitnesses):
+                fitnesses[i] = fitness
+                self.store(keys[i], fitness)
+
+        # Fill in the repeats of phenomes that were evaluated just now
+        for i, key in enumerate(keys):
+            if to_evaluate.get(key, i) != i:
+                fitnesses[i] = fitnesses[to_evaluate[key]]
+                with self._lock:
+                    self.hits += 1
+
+        return fitnesses
+
+    def cache_info(self):
+        """:return: the hits, misses, maxsize, and current size of the cache,
+        in the same form as `functools.lru_cache()`"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def worse_than(self, first_fitness, second_fitness):
+        return self.wrapped_problem.worse_than(first_fitness, second_fitness)
+
+    def equivalent(self, first_fitness, second_fitness):
+        return self.wrapped_problem.equivalent(first_fitness, second_fitness)
+
+    def __getstate__(self):
+        # Locks can't be pickled, and shipping the cache to every worker
+        # would cost more than it saves
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"{CachedProblem.__name__}({str(self.wrapped_problem)})"
+
 
 ##############################
 # Function concat_combine
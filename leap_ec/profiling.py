@@ -0,0 +1,320 @@
+"""
+    Opt-in instrumentation that shows where the time goes in an operator
+    pipeline.
+
+    Pipeline operators are mostly lazy generators, so with an ordinary
+    profiler the time spent in one stage is hard to tell apart from the time
+    spent in the stages it pulls individuals from.  A `PipelineProfiler`
+    wraps each stage of a pipeline, and charges each stage only for the time
+    spent in its own code, i.e. its *exclusive* time.  For every stage, and
+    every generation, it records
+
+    * `time`: the stage's exclusive wall time, in seconds,
+    * `pulled`: how many individuals it took from its input,
+    * `pushed`: how many individuals it passed on, and
+    * `allocated_blocks`: the net number of memory blocks it allocated (as
+      counted by `sys.getallocatedblocks()`, so this includes memory that is
+      freed again by later stages),
+
+    and it times the calls to the problem's `evaluate()` and
+    `evaluate_multiple()` separately, so you can see how much of the
+    evaluation stage is spent in the fitness function itself.
+
+    `generational_ea()` takes a `profiler`:
+
+    >>> from leap_ec.algorithm import generational_ea
+    >>> from leap_ec.binary_rep.problems import MaxOnes
+    >>> from leap_ec.binary_rep.initializers import create_binary_sequence
+    >>> from leap_ec.binary_rep.ops import mutate_bitflip
+    >>> from leap_ec.representation import Representation
+    >>> from leap_ec import ops
+    >>> profiler = PipelineProfiler()
+    >>> pop = generational_ea(max_generations=3, pop_size=10,
+    ...                       problem=MaxOnes(),
+    ...                       representation=Representation(
+    ...                           initialize=create_binary_sequence(length=10)),
+    ...                       pipeline=[ops.tournament_selection,
+    ...                                 ops.clone,
+    ...                                 mutate_bitflip(expected_num_mutations=1),
+    ...                                 ops.evaluate,
+    ...                                 ops.pool(size=10)],
+    ...                       profiler=profiler)
+
+    after which `table()` has a row for each stage in each generation:
+
+    >>> table = profiler.table()
+    >>> table[['generation', 'stage', 'name', 'pulled', 'pushed', 'evaluations']].head(5)
+       generation  stage                  name  pulled  pushed  evaluations
+    0           1      0  tournament_selection      10      10            0
+    1           1      1                 clone      10      10            0
+    2           1      2        mutate_bitflip      10      10            0
+    3           1      3              evaluate      10      10           10
+    4           1      4                  pool      10      10            0
+
+    and `summary()` totals them up over all generations.  Given a `stream`
+    or a `sink`, the profiler also writes these rows out at the end of each
+    generation, just as the CSV probes do.
+
+    To profile a pipeline that you drive yourself, pass it through `wrap()`,
+    evaluate inside a `with profiler.timing(problem):` block, and call
+    `end_generation()` at the end of each generation.
+"""
+import contextlib
+import csv
+import sys
+import time
+from typing import Iterator
+
+import pandas as pd
+
+from leap_ec.global_vars import context
+
+
+_columns = ['generation', 'stage', 'name', 'time', 'pulled', 'pushed',
+            'allocated_blocks', 'evaluations', 'evaluate_time']
+
+
+class _StageStats:
+    """The numbers recorded for one stage in one generation."""
+    __slots__ = ('time', 'pulled', 'pushed', 'allocated_blocks',
+                 'evaluations', 'evaluate_time')
+
+    def __init__(self):
+        self.time = 0.0
+        self.pulled = 0
+        self.pushed = 0
+        self.allocated_blocks = 0
+        self.evaluations = 0
+        self.evaluate_time = 0.0
+
+
+##############################
+# Class PipelineProfiler
+##############################
+class PipelineProfiler:
+    """ Records how much time, and how many individuals and allocations, each
+    stage of an operator pipeline accounts for in each generation.
+
+    :param stream: an optional file object to write the rows of each
+        generation to, as CSV
+    :param sink: an optional `leap_ec.sink.ColumnarSink` to write the rows
+        of each generation to
+    :param header: whether to write a CSV header to `stream` first
+    :param context: used to read the current generation, when
+        `end_generation()` isn't told it
+    """
+    def __init__(self, stream=None, sink=None, header=True, context=context):
+        self.stream = stream
+        self.sink = sink
+        self.context = context
+        self.names = []
+        self.rows = []
+
+        self._generation = [] # The stats of each stage this generation
+        self._active = []     # The stages whose code is currently running
+        self._mark = None
+        self._blocks_mark = None
+        self._evaluating = 0
+
+        self.writer = None
+        if stream is not None:
+            self.writer = csv.DictWriter(stream, fieldnames=_columns,
+                                         lineterminator='\n')
+            if header:
+                self.writer.writeheader()
+
+    def wrap(self, pipeline):
+        """ Wrap each stage of `pipeline` so that it's profiled.
+
+        Each wrapped stage is profiled as the stage at its position in the
+        pipeline, so only one pipeline should be wrapped per profiler.
+
+        :param pipeline: a list of pipeline operators
+        :return: a list of the wrapped operators, to be used in their place
+        """
+        self.names = [_stage_name(op) for op in pipeline]
+        self._generation = [_StageStats() for _ in pipeline]
+        return [_ProfiledStage(self, i, op) for i, op in enumerate(pipeline)]
+
+    @contextlib.contextmanager
+    def timing(self, problem):
+        """ A context manager that times the calls to `problem`'s `evaluate()`
+        and `evaluate_multiple()` methods while it's active.
+
+        These are charged to whichever stage makes the calls.  Only
+        evaluations in this process are seen, not ones made by distributed
+        workers.  The timed methods pickle as the originals, so `problem`
+        can still be pickled (by a checkpointer, say) while they're active.
+
+        :param problem: the problem whose evaluations are to be timed
+        """
+        originals = {name: problem.__dict__.get(name)
+                     for name in ('evaluate', 'evaluate_multiple')}
+        problem.evaluate = _TimedMethod(self, problem.evaluate, False)
+        problem.evaluate_multiple = _TimedMethod(
+            self, problem.evaluate_multiple, True)
+        try:
+            yield problem
+        finally:
+            for name, original in originals.items():
+                if original is None:
+                    delattr(problem, name)
+                else:
+                    setattr(problem, name, original)
+
+    def end_generation(self, generation=None):
+        """ Record the stats of the generation that just finished, write them
+        to the stream or sink, if any, and start on the next generation.
+
+        :param generation: the number of the generation that finished;
+            defaults to the one in the context
+        :return: the generation's rows
+        """
+        if generation is None:
+            generation = self.context['leap']['generation']
+
+        rows = []
+        for i, stats in enumerate(self._generation):
+            row = {'generation': generation, 'stage': i, 'name': self.names[i]}
+            row.update({name: getattr(stats, name)
+                        for name in _StageStats.__slots__})
+            rows.append(row)
+        self.rows.extend(rows)
+        self._generation = [_StageStats() for _ in self._generation]
+
+        if self.writer is not None:
+            self.writer.writerows(rows)
+        if self.sink is not None:
+            self.sink.write_rows(rows)
+        return rows
+
+    def table(self):
+        """:return: a DataFrame with a row for each stage in each generation"""
+        return pd.DataFrame(self.rows, columns=_columns)
+
+    def summary(self):
+        """:return: a DataFrame with the totals for each stage over all
+        generations, and the fraction of the total time spent in each"""
+        table = self.table()
+        summary = table.groupby(['stage', 'name'], sort=True)[_columns[3:]].sum()
+        total = summary['time'].sum()
+        summary['fraction_of_time'] = summary['time'] / total if total else 0.0
+        return summary.reset_index()
+
+    ##############################
+    # Exclusive timing
+    ##############################
+    def _enter(self, stats):
+        """Start charging time and allocations to `stats`, pausing the stage
+        that was running."""
+        now, blocks = time.perf_counter(), sys.getallocatedblocks()
+        if self._active:
+            self._charge(self._active[-1], now, blocks)
+        self._active.append(stats)
+        self._mark, self._blocks_mark = now, blocks
+
+    def _exit(self):
+        """Stop charging the current stage, and resume the one that called
+        it."""
+        now, blocks = time.perf_counter(), sys.getallocatedblocks()
+        self._charge(self._active.pop(), now, blocks)
+        self._mark, self._blocks_mark = now, blocks
+
+    def _charge(self, stats, now, blocks):
+        stats.time += now - self._mark
+        stats.allocated_blocks += blocks - self._blocks_mark
+
+    def _profile_iterator(self, iterator, stats):
+        """Charge the time spent producing each item of `iterator` to
+        `stats`."""
+        while True:
+            self._enter(stats)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            stats.pushed += 1
+            yield item
+
+
+class _ProfiledStage:
+    """A pipeline operator wrapped by `PipelineProfiler.wrap()`."""
+    def __init__(self, profiler, index, op):
+        self.profiler = profiler
+        self.index = index
+        self.op = op
+
+    def __call__(self, population):
+        profiler = self.profiler
+        stats = profiler._generation[self.index]
+
+        if isinstance(population, Iterator):
+            population = _count_pulled(population, stats)
+        elif hasattr(population, '__len__'):
+            stats.pulled += len(population)
+
+        profiler._enter(stats)
+        try:
+            result = self.op(population)
+        finally:
+            profiler._exit()
+
+        if isinstance(result, Iterator):
+            return profiler._profile_iterator(result, stats)
+        if hasattr(result, '__len__'):
+            stats.pushed += len(result)
+        return result
+
+
+class _TimedMethod:
+    """A problem's evaluation method, wrapped by `PipelineProfiler.timing()`
+    so that its calls are timed."""
+    def __init__(self, profiler, method, multiple):
+        self.profiler = profiler
+        self.method = method
+        self.multiple = multiple
+
+    def __call__(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler._evaluating or not profiler._active:
+            # Only time the outermost call, e.g. evaluate_multiple() and not
+            # the evaluate() calls that it makes
+            return self.method(*args, **kwargs)
+
+        profiler._evaluating += 1
+        start = time.perf_counter()
+        try:
+            return self.method(*args, **kwargs)
+        finally:
+            stats = profiler._active[-1]
+            stats.evaluate_time += time.perf_counter() - start
+            if self.multiple:
+                stats.evaluations += len(args[0]) if args else 0
+            else:
+                stats.evaluations += 1
+            profiler._evaluating -= 1
+
+    def __reduce__(self):
+        # Pickle as the untimed method, so that a problem pickled while it's
+        # being timed doesn't take the profiler (and its stream) along
+        return _untimed, (self.method,)
+
+
+def _untimed(method):
+    return method
+
+
+def _count_pulled(iterator, stats):
+    for item in iterator:
+        stats.pulled += 1
+        yield item
+
+
+def _stage_name(op):
+    """:return: a readable name for a pipeline operator"""
+    name = getattr(op, '__name__', None)
+    if name is None:
+        name = getattr(getattr(op, 'func', None), '__name__', None)
+    return name if name is not None else type(op).__name__
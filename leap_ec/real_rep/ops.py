@@ -9,7 +9,8 @@ from typing import Iterator, List, Tuple, Union
 import numpy as np
 
 from leap_ec.util import wrap_curry
-from leap_ec.ops import compute_expected_probability, iteriter_op, random_bernoulli_vector
+from leap_ec.ops import compute_expected_probability, iteriter_op, listlist_op, random_bernoulli_vector
+from leap_ec.population import genome_matrix, set_genomes
 
 
 ##############################
@@ -139,6 +140,75 @@ def genome_mutate_gaussian(genome,
     return genome
 
 
+##############################
+# Function batch_mutate_gaussian
+##############################
+@wrap_curry
+@listlist_op
+def batch_mutate_gaussian(population: List,
+                          std,
+                          expected_num_mutations: Union[int, str] = None,
+                          bounds=(-math.inf, math.inf),
+                          transform_slope: float = 1.0,
+                          transform_intercept: float = 0.0) -> List:
+    """Mutate a whole batch of individuals with a real-valued representation
+    at once.
+
+    This is a vectorized counterpart of :py:func:`mutate_gaussian` that
+    operates on a list (or :py:class:`~leap_ec.population.Population`) of
+    individuals instead of an iterator.  One Bernoulli mask is drawn for all
+    the genes of the batch, and one normal sample for all the selected genes,
+    so each gene is mutated with the same distribution as with
+    `mutate_gaussian`, without per-individual RNG calls.
+
+    All the genomes must be numpy arrays of the same length:
+
+    >>> from leap_ec.individual import Individual
+    >>> import numpy as np
+    >>> pop = [Individual(np.array([1.0, 0.0])), Individual(np.array([0.5, 0.5]))]
+    >>> pop = batch_mutate_gaussian(pop, std=[0.5, 1.0],
+    ...                             expected_num_mutations='isotropic',
+    ...                             bounds=[(-1, 1), (-10, 10)])
+    >>> len(pop)
+    2
+
+    :param population: the individuals to mutate (usually clones)
+    :param std: standard deviation to be equally applied to all individuals;
+        this can be a scalar value or a "shadow vector" of standard deviations
+    :param expected_num_mutations: if an int, the *expected* number of mutations per
+        individual, on average.  If 'isotropic', all genes will be mutated.
+    :param bounds: to clip for mutations; defaults to (- ∞, ∞)
+    :return: the mutated population
+    """
+    if expected_num_mutations is None:
+        raise ValueError("No value given for expected_num_mutations.  Must be either a float or the string 'isotropic'.")
+    assert(std is not None)
+    assert(isinstance(std, Iterable) or (std >= 0.0))
+
+    genomes = genome_matrix(population)
+
+    if expected_num_mutations == 'isotropic':
+        p = 1.0
+    else:
+        p = compute_expected_probability(expected_num_mutations, genomes[0])
+
+    indices_to_mutate = random_bernoulli_vector(shape=genomes.shape, p=p)
+
+    std = np.asarray(std)
+    std_selected = std if std.ndim == 0 \
+        else np.broadcast_to(std, genomes.shape)[indices_to_mutate]
+
+    genomes[indices_to_mutate] = transform_slope * (
+                                    genomes[indices_to_mutate]
+                                    + np.random.normal(size=np.count_nonzero(indices_to_mutate))
+                                    * std_selected) \
+                                 + transform_intercept
+    genomes[:] = apply_hard_bounds(genomes, bounds)
+
+    set_genomes(population, genomes)
+    return population
+
+
 ##############################
 # Function apply_hard_bounds
 ##############################
@@ -16,6 +16,38 @@ from leap_ec.problem import FitnessOffsetProblem, ScalarProblem
 from leap_ec import Individual
 
 
+##############################
+# Function phenome_matrix
+##############################
+def phenome_matrix(phenomes):
+    """Arrange a batch of real-valued phenomes into an `(n, d)` matrix, so
+    that a problem's `evaluate_multiple()` can compute all of their fitnesses
+    in a single vectorized pass.
+
+    A batch that is already a 2-D numpy array is returned as-is (without
+    copying):
+
+    >>> X = np.array([[0.5, 0.8], [1.5, 0.0]])
+    >>> phenome_matrix(X) is X
+    True
+
+    Otherwise the phenomes are stacked:
+
+    >>> phenome_matrix([np.array([0.5, 0.8]), np.array([1.5, 0.0])])
+    array([[0.5, 0.8],
+           [1.5, 0. ]])
+
+    :param phenomes: a 2-D array, or a sequence of equal-length phenomes
+    :return: a 2-D numpy array with one phenome per row
+    """
+    matrix = np.asarray(phenomes)
+    if matrix.ndim != 2:
+        raise ValueError(("Expected a batch of equal-length phenomes that "
+                          "forms a 2-D matrix, but got an array of shape "
+                          f"{matrix.shape}."))
+    return matrix
+
+
 ##############################
 # Class SpheroidProblem
 ##############################
@@ -62,6 +94,21 @@ class SpheroidProblem(ScalarProblem):
             return np.sum(phenome ** 2)
         return sum([x ** 2 for x in phenome])
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass:
+
+        >>> phenomes = np.array([[0.5, 0.8, 1.5], [1.0, 1.0, 1.0]])
+        >>> SpheroidProblem().evaluate_multiple(phenomes)
+        array([3.14, 3.  ])
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        return np.sum(X ** 2, axis=1)
+
     def worse_than(self, first_fitness, second_fitness):
         """
         We minimize by default:
@@ -76,6 +123,9 @@ class SpheroidProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -138,6 +188,18 @@ class RastriginProblem(ScalarProblem):
             len(phenome) + sum([x ** 2 - self.a *
                                 np.cos(2 * np.pi * x) for x in phenome])
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        return self.a * X.shape[1] + \
+            np.sum(X ** 2 - self.a * np.cos(2 * np.pi * X), axis=1)
+
     def worse_than(self, first_fitness, second_fitness):
         """
         We minimize by default:
@@ -152,6 +214,9 @@ class RastriginProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -214,6 +279,19 @@ class RosenbrockProblem(ScalarProblem):
             sum += 100 * (x_p - x ** 2) ** 2 + (x - 1) ** 2
         return sum
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        x_p = X[:, 1:]
+        x = X[:, :-1]
+        return np.sum(100 * (x_p - x ** 2) ** 2 + (x - 1) ** 2, axis=1)
+
     def worse_than(self, first_fitness, second_fitness):
         """
         We minimize by default:
@@ -228,6 +306,9 @@ class RosenbrockProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -298,6 +379,9 @@ class StepProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -367,6 +451,9 @@ class NoisyQuarticProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -461,6 +548,9 @@ class ShekelProblem(ScalarProblem):
         """
         return super().worse_than(first_fitness, second_fitness)
 
+    def ordering_key(self, fitnesses):
+        return super().ordering_key(fitnesses)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -521,6 +611,20 @@ class GriewankProblem(ScalarProblem):
         t2 = np.prod(np.cos(phenome / i_vector))
         return t1 - t2 + 1
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        t1 = np.sum(np.power(X, 2) / 4000, axis=1)
+        i_vector = np.sqrt(np.arange(1, X.shape[1] + 1))
+        t2 = np.prod(np.cos(X / i_vector), axis=1)
+        return t1 - t2 + 1
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -580,6 +684,21 @@ class AckleyProblem(ScalarProblem):
         t2 = np.exp(1.0 / d * np.sum(np.cos(self.c * phenome)))
         return t1 - t2 + self.a + np.e
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        d = X.shape[1]
+        t1 = -self.a * np.exp(-self.b * np.sqrt(1.0 / d *
+                                                np.sum(np.power(X, 2), axis=1)))
+        t2 = np.exp(1.0 / d * np.sum(np.cos(self.c * X), axis=1))
+        return t1 - t2 + self.a + np.e
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -650,6 +769,26 @@ class WeierstrassProblem(ScalarProblem):
         result = result - len(phenome) * t2
         return result
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        The Fourier terms are expanded along a third axis, so this uses
+        :math:`O(n \\cdot d \\cdot kmax)` memory.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        k = np.arange(self.kmax)
+        a_k = self.a ** k
+        b_k = self.b ** k
+        t1 = np.sum(a_k * np.cos(2 * np.pi * b_k * (X[:, :, np.newaxis] + 0.5)),
+                    axis=(1, 2))
+        t2 = np.sum(a_k * np.cos(np.pi * b_k))
+        return t1 - X.shape[1] * t2
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -744,6 +883,24 @@ class LangermannProblem(ScalarProblem):
                       * np.cos(np.pi * np.sum((phenome - self.a[i]) ** 2))
         return result
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        if X.shape[1] != self.a.shape[1]:
+            raise ValueError(
+                f"Received {X.shape[1]}-dimensional phenomes, but this is a {self.a.shape[1]}-dimensional Langerman function.")
+        # Squared distance from every phenome to every term's offset: (n, m)
+        sq_dists = np.sum((X[:, np.newaxis, :] - self.a[:self.m]) ** 2, axis=2)
+        terms = self.c[:self.m] * np.exp(-1.0 / np.pi * sq_dists) \
+            * np.cos(np.pi * sq_dists)
+        return -np.sum(terms, axis=1)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -840,6 +997,24 @@ class LunacekProblem(ScalarProblem):
         sinusoid = 10 * np.sum(1 - np.cos(2 * np.pi * (phenome - self.mu_1)))
         return min(sphere1, sphere2) + sinusoid
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        if X.shape[1] != self.N:
+            warnings.warn(
+                f"Phenomes have length {X.shape[1]}, but this function expected {self.N}-dimensional input.")
+        sphere1 = np.sum((X - self.mu_1)**2, axis=1)
+        sphere2 = self.d * X.shape[1] + self.s * \
+            np.sum((X - self.mu_2)**2, axis=1)
+        sinusoid = 10 * np.sum(1 - np.cos(2 * np.pi * (X - self.mu_1)), axis=1)
+        return np.minimum(sphere1, sphere2) + sinusoid
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -899,6 +1074,18 @@ class SchwefelProblem(ScalarProblem):
         return np.sum(-phenome * np.sin(np.sqrt(np.abs(phenome)))
                       ) + self.alpha * len(phenome)
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        return np.sum(-X * np.sin(np.sqrt(np.abs(X))), axis=1) \
+            + self.alpha * X.shape[1]
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -1026,6 +1213,21 @@ class CosineFamilyProblem(ScalarProblem):
         value = np.sum(term1 + term2) / (2 * self.dimensions)
         return value
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Computes the function values of a whole batch of phenomes in one
+        vectorized pass.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        term1 = -np.cos((self.global_optima_counts - 1) * 2 * np.pi * X)
+        term2 = - self.alpha * \
+            np.cos((self.global_optima_counts - 1) * 2 *
+                   np.pi * self.local_optima_counts * X)
+        return np.sum(term1 + term2, axis=1) / (2 * self.dimensions)
+
     def __str__(self):
         """Returns the name of the class.
 
@@ -1328,6 +1530,25 @@ class TranslatedProblem(ScalarProblem):
         new_phenome = phenome - self.offset
         return self.problem.evaluate(new_phenome)
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Translate a whole batch of phenomes at once, and pass them on to the
+        wrapped problem's `evaluate_multiple()`:
+
+        >>> import numpy as np
+        >>> t_sphere = TranslatedProblem(SpheroidProblem(), offset=[1.0, 1.0])
+        >>> t_sphere.evaluate_multiple(np.array([[1.0, 1.0], [0.0, 3.0]]))
+        array([0., 5.])
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        assert (X.shape[1] == len(self.offset)), \
+            f"Tried to evalute {X.shape[1]}-D genomes in a " \
+            f"{len(self.offset)}-D fitness function. "
+        return self.problem.evaluate_multiple(X - self.offset, *args, **kwargs)
+
     def __str__(self):
         """Returns the name of this class, followed by the `__str__ of the wrapped class
         in parentheses.
@@ -1367,6 +1588,20 @@ class ScaledProblem(ScalarProblem):
         assert (len(transformed_phenome) == len(phenome))
         return self.problem.evaluate(transformed_phenome)
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Rescale a whole batch of phenomes at once, and pass them on to the
+        wrapped problem's `evaluate_multiple()`.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        transformed = self.old_bounds[0] + (X - self.bounds[0]) / (
+                          self.bounds[1] - self.bounds[0]) \
+            * (self.old_bounds[1] - self.old_bounds[0])
+        return self.problem.evaluate_multiple(transformed, *args, **kwargs)
+
     def __str__(self):
         """Returns the name of this class, followed by the `__str__ of the wrapped class
         in parentheses.
@@ -1560,6 +1795,21 @@ class MatrixTransformedProblem(ScalarProblem):
         new_point = np.matmul(self.matrix, phenome)
         return self.problem.evaluate(new_point)
 
+    def evaluate_multiple(self, phenomes, *args, **kwargs):
+        """
+        Transform a whole batch of phenomes with a single matrix product, and
+        pass them on to the wrapped problem's `evaluate_multiple()`.
+
+        :param phenomes: an `(n, d)` matrix (or sequence) of phenomes
+        :return: a vector of n fitnesses
+        """
+        X = phenome_matrix(phenomes)
+        assert (X.shape[1] == len(self.matrix)), \
+            f"Tried to evalute {X.shape[1]}-D genomes in a " \
+            f"{len(self.matrix)}-D fitness function. "
+        # Applying the matrix to each row x is x @ matrix.T
+        return self.problem.evaluate_multiple(X @ self.matrix.T, *args, **kwargs)
+
     def __str__(self):
         """Returns the name of this class, followed by the `__str__ of the wrapped class
         in parentheses.
@@ -0,0 +1,554 @@
+"""
+    Columnar binary sinks that probes can log to instead of CSV text streams.
+
+    `FitnessStatsCSVProbe` and `AttributesCSVProbe` normally format every
+    value they record (including whole genomes, with `do_genome=True`) as
+    text, and write it to their `stream` a little at a time.  For large
+    populations that can take longer than the run itself, and so can parsing
+    the resulting CSV files back in for analysis.  Given a `sink` instead, they
+    hand it rows of raw values, which it buffers in memory and writes out in
+    large batches of typed columns:
+
+    * `ParquetSink` writes a Parquet file, one row group per batch,
+    * `ArrowSink` writes an Arrow IPC (a.k.a. Feather v2) file, and
+    * `HDF5Sink` writes an HDF5 file, with one resizable dataset per column.
+
+    Genomes, and other fixed-length numpy arrays such as multi-objective
+    fitnesses, are stored as fixed-width columns of their numeric type rather
+    than as strings.  `ParquetSink` and `ArrowSink` require `pyarrow`, and
+    `HDF5Sink` requires `h5py`.
+
+    A sink must be closed when you are done with it, to flush its last batch
+    and finish the file, so it's easiest to use one as a context manager.
+    `read_dataframe()` loads the results back in as a pandas DataFrame:
+
+    >>> import os, tempfile
+    >>> import numpy as np
+    >>> path = os.path.join(tempfile.mkdtemp(), 'genomes.parquet')
+    >>> with open_sink(path) as sink:
+    ...     sink.write_rows([{'step': 0, 'genome': np.array([0, 1, 1])},
+    ...                      {'step': 1, 'genome': np.array([1, 1, 1])}])
+    >>> read_dataframe(path)
+       step     genome
+    0     0  [0, 1, 1]
+    1     1  [1, 1, 1]
+
+    Writing to a slow file system, such as a network or parallel file system,
+    can also stall the evolutionary loop, since probes write inline in the
+    pipeline.  `BackgroundWriter` wraps either a text stream or a sink, and
+    hands the writes over to a background thread through a bounded queue.
+"""
+import atexit
+import importlib
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+##############################
+# Function _require
+##############################
+def _require(module_name, cls):
+    """Import an optional dependency, with a helpful error if it's missing."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"{cls.__name__} requires the optional '{module_name.split('.')[0]}' package; "
+                          f"please install it to use this sink.") from e
+
+
+##############################
+# Class ColumnarSink
+##############################
+class ColumnarSink:
+    """ Base class for sinks that buffer rows in memory and write them out as
+    batches of columns.
+
+    Every row must have the same keys, which become the column names, in the
+    order of the first row.  Subclasses implement `_write_columns()`, which
+    is given a dict mapping each column name to a numpy array with one entry
+    (or, for array-valued columns, one row) per buffered row, and
+    `_close()`.
+
+    :param path: of the file to write
+    :param buffer_rows: how many rows to buffer before writing them out as a
+        batch
+    """
+    def __init__(self, path, buffer_rows: int = 10_000):
+        assert(buffer_rows > 0)
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.names = None
+        self.closed = False
+        self._columns = None
+        self._num_rows = 0
+
+    def write_row(self, row: dict):
+        """ Buffer one row, writing out a batch if the buffer is full.
+
+        :param row: a dict mapping column names to values
+        """
+        self.write_rows([row])
+
+    def write_rows(self, rows):
+        """ Buffer several rows, writing out a batch if the buffer is full.
+
+        :param rows: an iterable of dicts mapping column names to values
+        """
+        if self.closed:
+            raise ValueError(f"Cannot write to a closed {type(self).__name__}.")
+
+        for row in rows:
+            if self._columns is None:
+                self.names = list(row.keys())
+                self._columns = {name: [] for name in self.names}
+            elif row.keys() != self._columns.keys():
+                raise ValueError(f"Expected a row with columns {self.names}, but got {list(row.keys())}.")
+
+            # Copy arrays, which may be views (e.g. of a `Population`'s
+            # genome matrix) that change before the batch is written
+            for name in self.names:
+                value = row[name]
+                if isinstance(value, np.ndarray):
+                    value = value.copy()
+                self._columns[name].append(value)
+            self._num_rows += 1
+
+        if self._num_rows >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Write out any buffered rows as a batch."""
+        if self._num_rows == 0:
+            return
+
+        columns = {name: _to_array(name, values)
+                   for name, values in self._columns.items()}
+        self._write_columns(columns)
+
+        for values in self._columns.values():
+            values.clear()
+        self._num_rows = 0
+
+    def close(self):
+        """Write out any buffered rows and finish the file."""
+        if self.closed:
+            return
+        self.flush()
+        self._close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_columns(self, columns: dict):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+def _to_array(name, values):
+    """Turn a buffered column into an array, stacking any array values into
+    the rows of a matrix."""
+    try:
+        array = np.asarray(values)
+    except ValueError as e:
+        raise ValueError(f"The values in column '{name}' must all have the same shape.") from e
+    if array.dtype == object:
+        raise ValueError(f"Column '{name}' holds values of type {type(values[0]).__name__}, "
+                         f"which can't be stored in a columnar sink.")
+    return array
+
+
+##############################
+# Class ParquetSink
+##############################
+class ParquetSink(ColumnarSink):
+    """ Writes rows to a Parquet file, with each batch of rows as a row group.
+
+    This requires the `pyarrow` package.
+
+    :param path: of the file to write
+    :param buffer_rows: how many rows to buffer into each row group
+    :param compression: the Parquet compression codec to use
+    """
+    def __init__(self, path, buffer_rows: int = 10_000, compression='snappy'):
+        super().__init__(path, buffer_rows)
+        self._pq = _require('pyarrow.parquet', type(self))
+        self.compression = compression
+        self._writer = None
+
+    def _write_columns(self, columns):
+        table = _arrow_table(columns)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema,
+                                                  compression=self.compression)
+        self._writer.write_table(table)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+##############################
+# Class ArrowSink
+##############################
+class ArrowSink(ColumnarSink):
+    """ Writes rows to an Arrow IPC file, with each batch of rows as a record
+    batch.
+
+    This requires the `pyarrow` package.
+
+    :param path: of the file to write
+    :param buffer_rows: how many rows to buffer into each record batch
+    """
+    def __init__(self, path, buffer_rows: int = 10_000):
+        super().__init__(path, buffer_rows)
+        self._ipc = _require('pyarrow.ipc', type(self))
+        self._writer = None
+
+    def _write_columns(self, columns):
+        table = _arrow_table(columns)
+        if self._writer is None:
+            self._writer = self._ipc.new_file(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _arrow_table(columns):
+    """Build an Arrow table, turning matrix columns into fixed-size lists."""
+    import pyarrow as pa
+
+    arrays = []
+    for array in columns.values():
+        if array.ndim == 1:
+            arrays.append(pa.array(array))
+        else:
+            width = int(np.prod(array.shape[1:]))
+            arrays.append(pa.FixedSizeListArray.from_arrays(
+                pa.array(array.reshape(-1)), width))
+    return pa.Table.from_arrays(arrays, names=list(columns.keys()))
+
+
+##############################
+# Class HDF5Sink
+##############################
+class HDF5Sink(ColumnarSink):
+    """ Writes rows to an HDF5 file, with each column as a dataset that grows
+    by one batch of rows at a time.
+
+    This requires the `h5py` package.
+
+    :param path: of the file to write
+    :param buffer_rows: how many rows to buffer before appending them to the
+        datasets
+    :param compression: the HDF5 compression filter to use, if any
+    """
+    def __init__(self, path, buffer_rows: int = 10_000, compression=None):
+        super().__init__(path, buffer_rows)
+        self._h5py = _require('h5py', type(self))
+        self.compression = compression
+        self._file = None
+
+    def _write_columns(self, columns):
+        if self._file is None:
+            self._file = self._h5py.File(self.path, 'w')
+            # Remember the column order, which HDF5 doesn't keep
+            self._file.attrs['columns'] = list(columns.keys())
+
+        for name, array in columns.items():
+            if array.dtype.kind == 'U':
+                array = array.astype(object)
+                dtype = self._h5py.string_dtype()
+            else:
+                dtype = array.dtype
+
+            if name not in self._file:
+                self._file.create_dataset(name, data=array, dtype=dtype,
+                                          maxshape=(None,) + array.shape[1:],
+                                          chunks=True,
+                                          compression=self.compression)
+            else:
+                dataset = self._file[name]
+                start = dataset.shape[0]
+                dataset.resize(start + len(array), axis=0)
+                dataset[start:] = array
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+##############################
+# Function open_sink
+##############################
+_extensions = {
+    '.parquet': ParquetSink,
+    '.pq': ParquetSink,
+    '.arrow': ArrowSink,
+    '.feather': ArrowSink,
+    '.ipc': ArrowSink,
+    '.h5': HDF5Sink,
+    '.hdf5': HDF5Sink,
+}
+
+
+def open_sink(path, **kwargs):
+    """ Create the right kind of sink for `path`'s file extension.
+
+    The extensions `.parquet` and `.pq` give a `ParquetSink`; `.arrow`,
+    `.feather`, and `.ipc` give an `ArrowSink`; and `.h5` and `.hdf5` give an
+    `HDF5Sink`.
+
+    :param path: of the file to write
+    :param kwargs: passed on to the sink's constructor
+    :return: the new sink
+    """
+    return _sink_class(path)(path, **kwargs)
+
+
+def _sink_class(path):
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in _extensions:
+        raise ValueError(f"Unrecognized extension '{extension}' for a columnar sink; "
+                         f"expected one of {sorted(_extensions)}.")
+    return _extensions[extension]
+
+
+##############################
+# Function read_dataframe
+##############################
+def read_dataframe(path):
+    """ Read a file written by one of the sinks into a pandas DataFrame.
+
+    Array-valued columns, such as genomes, come back as columns of numpy
+    arrays.
+
+    :param path: of a file written by a sink, with the extension it was
+        written with
+    :return: a DataFrame with a column for each of the sink's columns
+    """
+    cls = _sink_class(path)
+    if cls is ParquetSink:
+        pq = _require('pyarrow.parquet', cls)
+        return pq.read_table(path).to_pandas()
+    elif cls is ArrowSink:
+        ipc = _require('pyarrow.ipc', cls)
+        with ipc.open_file(path) as reader:
+            return reader.read_all().to_pandas()
+    else:
+        h5py = _require('h5py', cls)
+        with h5py.File(path, 'r') as f:
+            data = {}
+            for name in f.attrs['columns']:
+                array = f[name][()]
+                if array.dtype == object:
+                    array = array.astype(str)
+                data[name] = list(array) if array.ndim > 1 else array
+            return pd.DataFrame(data)
+
+
+##############################
+# Class BackgroundWriter
+##############################
+_FLUSH = object()
+_STOP = object()
+
+
+class BackgroundWriter:
+    r""" Hands writes to a text stream or a sink over to a background thread,
+    so that the algorithm doesn't have to wait on slow I/O.
+
+    A `BackgroundWriter` has the `write()` and `flush()` methods of a text
+    stream, and the `write_row()` and `write_rows()` methods of a sink, so it
+    can be passed as the `stream` or `sink` of any probe, including
+    `distrib.probe.log_worker_location()` and `distrib.probe.log_pop()`, in
+    place of the object it wraps:
+
+    >>> import io
+    >>> stream = io.StringIO()
+    >>> with BackgroundWriter(stream) as writer:
+    ...     _ = writer.write('step, bsf\n')
+    ...     _ = writer.write('0, 4\n')
+    >>> print(stream.getvalue())
+    step, bsf
+    0, 4
+    <BLANKLINE>
+
+    The writes wait in a queue of at most `maxsize` items.  If the
+    background thread falls that far behind, what happens next depends on
+    `policy`:
+
+    * `'block'` waits for room in the queue, so nothing is lost,
+    * `'drop'` discards new writes until there is room again, and
+    * `'sample'` keeps only every `sample_every`'th new write (waiting for
+      room for it), and discards the rest, so the log thins out rather than
+      having gaps.
+
+    `dropped` counts the writes that were discarded.  Each call to `write()`
+    or `write_row()` is kept or discarded as a whole, so CSV rows written by
+    the probes are never split.
+
+    `flush()` doesn't wait: it asks the background thread to flush the target
+    as soon as it has caught up with the queue.  `drain()` waits until
+    everything queued so far has been written, and `close()` (which is also
+    called at exit, if you don't call it first) drains the queue, flushes the
+    target, and stops the thread.  Any exception raised by the target is
+    raised again by the next call in the algorithm's thread.
+
+    :param target: a text stream, or a sink such as a `ParquetSink`
+    :param maxsize: how many writes can be waiting in the queue
+    :param policy: what to do when the queue is full: `'block'`, `'drop'`, or
+        `'sample'`
+    :param sample_every: with the `'sample'` policy, keep one in this many
+        writes while the queue is full
+    :param close_target: if True, `close()` closes `target` too
+    """
+    policies = ('block', 'drop', 'sample')
+
+    def __init__(self, target, maxsize: int = 10_000, policy: str = 'block',
+                 sample_every: int = 10, close_target: bool = False):
+        if policy not in self.policies:
+            raise ValueError(f"Unrecognized policy '{policy}'; expected one of {self.policies}.")
+        assert(maxsize > 0)
+        assert(sample_every > 0)
+
+        self.target = target
+        self.policy = policy
+        self.sample_every = sample_every
+        self.close_target = close_target
+        self.dropped = 0
+        self.closed = False
+
+        self._queue = queue.Queue(maxsize)
+        self._num_full = 0
+        self._flush_pending = False
+        self._unflushed = False
+        self._error = None
+
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=type(self).__name__)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, text):
+        """ Queue `text` to be written to the target stream.
+
+        :return: the length of `text`, like a stream's `write()`
+        """
+        self._put(('write', text))
+        return len(text)
+
+    def write_row(self, row: dict):
+        """ Queue a row for the target sink. """
+        self._put(('write_row', _snapshot(row)))
+
+    def write_rows(self, rows):
+        """ Queue rows for the target sink. """
+        self._put(('write_rows', [_snapshot(row) for row in rows]))
+
+    def flush(self):
+        """ Ask for the target to be flushed once everything that's queued so
+        far has been written, without waiting for it. """
+        self._check()
+        try:
+            self._queue.put_nowait((_FLUSH, None))
+        except queue.Full:
+            # The writer thread will flush once it has caught up
+            self._flush_pending = True
+
+    def drain(self):
+        """ Wait until everything that's queued so far has been written. """
+        self._check()
+        self._queue.join()
+        self._check()
+
+    def close(self):
+        """ Write everything that's queued, flush the target, and stop the
+        background thread. """
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+
+        self._flush_pending = True
+        self._queue.put((_STOP, None))
+        self._thread.join()
+
+        if self.close_target and self._error is None:
+            self.target.close()
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _check(self):
+        """Raise any exception from the writer thread here."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _put(self, item):
+        self._check()
+        if self.closed:
+            raise ValueError(f"Cannot write to a closed {type(self).__name__}.")
+
+        if self.policy == 'block':
+            self._queue.put(item)
+            return
+
+        try:
+            self._queue.put_nowait(item)
+            self._num_full = 0
+        except queue.Full:
+            self._num_full += 1
+            if self.policy == 'sample' and self._num_full % self.sample_every == 0:
+                self._queue.put(item)
+            else:
+                self.dropped += 1
+
+    def _run(self):
+        """The background thread, which writes whatever is queued."""
+        while True:
+            method, arg = self._queue.get()
+            try:
+                if method is _FLUSH:
+                    self._flush_pending = True
+                elif method is not _STOP and self._error is None:
+                    getattr(self.target, method)(arg)
+                    self._unflushed = True
+
+                # Flush once we've caught up, so that several flushes are
+                # coalesced, and batching sinks aren't flushed needlessly
+                if self._flush_pending and self._queue.empty():
+                    self._flush_pending = False
+                    if self._unflushed and self._error is None:
+                        self._unflushed = False
+                        self.target.flush()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+            if method is _STOP:
+                return
+
+
+def _snapshot(row):
+    """Copy any numpy arrays in a row, in case the algorithm changes them
+    before they're written."""
+    return {name: value.copy() if isinstance(value, np.ndarray) else value
+            for name, value in row.items()}
@@ -0,0 +1,32 @@
+"""Shared fixtures for the benchmark suite.
+
+The benchmarks need the `pytest-benchmark` plugin, and are skipped without
+it.  Run them with `make benchmark`, which saves the results as JSON so that
+they can be compared from one release to the next.
+"""
+import random
+
+import numpy as np
+import pytest
+
+try:
+    import pytest_benchmark
+except ImportError:
+    collect_ignore_glob = ['test_*.py']
+
+
+# The population sizes and genome lengths that the benchmarks sweep over
+POP_SIZES = [100, 1000]
+GENOME_LENGTHS = [10, 100]
+
+
+@pytest.fixture(autouse=True)
+def seeded_random_state():
+    """Seed the random number generators, so that every benchmark measures
+    the same work from one run to the next, and put them back afterwards."""
+    random_state, numpy_random_state = random.getstate(), np.random.get_state()
+    random.seed(42)
+    np.random.seed(42)
+    yield
+    random.setstate(random_state)
+    np.random.set_state(numpy_random_state)
@@ -0,0 +1,36 @@
+"""End-to-end benchmark of a whole (small) generational EA run."""
+import pytest
+
+from leap_ec import ops
+from leap_ec.algorithm import generational_ea
+from leap_ec.real_rep.initializers import create_real_vector
+from leap_ec.real_rep.ops import mutate_gaussian
+from leap_ec.real_rep.problems import SpheroidProblem
+from leap_ec.representation import Representation
+from .conftest import GENOME_LENGTHS
+
+
+pytestmark = pytest.mark.benchmark(group='algorithm')
+
+
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', [10, 100])
+def test_generational_ea_spheroid(benchmark, pop_size, length):
+    bounds = [(-5.12, 5.12)] * length
+
+    def run():
+        return generational_ea(
+            max_generations=10, pop_size=pop_size,
+            problem=SpheroidProblem(maximize=False),
+            representation=Representation(
+                initialize=create_real_vector(bounds=bounds)),
+            pipeline=[ops.tournament_selection,
+                      ops.clone,
+                      mutate_gaussian(std=0.1, expected_num_mutations=1,
+                                      bounds=bounds),
+                      ops.UniformCrossover(),
+                      ops.evaluate,
+                      ops.pool(size=pop_size)])
+
+    final_pop = benchmark(run)
+    assert len(final_pop) == pop_size
@@ -0,0 +1,65 @@
+"""Benchmarks for decoding genomes, and for executing the phenotypes of the
+executable representations."""
+import numpy as np
+import pytest
+
+from leap_ec.binary_rep.decoders import BinaryToRealDecoder
+from leap_ec.executable_rep import cgp
+from .conftest import GENOME_LENGTHS
+
+
+pytestmark = pytest.mark.benchmark(group='executable')
+
+NUM_CALLS = 100  # How many inputs each executable is run on per round
+
+
+##############################
+# Decoders
+##############################
+@pytest.mark.parametrize('bits_per_segment', [8, 32])
+@pytest.mark.parametrize('num_segments', GENOME_LENGTHS)
+def test_binary_to_real_decoder(benchmark, num_segments, bits_per_segment):
+    decoder = BinaryToRealDecoder(
+        *[(bits_per_segment, -5.12, 5.12)] * num_segments)
+    genome = np.random.randint(0, 2, num_segments * bits_per_segment)
+    phenome = benchmark(decoder.decode, genome)
+    assert len(phenome) == num_segments
+
+
+##############################
+# Executables
+##############################
+@pytest.mark.parametrize('nodes_per_layer', [4, 16])
+@pytest.mark.parametrize('num_layers', [4, 16])
+def test_cgp_executable(benchmark, num_layers, nodes_per_layer):
+    decoder = cgp.CGPDecoder(primitives=[np.add, np.subtract, np.multiply,
+                                         np.maximum],
+                             num_inputs=4, num_outputs=2,
+                             num_layers=num_layers,
+                             nodes_per_layer=nodes_per_layer, max_arity=2)
+    executable = decoder.decode(decoder.initializer()())
+    inputs = np.random.uniform(size=(NUM_CALLS, 4))
+
+    outputs = benchmark(lambda: [executable(x) for x in inputs])
+    assert len(outputs) == NUM_CALLS
+
+
+@pytest.mark.parametrize('num_inputs', [2, 8])
+@pytest.mark.parametrize('num_rules', [10, 100])
+def test_pitt_rules_executable(benchmark, num_rules, num_inputs):
+    spaces = pytest.importorskip('gymnasium.spaces')
+    from leap_ec.executable_rep.rules import PittRulesDecoder
+
+    decoder = PittRulesDecoder(
+        input_space=spaces.Box(low=0.0, high=1.0, shape=(num_inputs,),
+                               dtype=np.float32),
+        output_space=spaces.Discrete(4))
+    genome = []
+    for _ in range(num_rules):
+        bounds = np.sort(np.random.uniform(size=(num_inputs, 2)), axis=1)
+        genome.append(list(bounds.flatten()) + [np.random.randint(4)])
+    executable = decoder.decode(genome)
+    inputs = np.random.uniform(size=(NUM_CALLS, num_inputs))
+
+    outputs = benchmark(lambda: [executable(x) for x in inputs])
+    assert len(outputs) == NUM_CALLS
@@ -0,0 +1,124 @@
+"""Benchmarks for the nondominated sorting, crowding distance, ENLU
+insertion, NSGA-III survival, Pareto archive, and quality indicators used by
+the multiobjective algorithms."""
+import numpy as np
+import pytest
+
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.archive import ParetoArchive
+from leap_ec.multiobjective.asynchronous import ENLUInserter
+from leap_ec.multiobjective.indicators import hypervolume
+from leap_ec.multiobjective.nsga3 import das_dennis_reference_points, \
+    reference_point_survival
+from leap_ec.multiobjective.ops import fast_nondominated_sort, \
+    rank_ordinal_sort, crowding_distance_calc
+from leap_ec.multiobjective.problems import MultiObjectiveProblem
+
+
+pytestmark = pytest.mark.benchmark(group='multiobjective')
+
+# fast_nondominated_sort() is quadratic, so these are kept smaller
+MO_POP_SIZES = [100, 500]
+NUM_OBJECTIVES = [2, 3]
+
+
+class _GenomeObjectives(MultiObjectiveProblem):
+    """A problem whose objectives are just the values of the genome."""
+    def __init__(self, num_objectives):
+        super().__init__(maximize=[False] * num_objectives)
+
+    def evaluate(self, phenome):
+        return phenome
+
+
+def _mo_population(pop_size, num_objectives):
+    """A population with random fitnesses, so that the sorts see many ranks."""
+    problem = _GenomeObjectives(num_objectives)
+    pop = [Individual(genome, problem=problem)
+           for genome in np.random.uniform(size=(pop_size, num_objectives))]
+    return Individual.evaluate_population(pop)
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_fast_nondominated_sort(benchmark, pop_size, num_objectives):
+    pop = _mo_population(pop_size, num_objectives)
+    sorted_pop = benchmark(fast_nondominated_sort, pop)
+    assert len(sorted_pop) == pop_size
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_rank_ordinal_sort(benchmark, pop_size, num_objectives):
+    pop = _mo_population(pop_size, num_objectives)
+    sorted_pop = benchmark(rank_ordinal_sort, pop)
+    assert len(sorted_pop) == pop_size
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_crowding_distance_calc(benchmark, pop_size, num_objectives):
+    pop = rank_ordinal_sort(_mo_population(pop_size, num_objectives))
+    result = benchmark(crowding_distance_calc, pop)
+    assert len(result) == pop_size
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_enlu_inserter(benchmark, pop_size, num_objectives):
+    """Insert twice the population's worth of individuals, one at a time, the
+    way the steady-state NSGA-II does."""
+    births = _mo_population(2 * pop_size, num_objectives)
+
+    def insert_all():
+        inserter, flat_pop = ENLUInserter(), []
+        for ind in births:
+            inserter(ind, flat_pop, pop_size)
+        return flat_pop
+
+    flat_pop = benchmark(insert_all)
+    assert len(flat_pop) == pop_size
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_pareto_archive(benchmark, pop_size, num_objectives):
+    """Offer an archive of capacity `pop_size` ten times that many
+    individuals, one at a time, as an asynchronous run's probe would."""
+    births = _mo_population(10 * pop_size, num_objectives)
+
+    def insert_all():
+        archive = ParetoArchive(capacity=pop_size)
+        for ind in births:
+            archive.add(ind)
+        return archive
+
+    archive = benchmark(insert_all)
+    assert 0 < len(archive) <= pop_size
+
+
+@pytest.mark.parametrize('num_objectives', NUM_OBJECTIVES)
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_hypervolume(benchmark, pop_size, num_objectives):
+    """The exact hypervolume of points on a spherical front, all of which
+    are nondominated."""
+    points = np.abs(np.random.normal(size=(pop_size, num_objectives)))
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    reference = np.full(num_objectives, 1.1)
+
+    volume = benchmark(hypervolume, points, reference,
+                       maximize=[-1] * num_objectives)
+    assert 0 < volume < 1.1 ** num_objectives
+
+
+@pytest.mark.parametrize('num_objectives', [5, 8])
+@pytest.mark.parametrize('pop_size', MO_POP_SIZES)
+def test_reference_point_survival(benchmark, pop_size, num_objectives):
+    """Halve a ranked many-objective population, as NSGA-III does each
+    generation."""
+    pop = rank_ordinal_sort(_mo_population(pop_size, num_objectives))
+    reference_points = das_dennis_reference_points(num_objectives, 3)
+
+    survivors = benchmark(reference_point_survival, pop, size=pop_size // 2,
+                          reference_points=reference_points)
+    assert len(survivors) == pop_size // 2
@@ -0,0 +1,118 @@
+"""Benchmarks for the selection, survival, mutation, and crossover operators
+that are in almost every pipeline."""
+import pytest
+from toolz import pipe
+
+from leap_ec import ops
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.ops import mutate_bitflip
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.individual import Individual
+from leap_ec.real_rep.initializers import create_real_vector
+from leap_ec.real_rep.ops import mutate_gaussian
+from leap_ec.real_rep.problems import SpheroidProblem
+from leap_ec.representation import Representation
+from .conftest import POP_SIZES, GENOME_LENGTHS
+
+
+pytestmark = pytest.mark.benchmark(group='ops')
+
+
+def _real_population(pop_size, length):
+    representation = Representation(
+        initialize=create_real_vector(bounds=[(-5.12, 5.12)] * length))
+    pop = representation.create_population(pop_size, SpheroidProblem())
+    return Individual.evaluate_population(pop)
+
+
+def _binary_population(pop_size, length):
+    representation = Representation(
+        initialize=create_binary_sequence(length=length))
+    pop = representation.create_population(pop_size, MaxOnes())
+    return Individual.evaluate_population(pop)
+
+
+##############################
+# Cloning, selection, and survival
+##############################
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_clone(benchmark, pop_size, length):
+    pop = _real_population(pop_size, length)
+    clones = benchmark(lambda: [ind.clone() for ind in pop])
+    assert len(clones) == pop_size
+
+
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_tournament_selection(benchmark, pop_size):
+    pop = _real_population(pop_size, 10)
+    selected = benchmark(lambda: pipe(pop, ops.tournament_selection,
+                                      ops.pool(size=pop_size)))
+    assert len(selected) == pop_size
+
+
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_truncation_selection(benchmark, pop_size):
+    parents = _real_population(pop_size, 10)
+    offspring = _real_population(pop_size, 10)
+    survivors = benchmark(lambda: ops.truncation_selection(
+        offspring, size=pop_size, parents=parents))
+    assert len(survivors) == pop_size
+
+
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_elitist_survival(benchmark, pop_size):
+    parents = _real_population(pop_size, 10)
+    offspring = _real_population(pop_size, 10)
+    # elitist_survival() appends the elites to the offspring list it's given
+    survivors = benchmark(lambda: ops.elitist_survival(
+        list(offspring), parents=parents, k=2))
+    assert len(survivors) == pop_size
+
+
+##############################
+# Mutation and crossover
+##############################
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_mutate_gaussian(benchmark, pop_size, length):
+    pop = _real_population(pop_size, length)
+    mutated = benchmark(lambda: pipe(
+        pop, ops.naive_cyclic_selection,
+        mutate_gaussian(std=0.1, expected_num_mutations=1,
+                        bounds=(-5.12, 5.12)),
+        ops.pool(size=pop_size)))
+    assert len(mutated) == pop_size
+
+
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_mutate_bitflip(benchmark, pop_size, length):
+    pop = _binary_population(pop_size, length)
+    mutated = benchmark(lambda: pipe(
+        pop, ops.naive_cyclic_selection,
+        mutate_bitflip(expected_num_mutations=1),
+        ops.pool(size=pop_size)))
+    assert len(mutated) == pop_size
+
+
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_uniform_crossover(benchmark, pop_size, length):
+    pop = _binary_population(pop_size, length)
+    offspring = benchmark(lambda: pipe(
+        pop, ops.naive_cyclic_selection,
+        ops.UniformCrossover(p_swap=0.5),
+        ops.pool(size=pop_size)))
+    assert len(offspring) == pop_size
+
+
+@pytest.mark.parametrize('length', GENOME_LENGTHS)
+@pytest.mark.parametrize('pop_size', POP_SIZES)
+def test_n_ary_crossover(benchmark, pop_size, length):
+    pop = _binary_population(pop_size, length)
+    offspring = benchmark(lambda: pipe(
+        pop, ops.naive_cyclic_selection,
+        ops.NAryCrossover(num_points=2),
+        ops.pool(size=pop_size)))
+    assert len(offspring) == pop_size
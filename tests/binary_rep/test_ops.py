@@ -80,4 +80,25 @@ def test_mutate_bitflip1():
 
     # Use a χ-squared test to see if our experiment matches what we expect
     p = 0.01
-    assert(stat.stochastic_equals(expected_dist, observed_dist, p=p))
\ No newline at end of file
+    assert(stat.stochastic_equals(expected_dist, observed_dist, p=p))
+
+##############################
+# Tests for batch_mutate_bitflip
+##############################
+def test_batch_mutate_bitflip():
+    """With probability 1, every bit of every individual should flip."""
+    pop = [Individual(np.array([0, 1, 0])), Individual(np.array([1, 1, 1]))]
+
+    result = ops.batch_mutate_bitflip(pop, probability=1.0)
+
+    assert(result[0].genome.tolist() == [1, 0, 1])
+    assert(result[1].genome.tolist() == [0, 0, 0])
+
+
+def test_batch_mutate_bitflip_err():
+    """Giving both expected_num_mutations and probability is an error."""
+    pop = [Individual(np.array([0, 1, 0]))]
+
+    with pytest.raises(ValueError):
+        ops.batch_mutate_bitflip(pop, expected_num_mutations=1,
+                                 probability=0.1)
@@ -0,0 +1,92 @@
+"""
+    Tests for leap_ec.distrib.asynchronous with a CachedProblem
+"""
+import time
+
+import numpy as np
+from distributed import Client, LocalCluster
+
+import leap_ec.ops as ops
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.distrib import asynchronous
+from leap_ec.decoder import IdentityDecoder
+from leap_ec.distrib.individual import DistributedIndividual
+from leap_ec.problem import CachedProblem
+from leap_ec.representation import Representation
+
+
+class _CountingMaxOnes(MaxOnes):
+    """Counts the phenomes evaluated by any copy of it, including copies
+    unpickled by a worker in this process."""
+    num_evaluated = 0
+
+    def evaluate(self, phenome):
+        _CountingMaxOnes.num_evaluated += 1
+        return super().evaluate(phenome)
+
+
+# Long enough that the initial individuals are all different
+representation = Representation(create_binary_sequence(32),
+                                individual_cls=DistributedIndividual)
+
+
+def test_steady_state_cached():
+    """Clones of evaluated individuals should be found in the client side
+    cache instead of being evaluated again, in both modes."""
+    for chunksize in (None, 2):
+        _CountingMaxOnes.num_evaluated = 0
+        cached = CachedProblem(_CountingMaxOnes())
+        evaluated = []
+        # Clone without mutating, so every offspring is a cache hit
+        pipeline = [ops.random_selection, ops.clone]
+        if chunksize is None:
+            pipeline.append(ops.pool(size=1))
+
+        with LocalCluster(processes=False, threads_per_worker=1, n_workers=2) as cluster:
+            with Client(cluster) as client:
+                pop = asynchronous.steady_state(client=client,
+                                                max_births=10,
+                                                init_pop_size=4,
+                                                pop_size=4,
+                                                representation=representation,
+                                                problem=cached,
+                                                evaluated_probe=evaluated.append,
+                                                chunksize=chunksize,
+                                                offspring_pipeline=pipeline)
+
+        assert len(evaluated) == 14
+        assert len(pop) == 4
+        assert _CountingMaxOnes.num_evaluated == 4
+        assert cached.cache_info().hits == 10
+        assert cached.cache_info().currsize == 4
+        assert all(ind.problem is cached for ind in pop)
+        assert all(ind.fitness == np.sum(ind.genome) for ind in evaluated)
+
+
+def test_eval_population_cached():
+    """Individuals whose fitness is already cached shouldn't be evaluated
+    again, and new fitnesses should be cached on the client side."""
+    _CountingMaxOnes.num_evaluated = 0
+    cached = CachedProblem(_CountingMaxOnes())
+    cached.evaluate(np.array([1, 1, 1]))
+
+    pop = [DistributedIndividual(np.array([1, 1, 1]),
+                                 decoder=IdentityDecoder(), problem=cached),
+           DistributedIndividual(np.array([0, 1, 1]),
+                                 decoder=IdentityDecoder(), problem=cached)]
+
+    with LocalCluster(processes=False, threads_per_worker=1, n_workers=1) as cluster:
+        with Client(cluster) as client:
+            futures = asynchronous.eval_population(pop, client)
+            evaluated = sorted(future.result().fitness for future in futures)
+
+    # The new fitness is cached by a done callback, in another thread
+    deadline = time.time() + 10
+    while cached.cache_info().currsize < 2 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert evaluated == [2, 3]
+    assert _CountingMaxOnes.num_evaluated == 2
+    assert cached.cache_info().hits == 1
+    assert cached.lookup(CachedProblem.key(np.array([0, 1, 1]))) == 2
@@ -9,6 +9,7 @@ from distributed import Client, LocalCluster
 import leap_ec.ops as ops
 from leap_ec.binary_rep.initializers import create_binary_sequence
 from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.checkpoint import Checkpointer
 from leap_ec.distrib.asynchronous import steady_state
 from leap_ec.distrib.individual import DistributedIndividual
 from leap_ec.problem import ScalarProblem
@@ -166,3 +167,60 @@ def test_meet_budget_do_not_count_nonviable():
     inds = my_accumulate.individuals()
 
     assert len(inds) == 6
+
+
+def test_meet_budget_batched():
+    """ The batched mode should also meet the birth budget exactly """
+    with LocalCluster(processes=False, threads_per_worker=1, n_workers=2) as cluster:
+        with Client(cluster) as client:
+            my_accumulate = accumulate()
+
+            pop = steady_state(client=client,
+                               max_births=7,
+                               init_pop_size=4,
+                               pop_size=4,
+                               representation=representation,
+                               problem=MaxOnes(),
+                               evaluated_probe=my_accumulate,
+                               chunksize=2,
+                               offspring_pipeline=[
+                                   ops.random_selection,
+                                   ops.clone]
+                               )
+
+    inds = my_accumulate.individuals()
+
+    assert len(inds) == 11
+    assert len(pop) == 4
+
+
+def test_meet_budget_resumed(tmp_path):
+    """ A run resumed from its final checkpoint should only make up the rest
+        of the bigger birth budget, in both modes """
+    for chunksize in (None, 2):
+        path = tmp_path / f'run{chunksize}.pkl'
+        with LocalCluster(processes=False, threads_per_worker=1, n_workers=2) as cluster:
+            with Client(cluster) as client:
+                def run(max_births):
+                    my_accumulate = accumulate()
+                    pipeline = [ops.random_selection, ops.clone]
+                    if chunksize is None:
+                        pipeline.append(ops.pool(size=1))
+                    pop = steady_state(client=client,
+                                       max_births=max_births,
+                                       init_pop_size=4,
+                                       pop_size=4,
+                                       representation=representation,
+                                       problem=MaxOnes(),
+                                       evaluated_probe=my_accumulate,
+                                       chunksize=chunksize,
+                                       checkpointer=Checkpointer(path),
+                                       offspring_pipeline=pipeline)
+                    return pop, my_accumulate.individuals()
+
+                pop, inds = run(max_births=3)
+                assert len(inds) == 7
+
+                pop, inds = run(max_births=8)
+                assert len(inds) == 5
+                assert len(pop) == 4
@@ -0,0 +1,283 @@
+"""
+    Tests for leap_ec.distrib.executor.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+
+import numpy as np
+import pytest
+import toolz
+
+from leap_ec import ops
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.checkpoint import Checkpointer
+from leap_ec.decoder import IdentityDecoder
+from leap_ec.distrib import executor as executor_backend
+from leap_ec.distrib.individual import DistributedIndividual
+from leap_ec.global_vars import context
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.problems import ZDT1Problem
+from leap_ec.population import Population
+from leap_ec.problem import CachedProblem, FunctionProblem, ScalarProblem
+from leap_ec.representation import Representation
+
+
+def test_process_pool_eval_population():
+    """Evaluating on a process pool, in chunks, should give the same
+    fitnesses as evaluating serially, and record where it happened."""
+    pop = [DistributedIndividual(np.array([1, 0, i % 2]),
+                                 decoder=IdentityDecoder(), problem=MaxOnes())
+           for i in range(7)]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pop = executor_backend.eval_population(pop, executor, chunksize=3)
+
+    assert [ind.fitness for ind in pop] == [1, 2, 1, 2, 1, 2, 1]
+    for ind in pop:
+        assert ind.is_viable
+        assert ind.stop_eval_time >= ind.start_eval_time
+        assert ind.hostname is not None
+
+
+def test_eval_pool():
+    """eval_pool() should pull and evaluate `size` individuals."""
+    pop = [Individual(np.array([1, 1]), problem=MaxOnes())]
+    pop = Individual.evaluate_population(pop)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        offspring = toolz.pipe(pop,
+                               ops.tournament_selection,
+                               ops.clone,
+                               executor_backend.eval_pool(executor=executor,
+                                                          size=4))
+
+    assert len(offspring) == 4
+    assert all(ind.fitness == 2 for ind in offspring)
+
+
+def _broken(phenome):
+    raise RuntimeError('Broken on purpose')
+
+
+def test_non_viable():
+    """Exceptions should mark robust individuals as non-viable, and be
+    re-raised for plain individuals."""
+    problem = FunctionProblem(_broken, maximize=True)
+    context['leap']['distrib']['non_viable'] = 0
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pop = executor_backend.eval_population(
+            [DistributedIndividual(np.array([0]), decoder=IdentityDecoder(),
+                                   problem=problem)], executor)
+        assert not pop[0].is_viable
+        assert np.isnan(pop[0].fitness)
+        assert isinstance(pop[0].exception, RuntimeError)
+        assert context['leap']['distrib']['non_viable'] == 1
+
+        with pytest.raises(RuntimeError):
+            executor_backend.eval_population(
+                [Individual(np.array([0]), problem=problem)], executor)
+
+
+def test_undecodable():
+    """A robust individual that can't be decoded should be marked non-viable
+    without being submitted."""
+    individual = DistributedIndividual(np.array([0]), decoder=None,
+                                       problem=MaxOnes())
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pop = executor_backend.eval_population([individual], executor)
+
+    assert not pop[0].is_viable
+    assert isinstance(pop[0].exception, AttributeError)
+
+
+##############################
+# Tests for steady_state()
+##############################
+class _Accumulator:
+    """Picks up every evaluated individual via evaluated_probe."""
+    def __init__(self):
+        self.individuals = []
+
+    def __call__(self, individual):
+        self.individuals.append(individual)
+
+
+def test_steady_state_meets_budget():
+    """The initial population plus max_births offspring should be evaluated,
+    whatever the number of evaluations in flight."""
+    representation = Representation(create_binary_sequence(3),
+                                    individual_cls=DistributedIndividual)
+
+    for max_in_flight in (1, 3):
+        accumulate = _Accumulator()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pop = executor_backend.steady_state(
+                executor, max_births=5, init_pop_size=4, pop_size=3,
+                representation=representation, problem=MaxOnes(),
+                offspring_pipeline=[ops.random_selection,
+                                    ops.clone,
+                                    ops.pool(size=1)],
+                evaluated_probe=accumulate,
+                max_in_flight=max_in_flight)
+
+        assert len(accumulate.individuals) == 9
+        assert len(pop) == 3
+        assert all(ind.is_viable for ind in pop)
+
+
+def test_steady_state_more_in_flight_than_initial():
+    """With more slots than initial individuals, breeding should wait until
+    one of them has been inserted, and the budget should still be met."""
+    representation = Representation(create_binary_sequence(3),
+                                    individual_cls=DistributedIndividual)
+
+    accumulate = _Accumulator()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pop = executor_backend.steady_state(
+            executor, max_births=20, init_pop_size=4, pop_size=4,
+            representation=representation, problem=MaxOnes(),
+            offspring_pipeline=[ops.random_selection,
+                                ops.clone,
+                                ops.pool(size=1)],
+            evaluated_probe=accumulate,
+            max_in_flight=8)
+
+    assert len(accumulate.individuals) == 24
+    assert len(pop) == 4
+
+
+def test_steady_state_resume(tmp_path):
+    """A run resumed from a checkpoint should only evaluate what's left of
+    the budget, plus whatever was in flight when it was saved."""
+    representation = Representation(create_binary_sequence(3),
+                                    individual_cls=DistributedIndividual)
+    path = tmp_path / 'run.pkl'
+
+    def run(max_births):
+        accumulate = _Accumulator()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pop = executor_backend.steady_state(
+                executor, max_births=max_births, init_pop_size=4, pop_size=3,
+                representation=representation, problem=MaxOnes(),
+                offspring_pipeline=[ops.random_selection,
+                                    ops.clone,
+                                    ops.pool(size=1)],
+                evaluated_probe=accumulate,
+                max_in_flight=2,
+                checkpointer=Checkpointer(path, every=2))
+        return pop, accumulate.individuals
+
+    pop, evaluated = run(max_births=3)
+    assert len(evaluated) == 7
+    assert context['leap']['births'] == 3
+
+    pop, evaluated = run(max_births=8)
+    assert len(evaluated) == 5
+    assert context['leap']['births'] == 8
+    assert len(pop) == 3
+
+
+class _BreaksOnce(ScalarProblem):
+    """Raises an exception on the `n`th evaluation only."""
+    def __init__(self, n):
+        super().__init__(maximize=True)
+        self.n = n
+        self.count = 0
+
+    def evaluate(self, phenome):
+        self.count += 1
+        if self.count == self.n:
+            raise RuntimeError('Broken on purpose')
+        return self.count
+
+
+def test_steady_state_nonviable():
+    """Non-viable individuals shouldn't count towards the birth budget
+    unless count_nonviable is set."""
+    representation = Representation(create_binary_sequence(3),
+                                     individual_cls=DistributedIndividual)
+
+    for count_nonviable, expected in ((False, 5), (True, 4)):
+        accumulate = _Accumulator()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor_backend.steady_state(
+                executor, max_births=2, init_pop_size=2, pop_size=2,
+                representation=representation, problem=_BreaksOnce(n=2),
+                offspring_pipeline=[ops.random_selection,
+                                    ops.clone,
+                                    ops.pool(size=1)],
+                count_nonviable=count_nonviable,
+                evaluated_probe=accumulate)
+
+        assert len(accumulate.individuals) == expected
+        assert sum(not ind.is_viable for ind in accumulate.individuals) == 1
+
+
+def test_eval_population_cached():
+    """Individuals whose fitness is already cached shouldn't be submitted,
+    and new fitnesses should be cached on the client side."""
+    cached = CachedProblem(MaxOnes())
+    cached.evaluate(np.array([1, 1, 1]))
+
+    pop = [Individual(np.array([1, 1, 1]), problem=cached),
+           Individual(np.array([0, 1, 1]), problem=cached)]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pop = executor_backend.eval_population(pop, executor)
+
+    assert [ind.fitness for ind in pop] == [3, 2]
+    assert pop[0].pid == os.getpid()  # Never left this process
+    assert pop[1].pid != os.getpid()
+    assert cached.cache_info().hits == 1
+    assert cached.lookup(CachedProblem.key(np.array([0, 1, 1]))) == 2
+
+
+def test_eval_population_shared():
+    """Evaluating through shared memory should give the same fitnesses as
+    evaluating serially, for both scalar and multiobjective problems."""
+    problem = MaxOnes()
+    decoder = IdentityDecoder()
+    genomes = np.random.randint(0, 2, size=(9, 50))
+    pop = Population(genomes, problem=problem, decoder=decoder,
+                     individual_cls=DistributedIndividual)
+
+    mo_problem = ZDT1Problem(n=5)
+    mo_pop = [DistributedIndividual(np.random.uniform(size=5),
+                                    decoder=decoder, problem=mo_problem)
+              for _ in range(4)]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pop = executor_backend.eval_population_shared(pop, executor,
+                                                      chunksize=4)
+        mo_pop = executor_backend.eval_population_shared(mo_pop, executor)
+
+    np.testing.assert_array_equal(pop.fitnesses, genomes.sum(axis=1))
+    assert all(ind.is_viable and ind.pid != os.getpid() for ind in pop)
+    for ind in mo_pop:
+        np.testing.assert_allclose(ind.fitness, mo_problem.evaluate(ind.genome))
+
+
+def test_eval_population_shared_nonviable():
+    """An exception should only spoil the individual that raised it."""
+    problem = _BreaksOnce(n=2)
+    decoder = IdentityDecoder()
+    pop = [DistributedIndividual(np.array([1.0, 2.0]), decoder=decoder,
+                                 problem=problem) for _ in range(3)]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pop = executor_backend.eval_population_shared(pop, executor,
+                                                      chunksize=3)
+
+        # Individuals must share a problem
+        with pytest.raises(ValueError):
+            executor_backend.eval_population_shared(
+                [DistributedIndividual(np.array([1]), decoder=decoder,
+                                       problem=p)
+                 for p in (MaxOnes(), MaxOnes())], executor)
+
+    assert [ind.is_viable for ind in pop] == [True, False, True]
+    assert pop[0].fitness == 1 and pop[2].fitness == 3
+    assert np.isnan(pop[1].fitness)
@@ -312,3 +312,33 @@ def test_mutate_binomial_err2():
     with pytest.raises(ValueError):
         # Pulse the iterator so mutation gets executed
         result = list(result)
+
+
+##############################
+# Tests for batch_mutate_randint and batch_mutate_binomial
+##############################
+def test_batch_mutate_randint():
+    """Batch randint mutation with probability 1 should keep every gene within
+    its bounds and cover the whole range."""
+    pop = [Individual(np.array([0, 0])) for _ in range(1000)]
+
+    result = intrep_ops.batch_mutate_randint(pop, bounds=[(0, 1), (5, 6)],
+                                             probability=1.0)
+
+    genomes = np.array([ind.genome for ind in result])
+    assert(set(genomes[:, 0]) == {0, 1})
+    assert(set(genomes[:, 1]) == {5, 6})
+
+
+def test_batch_mutate_binomial():
+    """Batch binomial mutation should keep integer genomes within bounds."""
+    pop = [Individual(np.array([0, 0])) for _ in range(100)]
+
+    result = intrep_ops.batch_mutate_binomial(pop, std=[1, 2],
+                                              bounds=[(-2, 2), (0, 3)],
+                                              probability=1.0)
+
+    genomes = np.array([ind.genome for ind in result])
+    assert(genomes.dtype.kind == 'i')
+    assert(np.all(genomes[:, 0] >= -2) and np.all(genomes[:, 0] <= 2))
+    assert(np.all(genomes[:, 1] >= 0) and np.all(genomes[:, 1] <= 3))
@@ -0,0 +1,134 @@
+"""Unit tests for leap_ec.multiobjective.archive."""
+import numpy as np
+import pytest
+
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.archive import ParetoArchive
+from leap_ec.multiobjective.problems import MultiObjectiveProblem
+from leap_ec.multiobjective.ranking import nondominated_ranks
+
+
+class _Objectives(MultiObjectiveProblem):
+    """A problem whose fitness is the genome itself."""
+    def evaluate(self, phenome):
+        return phenome
+
+
+def _evaluated(fitnesses, maximize):
+    problem = _Objectives(maximize)
+    individuals = [Individual(np.asarray(f, dtype=float), problem=problem)
+                   for f in fitnesses]
+    for ind in individuals:
+        ind.evaluate()
+    return individuals
+
+
+def _front(fitnesses, maximize):
+    """The distinct nondominated rows of `fitnesses`, sorted."""
+    front = fitnesses[nondominated_ranks(fitnesses, maximize) == 1]
+    return np.unique(front, axis=0)
+
+
+##############################
+# Tests for insertion
+##############################
+@pytest.mark.parametrize('maximize', [[True, False], [False, True, False]])
+def test_unbounded_archive_holds_front(maximize):
+    """Without a capacity, the archive should end up holding exactly the
+    distinct nondominated fitnesses it was offered, whether they're added one
+    at a time or in batches."""
+    rng = np.random.default_rng(1)
+    fitnesses = rng.integers(0, 6, size=(300, len(maximize)))
+    expected = _front(fitnesses, _Objectives(maximize).maximize)
+
+    one_at_a_time = ParetoArchive()
+    for ind in _evaluated(fitnesses, maximize):
+        one_at_a_time.add(ind)
+    batched = ParetoArchive()
+    individuals = _evaluated(fitnesses, maximize)
+    for start in range(0, len(individuals), 50):
+        batched.add_many(individuals[start:start + 50])
+
+    for archive in (one_at_a_time, batched):
+        assert len(archive) == len(expected)
+        np.testing.assert_array_equal(np.unique(archive.fitnesses, axis=0),
+                                      expected)
+        assert [ind.fitness.tolist() for ind in archive.individuals] == \
+               archive.fitnesses.tolist()
+
+
+def test_rejections():
+    """Duplicates, dominated, and non-viable individuals are rejected."""
+    archive = ParetoArchive()
+    first, duplicate, dominated, nonviable, better = _evaluated(
+        [[1, 1], [1, 1], [0, 1], [np.nan, 5], [2, 2]], [True, True])
+
+    assert archive.add(first)
+    assert not archive.add(duplicate)
+    assert not archive.add(dominated)
+    assert not archive.add(nonviable)
+    assert archive.add(better)
+    assert archive.individuals == [better]
+    assert archive.insertions == 5
+
+
+##############################
+# Tests for eviction
+##############################
+@pytest.mark.parametrize('eviction', ['crowding', 'hypervolume'])
+def test_capacity(eviction):
+    """The archive never holds more than its capacity, and keeps the extreme
+    points of the front."""
+    x = np.random.default_rng(2).permutation(np.linspace(0, 1, 200))
+    fitnesses = np.column_stack([x, 1 - x ** 2])
+    archive = ParetoArchive(capacity=10, eviction=eviction)
+    for ind in _evaluated(fitnesses, [True, True]):
+        archive.add(ind)
+        assert len(archive) <= 10
+
+    assert len(archive) == 10
+    assert archive.evictions == 190
+    assert {0.0, 1.0} <= set(archive.fitnesses[:, 0])
+
+
+def test_hypervolume_eviction():
+    """The member whose exclusive hypervolume is smallest is evicted."""
+    archive = ParetoArchive(capacity=3, eviction='hypervolume',
+                            reference_point=[5, 5])
+    # Minimizing, the exclusive hypervolumes are 1, 1.5, 1, and 0.5
+    archive.add_many(_evaluated([[1, 4], [2, 2.5], [4, 1], [3, 2]],
+                                [False, False]))
+    assert sorted(archive.fitnesses.tolist()) == [[1, 4], [2, 2.5], [4, 1]]
+
+    with pytest.raises(ValueError):
+        archive = ParetoArchive(capacity=1, eviction='hypervolume')
+        archive.add_many(_evaluated([[0, 1, 0], [1, 0, 0]], [True] * 3))
+
+
+##############################
+# Tests for use as a probe, and for snapshots
+##############################
+def test_probe():
+    individuals = _evaluated([[0, 1], [1, 0], [0, 0]], [True, True])
+
+    archive = ParetoArchive()
+    assert archive(individuals) is individuals
+    assert len(archive) == 2
+
+    archive = ParetoArchive()
+    assert list(archive(iter(individuals))) == individuals
+    assert len(archive) == 2
+
+
+def test_save_and_load(tmp_path):
+    archive = ParetoArchive(capacity=5)
+    archive.add_many(_evaluated(np.random.default_rng(3).uniform(size=(50, 2)),
+                                [True, False]))
+    path = tmp_path / 'archive.pkl'
+    archive.save(path)
+
+    loaded = ParetoArchive.load(path)
+    assert loaded.capacity == 5
+    np.testing.assert_array_equal(loaded.fitnesses, archive.fitnesses)
+    assert [ind.fitness.tolist() for ind in loaded.individuals] == \
+           archive.fitnesses.tolist()
@@ -1,9 +1,17 @@
-from leap_ec.multiobjective.asynchronous import enlu_inds_rank
+from concurrent.futures import ThreadPoolExecutor
+
+from leap_ec import ops
+from leap_ec.distrib.individual import DistributedIndividual
+from leap_ec.multiobjective.asynchronous import enlu_inds_rank, steady_state_nsga_2, \
+    ENLUInserter
+from leap_ec.real_rep.ops import mutate_gaussian
 from leap_ec.multiobjective.ops import fast_nondominated_sort, \
     crowding_distance_calc, rank_ordinal_sort
 from leap_ec.multiobjective.problems import SCHProblem
+from leap_ec.multiobjective.ranking import nondominated_ranks, crowding_distances
 from .test_ops import generate_test_pop
 import numpy as np
+import pytest
 
 from leap_ec.individual import Individual
 from leap_ec.representation import Representation
@@ -54,4 +62,58 @@ def test_inds_rank2():
         np.testing.assert_array_equal(ranks_1, ranks_2)
         
     finally:
-        np.random.set_state(state)
\ No newline at end of file
+        np.random.set_state(state)
+
+def test_enlu_inserter():
+    """
+    Tests that the inserter keeps the population at its size, with the same ranks and
+    crowding distances that sorting the whole population from scratch would give
+    """
+    try:
+        state = np.random.get_state()
+        np.random.seed(222)
+
+        prob = SCHProblem()
+        rep = Representation(initialize=create_real_vector(bounds=[(-10, 10)]))
+        births = Individual.evaluate_population(rep.create_population(300, prob))
+
+        inserter, pop = ENLUInserter(), []
+        for ind in births:
+            inserter(ind, pop, 50)
+        assert len(pop) == 50
+
+        fitnesses = np.array([ind.fitness for ind in pop])
+        ranks = np.array([ind.rank for ind in pop])
+        np.testing.assert_array_equal(ranks, nondominated_ranks(fitnesses, prob.maximize))
+        np.testing.assert_array_equal(
+            [ind.distance for ind in pop],
+            crowding_distances(fitnesses, ranks, prob.maximize))
+    finally:
+        np.random.set_state(state)
+
+
+@pytest.mark.parametrize('max_in_flight', [None, 16])
+def test_steady_state_nsga_2_executor(max_in_flight):
+    """
+    Tests that steady_state_nsga_2 runs on a concurrent.futures executor and
+    returns a ranked population of the requested size, including when more
+    evaluations may be in flight than there are initial individuals
+    """
+    prob = SCHProblem()
+    rep = Representation(initialize=create_real_vector(bounds=[(-10, 10)]),
+                         individual_cls=DistributedIndividual)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pop = steady_state_nsga_2(
+            executor, max_births=30, init_pop_size=10, pop_size=10,
+            problem=prob, representation=rep,
+            offspring_pipeline=[
+                ops.tournament_selection(key=lambda x: (-x.rank, x.distance)),
+                ops.clone,
+                mutate_gaussian(std=0.5, expected_num_mutations=1),
+                ops.pool(size=1)
+            ],
+            max_in_flight=max_in_flight)
+
+    assert len(pop) == 10
+    assert min(ind.rank for ind in pop) == 1
@@ -0,0 +1,117 @@
+"""Unit tests for leap_ec.multiobjective.indicators and the ZDT problems'
+Pareto fronts."""
+import io
+
+import numpy as np
+import pytest
+
+from leap_ec.global_vars import context
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.indicators import hypervolume, igd, igd_plus
+from leap_ec.multiobjective.probe import IndicatorsCSVProbe
+from leap_ec.multiobjective.problems import ZDT1Problem, ZDT2Problem, \
+    ZDT3Problem, ZDT4Problem, ZDT5Problem, ZDT6Problem
+from leap_ec.multiobjective.ranking import nondominated_ranks
+
+
+def _grid_hypervolume(costs, reference):
+    """Count the unit cells of an integer grid that some row dominates."""
+    lower = costs.min(axis=0)
+    axes = [np.arange(low, high) + 0.5 for low, high in zip(lower, reference)]
+    cells = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+    cells = cells.reshape(-1, costs.shape[1])
+    return np.count_nonzero(
+        (costs[np.newaxis, :, :] <= cells[:, np.newaxis, :]).all(axis=2).any(axis=1))
+
+
+##############################
+# Tests for hypervolume()
+##############################
+@pytest.mark.parametrize('num_objectives', [1, 2, 3, 4, 5])
+def test_exact_hypervolume(num_objectives):
+    """The exact hypervolume of random integer points, dominated and
+    duplicated ones included, should match a count of grid cells."""
+    rng = np.random.default_rng(num_objectives)
+    reference = np.full(num_objectives, 6)
+    for _ in range(20):
+        costs = rng.integers(0, 6, size=(rng.integers(1, 15), num_objectives))
+        assert hypervolume(costs, reference,
+                           maximize=-np.ones(num_objectives)) == \
+               _grid_hypervolume(costs, reference)
+
+
+def test_hypervolume_maximized():
+    """Maximized objectives are measured from below the reference point, and
+    points that aren't better than it on every objective add nothing."""
+    fitnesses = np.array([[2.0, 3.0], [3.0, 1.0], [5.0, 0.0], [np.nan, 9.0]])
+    assert hypervolume(fitnesses, [0.0, 0.0]) == 2 * 3 + 1 * 1
+    assert hypervolume(fitnesses, [0.0, 0.0], maximize=[1, 1]) == 7
+    assert hypervolume(fitnesses, [9.0, 9.0]) == 0
+
+
+def test_monte_carlo_hypervolume():
+    rng = np.random.default_rng(4)
+    fitnesses = np.abs(rng.normal(size=(30, 4)))
+    fitnesses /= np.linalg.norm(fitnesses, axis=1, keepdims=True)
+
+    exact = hypervolume(fitnesses, np.zeros(4), method='exact')
+    state = np.random.get_state()
+    np.random.seed(0)
+    estimate = hypervolume(fitnesses, np.zeros(4), method='monte_carlo',
+                           samples=200_000)
+    np.random.set_state(state)
+    assert estimate == pytest.approx(exact, rel=0.02)
+
+    with pytest.raises(ValueError):
+        hypervolume(fitnesses, np.zeros(4), method='bogus')
+
+
+##############################
+# Tests for igd() and igd_plus()
+##############################
+@pytest.mark.parametrize('problem', [ZDT1Problem(), ZDT2Problem(), ZDT3Problem(),
+                                     ZDT4Problem(), ZDT5Problem(), ZDT6Problem()])
+def test_zdt_fronts(problem):
+    """Each ZDT front is nondominated, and has zero distance from itself."""
+    front = problem.pareto_front(num_points=50)
+    assert front.shape[1] == 2
+    assert (nondominated_ranks(front, problem.maximize) == 1).all()
+    assert igd(front, front, problem.maximize) == 0.0
+    assert igd_plus(front, front, problem.maximize) == 0.0
+
+
+def test_igd_plus_ignores_better_points():
+    """IGD counts every deviation from the front, but IGD+ only the ones
+    that make a point worse."""
+    problem = ZDT1Problem()
+    front = problem.pareto_front(num_points=3)
+
+    better, worse = front - 0.1, front + 0.1
+    assert igd(better, front, problem.maximize) == pytest.approx(np.sqrt(0.02))
+    assert igd_plus(better, front, problem.maximize) == 0.0
+    assert igd_plus(worse, front, problem.maximize) == pytest.approx(np.sqrt(0.02))
+
+    assert igd(np.full((2, 2), np.nan), front) == np.inf
+
+
+##############################
+# Tests for IndicatorsCSVProbe
+##############################
+def test_indicators_probe_modulo():
+    problem = ZDT2Problem(n=2)
+    pop = Individual.evaluate_population(
+        [Individual(np.array([x, 0.0]), problem=problem) for x in [0.0, 1.0]])
+    stream = io.StringIO()
+    probe = IndicatorsCSVProbe(stream, reference_front=problem.pareto_front(),
+                               modulo=2, job=3)
+
+    for generation in range(4):
+        context['leap']['generation'] = generation
+        probe(pop)
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == 'job, step, front_size, igd, igd_plus'
+    assert [line.split(', ')[1] for line in lines[1:]] == ['0', '2']
+
+    with pytest.raises(ValueError):
+        IndicatorsCSVProbe(stream)
@@ -0,0 +1,214 @@
+"""Unit tests for the NSGA-III implementation in
+leap_ec.multiobjective.nsga3."""
+from math import comb
+
+import numpy as np
+import pytest
+
+from leap_ec import ops
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.nsga3 import associate, \
+    das_dennis_reference_points, generalized_nsga_3, normalize_objectives, \
+    reference_point_survival, _default_reference_points
+from leap_ec.multiobjective.ops import rank_ordinal_sort
+from leap_ec.multiobjective.problems import MultiObjectiveProblem
+from leap_ec.population import Population
+from leap_ec.real_rep.initializers import create_real_vector
+from leap_ec.real_rep.ops import mutate_gaussian
+from leap_ec.representation import Representation
+
+
+class _Objectives(MultiObjectiveProblem):
+    """A problem whose fitness is the genome itself."""
+    def evaluate(self, phenome):
+        return phenome
+
+
+class _Sphere(MultiObjectiveProblem):
+    """A three-objective problem whose front is the positive octant of the
+    unit sphere, like DTLZ2."""
+    def __init__(self):
+        super().__init__(maximize=[False, False, False])
+
+    def evaluate(self, phenome):
+        x = np.clip(phenome, 0, 1)
+        g = 1 + np.sum((x[2:] - 0.5) ** 2)
+        a, b = x[:2] * np.pi / 2
+        return g * np.array([np.cos(a) * np.cos(b), np.cos(a) * np.sin(b),
+                             np.sin(a)])
+
+
+##############################
+# Tests for reference points
+##############################
+@pytest.mark.parametrize('num_objectives, divisions',
+                         [(1, 3), (2, 5), (3, 12), (5, 4), (8, 3)])
+def test_das_dennis_reference_points(num_objectives, divisions):
+    points = das_dennis_reference_points(num_objectives, divisions)
+    assert points.shape == (comb(divisions + num_objectives - 1,
+                                 num_objectives - 1), num_objectives)
+    np.testing.assert_allclose(points.sum(axis=1), 1.0)
+    assert len(np.unique(points, axis=0)) == len(points)
+    np.testing.assert_allclose(points * divisions,
+                               np.round(points * divisions), atol=1e-12)
+
+
+def test_inner_reference_points():
+    points = das_dennis_reference_points(6, 2, inner_divisions=1)
+    outer, inner = points[:21], points[21:]
+    assert len(inner) == 6
+    np.testing.assert_allclose(points.sum(axis=1), 1.0)
+    assert inner.min() > 0 and outer.min() == 0
+
+    with pytest.raises(ValueError):
+        das_dennis_reference_points(3, 0)
+
+
+def test_default_reference_points():
+    """The default has as many points as fit in the population."""
+    assert len(_default_reference_points(3, 91)) == 91
+    assert len(_default_reference_points(3, 100)) == 91
+    assert len(_default_reference_points(5, 10)) == 5
+
+
+##############################
+# Tests for normalize_objectives() and associate()
+##############################
+def test_normalize_objectives():
+    """Points on a simplex are mapped onto the unit simplex."""
+    simplex = das_dennis_reference_points(3, 4)
+    costs = 2.0 + simplex * [1.0, 10.0, 100.0]
+    np.testing.assert_allclose(normalize_objectives(costs), simplex, atol=1e-12)
+
+    # A point that's extreme on both objectives leaves no hyperplane, and
+    # the first front's worst values are all zero, so the worst values of
+    # all the rows are used
+    costs = np.array([[0.0, 0.0], [2.0, 4.0], [4.0, 2.0]])
+    np.testing.assert_allclose(normalize_objectives(costs, ranks=[1, 2, 2]),
+                               [[0.0, 0.0], [0.5, 1.0], [1.0, 0.5]])
+
+
+def test_associate():
+    """The association should match a pairwise computation of perpendicular
+    distances."""
+    rng = np.random.default_rng(5)
+    normalized = rng.uniform(size=(50, 4))
+    references = das_dennis_reference_points(4, 3)
+
+    niches, distances = associate(normalized, references)
+
+    units = references / np.linalg.norm(references, axis=1, keepdims=True)
+    expected = np.array([[np.linalg.norm(f - (f @ w) * w) for w in units]
+                         for f in normalized])
+    np.testing.assert_array_equal(niches, expected.argmin(axis=1))
+    np.testing.assert_allclose(distances, expected.min(axis=1))
+
+
+##############################
+# Tests for reference_point_survival()
+##############################
+def _ranked(fitnesses):
+    problem = _Objectives([False] * fitnesses.shape[1])
+    pop = Individual.evaluate_population(
+        [Individual(f, problem=problem) for f in fitnesses])
+    return rank_ordinal_sort(pop)
+
+
+def _loop_counts(population, size, references):
+    """The final niche counts of Deb and Jain's loop, sorted, which don't
+    depend on how ties are broken."""
+    ranks = np.array([ind.rank for ind in population])
+    last = np.sort(ranks)[size - 1]
+    costs = np.array([ind.fitness for ind in population])[ranks <= last]
+    niches, _ = associate(normalize_objectives(costs, ranks[ranks <= last]),
+                          references)
+    in_last = ranks[ranks <= last] == last
+    counts = np.bincount(niches[~in_last], minlength=len(references))
+    pool = list(niches[in_last])
+    for _ in range(size - np.count_nonzero(~in_last)):
+        j = min(set(pool), key=lambda j: counts[j])
+        counts[j] += 1
+        pool.remove(j)
+    return sorted(counts)
+
+
+def test_reference_point_survival_matches_loop():
+    rng = np.random.default_rng(9)
+    references = das_dennis_reference_points(3, 4)
+    for _ in range(10):
+        population = _ranked(rng.uniform(size=(60, 3)))
+        ranks = np.array([ind.rank for ind in population])
+        survivors = reference_point_survival(population, size=25,
+                                             reference_points=references)
+
+        assert len(survivors) == 25
+        survivor_ranks = np.array([ind.rank for ind in survivors])
+        last = survivor_ranks.max()
+        assert np.count_nonzero(survivor_ranks < last) == \
+               np.count_nonzero(ranks < last)
+
+        considered = ranks <= last
+        costs = np.array([ind.fitness for ind in population])
+        niches, _ = associate(normalize_objectives(costs[considered],
+                                                   ranks[considered]),
+                              references)
+        survivor_ids = {id(ind) for ind in survivors}
+        chosen = np.array([id(population[i]) in survivor_ids
+                           for i in np.flatnonzero(considered)])
+        counts = np.bincount(niches[chosen], minlength=len(references))
+        assert sorted(counts) == _loop_counts(population, 25, references)
+
+
+def test_reference_point_survival_prefers_empty_niches():
+    """The last front's nearest member to an empty direction is taken before
+    any member of a direction that's already occupied."""
+    # The first front occupies the directions (0, 1), (1/2, 1/2), and (1, 0),
+    # and the last two members of the second are nearest (1/4, 3/4)
+    fitnesses = np.array([[0.0, 1.0], [1.0, 0.0], [0.3, 0.3],
+                          [0.35, 0.4], [0.25, 1.05], [0.3, 0.9]])
+    references = das_dennis_reference_points(2, 4)
+    population = _ranked(fitnesses)
+    assert [ind.rank for ind in population] == [1, 1, 1, 2, 2, 2]
+
+    survivors = reference_point_survival(population, size=4,
+                                         reference_points=references)
+    assert [ind.fitness.tolist() for ind in survivors] == \
+           [[0.0, 1.0], [1.0, 0.0], [0.3, 0.3], [0.3, 0.9]]
+
+
+def test_reference_point_survival_population():
+    """With a `Population`, the ranks are read from its `ranks` array."""
+    problem = _Objectives([False, False, False])
+    fitnesses = np.random.default_rng(2).uniform(size=(40, 3))
+    pop = Individual.evaluate_population(Population(fitnesses, problem=problem))
+    rank_ordinal_sort(pop)
+
+    survivors = reference_point_survival(
+        pop, size=20, reference_points=das_dennis_reference_points(3, 5))
+    assert len(survivors) == 20
+
+
+##############################
+# Tests for generalized_nsga_3()
+##############################
+def test_generalized_nsga_3_spreads_along_front():
+    """On a three-objective sphere the final population should be spread
+    over most of the reference directions."""
+    references = das_dennis_reference_points(3, 6)
+    bounds = [(0, 1)] * 6
+    final = generalized_nsga_3(
+        max_generations=40, pop_size=len(references), problem=_Sphere(),
+        representation=Representation(initialize=create_real_vector(bounds)),
+        pipeline=[ops.random_selection,
+                  ops.clone,
+                  ops.UniformCrossover(),
+                  mutate_gaussian(std=0.05, expected_num_mutations=1,
+                                  bounds=bounds),
+                  ops.evaluate,
+                  ops.pool(size=len(references))],
+        reference_points=references)
+
+    assert len(final) == len(references)
+    fitnesses = np.array([ind.fitness for ind in final])
+    niches, _ = associate(normalize_objectives(fitnesses), references)
+    assert len(np.unique(niches)) > 0.75 * len(references)
@@ -102,6 +102,18 @@ def test_crowding_distance_calc():
     )
 
 
+def test_crowding_distance_calc_keeps_everyone():
+    """ Individuals in fronts whose objective ranges are all zero, such as
+    fronts of one, should be kept (with a distance of zero). """
+    pop, _, distances = generate_test_pop()
+    rank_ordinal_sort(pop)
+    result = crowding_distance_calc(pop)
+
+    assert len(result) == len(pop)
+    assert all(a is b for a, b in zip(result, pop))
+    np.testing.assert_array_equal([ind.distance for ind in result], distances)
+
+
 def test_sorting_criteria():
     """ Test sorting by rank and distance criteria """
     pop, _, _ = generate_test_pop()
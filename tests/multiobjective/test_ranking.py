@@ -0,0 +1,144 @@
+"""Unit tests for the array-native nondominated sorting in
+leap_ec.multiobjective.ranking."""
+import numpy as np
+import pytest
+
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.ops import fast_nondominated_sort, \
+    rank_ordinal_sort, crowding_distance_calc
+from leap_ec.multiobjective.problems import MultiObjectiveProblem
+from leap_ec.multiobjective.ranking import crowding_distances, nondominated_ranks
+from leap_ec.population import Population
+
+
+class _Objectives(MultiObjectiveProblem):
+    """A problem whose fitness is the genome itself."""
+    def evaluate(self, phenome):
+        return phenome
+
+
+def _reference_ranks(fitnesses, problem):
+    """Rank with pairwise calls to `worse_than()`, as the original
+    fast_nondominated_sort() did."""
+    n = len(fitnesses)
+    dominated_by = [[j for j in range(n)
+                     if problem.worse_than(fitnesses[i], fitnesses[j])]
+                    for i in range(n)]
+    ranks, rank = [0] * n, 1
+    while 0 in ranks:
+        front = [i for i in range(n) if ranks[i] == 0
+                 and all(ranks[j] not in (0, rank) for j in dominated_by[i])]
+        for i in front:
+            ranks[i] = rank
+        rank += 1
+    return ranks
+
+
+@pytest.mark.parametrize('method', ['matrix', 'blockwise', 'sweep'])
+@pytest.mark.parametrize('maximize', [[True, False], [False, True, True],
+                                      [True], [False] * 4])
+def test_methods_match_reference(method, maximize):
+    """Every method should agree with the pairwise ranking, including for
+    duplicated fitnesses."""
+    if method == 'sweep' and len(maximize) > 3:
+        pytest.skip("'sweep' handles at most three objectives")
+    problem = _Objectives(maximize)
+    rng = np.random.default_rng(17)
+    for fitnesses in [rng.uniform(size=(60, len(maximize))),
+                      rng.integers(0, 4, size=(60, len(maximize)))]:
+        expected = _reference_ranks(fitnesses, problem)
+        ranks = nondominated_ranks(fitnesses, problem.maximize, method=method)
+        np.testing.assert_array_equal(ranks, expected)
+
+
+def test_blockwise_small_blocks(monkeypatch):
+    """The blockwise method should give the same ranks however small its
+    blocks are."""
+    import leap_ec.multiobjective.ranking as ranking
+    fitnesses = np.random.default_rng(3).uniform(size=(200, 3))
+    expected = nondominated_ranks(fitnesses, method='matrix')
+
+    monkeypatch.setattr(ranking, '_BLOCK_ELEMENTS', 1)
+    np.testing.assert_array_equal(
+        nondominated_ranks(fitnesses, method='blockwise'), expected)
+
+
+def test_nan_is_worst():
+    """A NaN objective value should be treated as the worst value."""
+    fitnesses = np.array([[1.0, np.nan], [0.0, 0.0], [1.0, 1.0]])
+    np.testing.assert_array_equal(nondominated_ranks(fitnesses), [2, 2, 1])
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        nondominated_ranks(np.zeros(3))
+    with pytest.raises(ValueError):
+        nondominated_ranks(np.zeros((3, 4)), method='sweep')
+    with pytest.raises(ValueError):
+        nondominated_ranks(np.zeros((3, 2)), method='bogus')
+
+
+def test_operators_on_population():
+    """The sorting operators should write the ranks of a Population straight
+    into its `ranks` array, and rank any parents along with it."""
+    problem = _Objectives([False, False])
+    fitnesses = np.random.default_rng(5).uniform(size=(30, 2))
+    expected = nondominated_ranks(fitnesses, problem.maximize)
+
+    pop = Individual.evaluate_population(Population(fitnesses, problem=problem))
+    rank_ordinal_sort(pop)
+    np.testing.assert_array_equal(pop.ranks, expected)
+
+    offspring = Individual.evaluate_population(
+        Population(fitnesses[:10], problem=problem))
+    parents = Individual.evaluate_population(
+        Population(fitnesses[10:], problem=problem))
+    ranked = fast_nondominated_sort(offspring, parents=parents)
+    np.testing.assert_array_equal([ind.rank for ind in ranked], expected)
+
+
+##############################
+# Tests for crowding_distances()
+##############################
+def test_crowding_distances_per_front():
+    """Computing every front's distances at once should give the same
+    distances as computing each front's separately."""
+    maximize = np.array([1, -1, 1])
+    fitnesses = np.random.default_rng(11).integers(0, 5, size=(80, 3))
+    ranks = nondominated_ranks(fitnesses, maximize)
+
+    distances = crowding_distances(fitnesses, ranks, maximize)
+
+    for rank in np.unique(ranks):
+        front = ranks == rank
+        np.testing.assert_array_equal(
+            distances[front],
+            crowding_distances(fitnesses[front], maximize=maximize))
+
+
+def test_crowding_distances_single_front():
+    """The ends of a front get an infinite distance, and the others the
+    normalized gaps between their neighbors."""
+    fitnesses = np.array([[0.0, 4.0], [3.0, 1.0], [1.0, 2.0], [4.0, 0.0]])
+    np.testing.assert_array_almost_equal(
+        crowding_distances(fitnesses, maximize=[-1, -1]),
+        [np.inf, 3.0 / 4 + 2.0 / 4, 3.0 / 4 + 3.0 / 4, np.inf])
+
+    # A front whose members are all the same has nothing to crowd
+    np.testing.assert_array_equal(
+        crowding_distances(np.ones((3, 2))), [0.0, 0.0, 0.0])
+
+
+def test_crowding_distance_calc_population():
+    """crowding_distance_calc() should write a Population's distances
+    straight into its `distances` array."""
+    problem = _Objectives([False, False])
+    fitnesses = np.random.default_rng(7).uniform(size=(40, 2))
+    pop = Individual.evaluate_population(Population(fitnesses, problem=problem))
+
+    result = crowding_distance_calc(rank_ordinal_sort(pop))
+
+    assert result is pop
+    np.testing.assert_array_equal(
+        pop.distances,
+        crowding_distances(fitnesses, pop.ranks, problem.maximize))
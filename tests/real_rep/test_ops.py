@@ -98,3 +98,40 @@ def test_mutate_gaussian2():
     _, p = stats.kstest(gene1_values, 'norm')
     print(p)
     assert(p <= p_threshold)
+
+
+##############################
+# Tests for batch_mutate_gaussian()
+##############################
+@pytest.mark.stochastic
+def test_batch_mutate_gaussian():
+    """Batch Gaussian mutation should perturb every gene of every individual
+    with the given per-gene standard deviations."""
+    N = 5000
+    pop = [Individual(np.array([0.0, 100.0])) for _ in range(N)]
+
+    result = ops.batch_mutate_gaussian(pop, std=[10, 0.5],
+                                       expected_num_mutations='isotropic')
+
+    genomes = np.array([ind.genome for ind in result])
+    p_threshold = 0.01
+    _, p = stats.kstest(genomes[:, 0]/10, 'norm')
+    assert(p > p_threshold)
+    _, p = stats.kstest((genomes[:, 1] - 100)/0.5, 'norm')
+    assert(p > p_threshold)
+
+
+def test_batch_mutate_gaussian_bounds():
+    """Batch Gaussian mutation should respect the hard bounds and invalidate
+    fitnesses."""
+    pop = [Individual(np.array([0.0, 0.0])) for _ in range(10)]
+    for ind in pop:
+        ind.fitness = 1.0
+
+    result = ops.batch_mutate_gaussian(pop, std=100,
+                                       expected_num_mutations='isotropic',
+                                       bounds=(-1, 1))
+
+    for ind in result:
+        assert(np.all(np.abs(ind.genome) <= 1))
+        assert(ind.fitness is None)
@@ -1,8 +1,10 @@
 """Unit tests for LEAP's suite of real-valued fitness functions."""
 import numpy as np
+import pytest
 from pytest import approx
 
-from leap_ec import Individual
+from leap_ec import Individual, ops
+from leap_ec.population import Population
 from leap_ec.real_rep import problems
 
 
@@ -32,3 +34,67 @@ def test_WeierstrassProblem_eval():
 
     assert(approx(0) == p.evaluate(np.array([0, 0])))
     assert(approx(0) == p.evaluate(np.array([0]*25)))
+
+
+########################
+# Tests for evaluate_multiple()
+########################
+_vectorized_problems = [
+    problems.SpheroidProblem(),
+    problems.RastriginProblem(a=2.0),
+    problems.RosenbrockProblem(),
+    problems.AckleyProblem(),
+    problems.GriewankProblem(),
+    problems.SchwefelProblem(),
+    problems.WeierstrassProblem(kmax=10),
+    problems.LangermannProblem(),
+    problems.LunacekProblem(N=2),
+    problems.CosineFamilyProblem(alpha=1.0, global_optima_counts=[2, 3],
+                                 local_optima_counts=[2, 3]),
+    problems.TranslatedProblem(problems.RastriginProblem(), offset=[1.0, -2.0]),
+    problems.ScaledProblem(problems.AckleyProblem(), new_bounds=(0, 1)),
+    problems.MatrixTransformedProblem(
+        problems.TranslatedProblem(problems.RosenbrockProblem(), offset=[0.5, 0.5]),
+        matrix=[[0, -1], [1, 0]])
+]
+
+
+@pytest.mark.parametrize('problem', _vectorized_problems, ids=str)
+def test_evaluate_multiple(problem):
+    """Evaluating a matrix of phenomes in one call should give the same
+    fitnesses as evaluating them one at a time."""
+    phenomes = np.random.uniform(-5, 5, size=(20, 2))
+
+    fitnesses = problem.evaluate_multiple(phenomes)
+
+    assert isinstance(fitnesses, np.ndarray)
+    assert fitnesses.shape == (20,)
+    expected = [problem.evaluate(p) for p in phenomes]
+    assert fitnesses == approx(expected)
+
+    # A list of phenomes should work too
+    assert problem.evaluate_multiple(list(phenomes)) == approx(expected)
+
+
+def test_grouped_evaluate():
+    """grouped_evaluate() should evaluate a whole generation with a single
+    call to a vectorized problem."""
+    class CountingSpheroid(problems.SpheroidProblem):
+        calls = 0
+
+        def evaluate_multiple(self, phenomes, *args, **kwargs):
+            CountingSpheroid.calls += 1
+            return super().evaluate_multiple(phenomes)
+
+    problem = CountingSpheroid()
+    genomes = np.random.uniform(-5, 5, size=(30, 4))
+    pop = [Individual(g, problem=problem) for g in genomes]
+    population = Population(genomes.copy(), problem=problem)
+
+    ops.grouped_evaluate(pop)
+    ops.grouped_evaluate(population)
+
+    assert CountingSpheroid.calls == 2
+    expected = np.sum(genomes ** 2, axis=1)
+    assert [ind.fitness for ind in pop] == approx(expected)
+    assert population.fitnesses == approx(expected)
@@ -0,0 +1,127 @@
+"""Unit tests for the checkpoint module."""
+import os
+import random
+
+import numpy as np
+import pytest
+
+from leap_ec import Representation, ops, context
+from leap_ec.algorithm import generational_ea
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.ops import mutate_bitflip
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.checkpoint import Checkpointer, load_checkpoint, save_checkpoint
+
+
+@pytest.fixture(autouse=True)
+def preserve_random_state():
+    """These tests seed and restore the random number generators, so put them
+    back afterwards, to leave the other tests' random numbers random."""
+    random_state, numpy_random_state = random.getstate(), np.random.get_state()
+    yield
+    random.setstate(random_state)
+    np.random.set_state(numpy_random_state)
+
+
+class _BestSoFar:
+    """A pipeline probe that remembers the best fitness it has seen."""
+    def __init__(self):
+        self.best = None
+
+    def __call__(self, next_individual):
+        while True:
+            ind = next(next_individual)
+            if self.best is None or ind.fitness > self.best:
+                self.best = ind.fitness
+            yield ind
+
+
+def _run(max_generations, checkpointer, probe):
+    return generational_ea(max_generations=max_generations, pop_size=5,
+                           problem=MaxOnes(),
+                           representation=Representation(
+                               initialize=create_binary_sequence(length=10)),
+                           pipeline=[ops.tournament_selection,
+                                     ops.clone,
+                                     mutate_bitflip(expected_num_mutations=1),
+                                     ops.evaluate,
+                                     probe,
+                                     ops.pool(size=5)],
+                           checkpointer=checkpointer)
+
+
+##############################
+# Tests for generational_ea() with a checkpointer
+##############################
+def test_resume_matches_uninterrupted_run(tmp_path):
+    """A run that is stopped and then resumed should end up exactly where an
+    uninterrupted run with the same seed would have."""
+    random.seed(123)
+    np.random.seed(123)
+    expected = _run(6, None, _BestSoFar())
+
+    random.seed(123)
+    np.random.seed(123)
+    path = tmp_path / 'run.pkl'
+    _run(3, Checkpointer(path, every=2), _BestSoFar())
+    assert load_checkpoint(path)['generation'] == 3
+
+    # Scramble the generators, which the checkpoint should restore
+    random.seed(999)
+    np.random.seed(999)
+    resumed = _run(6, Checkpointer(path, every=2), _BestSoFar())
+
+    assert context['leap']['generation'] == 6
+    assert [ind.genome.tolist() for ind in resumed] == \
+           [ind.genome.tolist() for ind in expected]
+
+
+def test_resume_restores_stateful(tmp_path):
+    """The attributes of the stateful objects should be saved and restored."""
+    path = tmp_path / 'run.pkl'
+    probe = _BestSoFar()
+    _run(2, Checkpointer(path, stateful=[probe]), probe)
+    best = probe.best
+
+    resumed_probe = _BestSoFar()
+    checkpointer = Checkpointer(path, stateful=[resumed_probe])
+    checkpointer.load()
+    assert resumed_probe.best == best
+
+    with pytest.raises(ValueError):
+        Checkpointer(path).load()
+
+
+def test_no_resume(tmp_path):
+    """With resume=False, a new run should be started over the old one."""
+    path = tmp_path / 'run.pkl'
+    _run(3, Checkpointer(path), _BestSoFar())
+    _run(2, Checkpointer(path, resume=False), _BestSoFar())
+    assert context['leap']['generation'] == 2
+    assert load_checkpoint(path)['generation'] == 2
+
+
+##############################
+# Tests for save_checkpoint() and Checkpointer
+##############################
+def test_save_checkpoint_atomic(tmp_path):
+    """A failed save should leave the previous checkpoint intact, and no
+    temporary files behind."""
+    path = tmp_path / 'run.pkl'
+    save_checkpoint(path, {'generation': 1})
+
+    with pytest.raises(Exception):
+        save_checkpoint(path, {'generation': 2, 'bad': lambda: None})
+
+    assert load_checkpoint(path) == {'generation': 1}
+    assert os.listdir(tmp_path) == ['run.pkl']
+
+
+def test_checkpointer_every(tmp_path):
+    """Checkpoints should only be saved every so many steps, or when forced."""
+    checkpointer = Checkpointer(tmp_path / 'run.pkl', every=3)
+    saved = [checkpointer.step(step, {}) for step in range(1, 8)]
+    assert saved == [False, False, True, False, False, True, False]
+
+    assert checkpointer.step(7, {'final': True}, force=True)
+    assert checkpointer.load() == {'final': True, 'step': 7}
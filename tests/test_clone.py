@@ -1,12 +1,16 @@
 """
     Unit tests for cloning
 """
+import itertools
+import pickle
+
 import numpy as np
 
-from leap_ec.individual import Individual
+from leap_ec.individual import Individual, CompactIndividual
 from leap_ec.decoder import IdentityDecoder
 from leap_ec.binary_rep.problems import MaxOnes
 import leap_ec.ops as ops
+from leap_ec.population import Population
 
 
 def test_clone():
@@ -32,3 +36,83 @@ def test_clone():
 
     assert original.uuid != cloned.uuid
     assert original.uuid in cloned.parents
+
+
+def test_clone_copies_numpy_genome():
+    """Cloning should give the clone its own copy of a numpy genome."""
+    original = Individual(np.array([0, 1, 1]), problem=MaxOnes())
+    cloned = original.clone()
+
+    cloned.genome[0] = 1
+    assert original.genome.tolist() == [0, 1, 1]
+
+
+##############################
+# Tests for CompactIndividual
+##############################
+def test_compact_clone():
+    """Compact clones get the next integer ID and no lineage by default."""
+    original = CompactIndividual(np.array([0, 1, 1]), problem=MaxOnes())
+    original.evaluate()
+    cloned = original.clone()
+
+    assert isinstance(original.uuid, int)
+    assert cloned.uuid > original.uuid
+    assert cloned.fitness is None
+    assert cloned.parents == frozenset()
+
+    cloned.genome[0] = 1
+    assert original.genome.tolist() == [0, 1, 1]
+    assert cloned.evaluate() == 3
+
+
+def test_compact_ancillary():
+    """Ancillary attributes are only copied to clones when copy_ancillary is
+    turned on."""
+    class CopyingIndividual(CompactIndividual):
+        copy_ancillary = True
+
+    for cls, copied in ((CompactIndividual, False), (CopyingIndividual, True)):
+        original = cls(np.array([0, 1]), problem=MaxOnes())
+        assert original.clone().parents == frozenset()
+        original.rank = 3
+        assert hasattr(original.clone(), 'rank') == copied
+        assert original.rank == 3
+
+
+def test_compact_lineage():
+    """Lineage is recorded when track_lineage is turned on, including through
+    crossover."""
+    class TrackedIndividual(CompactIndividual):
+        track_lineage = True
+
+    first = TrackedIndividual(np.array([0, 0]))
+    second = TrackedIndividual(np.array([1, 1]))
+
+    children = list(itertools.islice(
+        ops.UniformCrossover()(ops.clone(ops.naive_cyclic_selection([first, second]))), 2))
+
+    assert children[0].parents == {first.uuid, second.uuid}
+    assert children[1].parents == {first.uuid, second.uuid}
+
+
+def test_compact_population():
+    """CompactIndividuals can be packed into a Population and cloned back
+    out of it."""
+    inds = [CompactIndividual(np.array([0, 1]), problem=MaxOnes()),
+            CompactIndividual(np.array([1, 1]), problem=MaxOnes())]
+    pop = Population.from_individuals(inds)
+
+    assert isinstance(pop[0], CompactIndividual)
+    assert pop[1].uuid == inds[1].uuid
+    Individual.evaluate_population(pop)
+
+    cloned = pop[1].clone()
+    assert type(cloned) is CompactIndividual
+    assert cloned.uuid > inds[1].uuid
+    cloned.genome[:] = 0
+    assert pop.genomes[1].tolist() == [1, 1]
+
+    restored = pickle.loads(pickle.dumps(pop))
+    assert restored[0].uuid == inds[0].uuid
+    assert restored.fitnesses.tolist() == [1, 2]
@@ -219,3 +219,28 @@ def test_n_ary_crossover_probability():
     observed_dist = {'Unmodified': unmodified_count,
                      'Modified'  : N - unmodified_count}
     assert (stat.equals_uniform(observed_dist, p=p))
+
+
+##############################
+# Tests for batch crossover operators
+##############################
+def test_batch_uniform_crossover():
+    """With a 100% swap probability, adjacent pairs should swap genomes."""
+    pop = [Individual(np.array([0, 0])), Individual(np.array([1, 1])),
+           Individual(np.array([2, 2])), Individual(np.array([3, 3]))]
+
+    result = ops.batch_uniform_crossover(pop, p_swap=1.0)
+
+    assert([ind.genome.tolist() for ind in result] ==
+           [[1, 1], [0, 0], [3, 3], [2, 2]])
+
+
+def test_batch_n_ary_crossover():
+    """Crossover should exchange genes between the two individuals of a pair,
+    so their children remain complementary."""
+    pop = [Individual(np.array([0, 0, 0, 0])),
+           Individual(np.array([1, 1, 1, 1]))]
+
+    result = ops.batch_n_ary_crossover(pop, num_points=2)
+
+    assert((result[0].genome + result[1].genome).tolist() == [1, 1, 1, 1])
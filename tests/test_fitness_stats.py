@@ -0,0 +1,206 @@
+"""
+    Unit tests for leap_ec.fitness_stats and the probes that use it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+import numpy as np
+import pytest
+
+from leap_ec import ops
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.ops import mutate_bitflip
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.distrib import executor as executor_backend
+from leap_ec.distrib.asynchronous import greedy_insert_into_pop, \
+    tournament_insert_into_pop
+from leap_ec.distrib.individual import DistributedIndividual
+from leap_ec.fitness_stats import RunningFitnessStats, fitness_stats
+from leap_ec.global_vars import context
+from leap_ec.individual import Individual
+from leap_ec.multiobjective.problems import SCHProblem
+from leap_ec.population import Population
+from leap_ec.multiobjective.asynchronous import ENLUInserter
+from leap_ec.probe import FitnessStatsCSVProbe, RunningFitnessStatsCSVProbe
+from leap_ec.representation import Representation
+
+
+##############################
+# Tests for RunningFitnessStats
+##############################
+@pytest.mark.parametrize('shape', [(100,), (100, 3)])
+def test_running_matches_batch(shape):
+    """Adding fitnesses one at a time, or in batches, should give the same
+    statistics as computing them all at once."""
+    fitnesses = np.random.normal(loc=1e6, size=shape)
+    expected = fitness_stats(fitnesses)
+
+    one_at_a_time = RunningFitnessStats()
+    for f in fitnesses:
+        one_at_a_time.add(f)
+
+    batches = RunningFitnessStats()
+    for batch in np.array_split(fitnesses, 7):
+        batches.add_many(batch)
+
+    for running in (one_at_a_time, batches):
+        stats = running.stats()
+        assert stats.count == 100
+        for name in ('mean', 'std', 'min', 'max'):
+            assert np.allclose(getattr(stats, name), getattr(expected, name))
+
+
+def test_running_nonviable():
+    """NaN fitnesses should be counted but left out of the statistics."""
+    running = RunningFitnessStats()
+    assert running.stats() is None
+
+    running.add_many(np.array([[1.0, 2.0], [np.nan, 0.0]]))
+    running.add([np.nan, np.nan])
+    running.add([3.0, 4.0])
+
+    assert running.num_nonviable == 2
+    assert running.stats().count == 2
+    assert running.stats().mean.tolist() == [2.0, 3.0]
+
+
+@pytest.mark.parametrize('shape', [(300,), (300, 2)])
+def test_running_sliding_window(shape):
+    """Replacing fitnesses one at a time should track the statistics of the
+    fitnesses that remain."""
+    fitnesses = np.random.normal(loc=1e3, size=shape)
+    running = RunningFitnessStats()
+    running.add_many(fitnesses[:20])
+    for i in range(20, len(fitnesses)):
+        running.replace(fitnesses[i - 20], fitnesses[i])
+    window = fitnesses[-20:]
+
+    assert not running.bounds_known
+    running.refresh_bounds(window)
+    stats, expected = running.stats(), fitness_stats(window)
+    assert stats.count == 20
+    for name in ('mean', 'std', 'min', 'max'):
+        assert np.allclose(getattr(stats, name), getattr(expected, name))
+
+
+def test_running_remove():
+    """Removing a fitness that isn't a bound keeps the bounds, and removing
+    them all starts over."""
+    running = RunningFitnessStats()
+    running.add_many([1.0, 2.0, 3.0, np.nan])
+    running.remove(2.0)
+    running.remove(np.nan)
+    assert running.bounds_known and running.num_nonviable == 0
+    assert running.stats() == (2, 2.0, 1.0, 1.0, 3.0)
+
+    running.remove(1.0)
+    running.remove(3.0)
+    assert running.stats() is None
+    running.add(5.0)
+    assert running.stats() == (1, 5.0, 0.0, 5.0, 5.0)
+
+
+##############################
+# Tests for the probes
+##############################
+def test_FitnessStatsCSVProbe_population():
+    """The probe should write the same thing for a Population as for a list
+    of the same individuals."""
+    context['leap']['generation'] = 3
+    genomes = np.random.randint(0, 2, size=(10, 8))
+    pop = Individual.evaluate_population(Population(genomes, problem=MaxOnes()))
+    inds = Individual.evaluate_population(
+        [Individual(g, problem=MaxOnes()) for g in genomes])
+
+    streams = [io.StringIO(), io.StringIO()]
+    for stream, population in zip(streams, (pop, inds)):
+        FitnessStatsCSVProbe(stream=stream)(population)
+
+    pop_row = [float(x) for x in streams[0].getvalue().splitlines()[1].split(',')]
+    inds_row = [float(x) for x in streams[1].getvalue().splitlines()[1].split(',')]
+    assert pop_row == pytest.approx(inds_row)
+    assert pop_row[1] == genomes.sum(axis=1).max()
+
+
+def test_FitnessStatsCSVProbe_multiobjective():
+    """Each statistic should be given for each objective."""
+    context['leap']['generation'] = 0
+    problem = SCHProblem()
+    pop = Individual.evaluate_population(
+        [Individual(np.array(x), problem=problem) for x in (0.0, 1.0, 2.0)])
+    stream = io.StringIO()
+    FitnessStatsCSVProbe(stream=stream)(pop)
+
+    row = stream.getvalue().splitlines()[1]
+    # SCH's objectives are x^2 and (x - 2)^2
+    assert '[1.666' in row
+    assert 'min_fitness' in stream.getvalue()
+    assert row.endswith('[0.0, 0.0], [4.0, 4.0]')
+
+
+def test_RunningFitnessStatsCSVProbe_multiobjective():
+    """The running probe should handle fitness vectors, too."""
+    problem = SCHProblem()
+    probe = RunningFitnessStatsCSVProbe(ENLUInserter(), stream=io.StringIO(),
+                                        header=False)
+    pop = []
+    for x in (0.0, 1.0, 2.0, 3.0):
+        ind = Individual(np.array(x), problem=problem)
+        ind.evaluate()
+        probe(ind, pop, 3)
+
+    # x = 3 is dominated by x = 2, so it's the one dropped
+    assert probe.stats.stats().max.tolist() == [4.0, 4.0]
+    assert probe.stream.getvalue().splitlines()[-1].endswith('[0.0, 0.0], [4.0, 4.0]')
+
+
+@pytest.mark.parametrize('inserter', [greedy_insert_into_pop,
+                                      tournament_insert_into_pop])
+def test_RunningFitnessStatsCSVProbe_steady_state(inserter):
+    """As the inserter of a steady-state EA, the probe's statistics should
+    be those of the population as it is after each insertion."""
+    representation = Representation(create_binary_sequence(20),
+                                     individual_cls=DistributedIndividual)
+    stream = io.StringIO()
+    probe = RunningFitnessStatsCSVProbe(inserter, stream=stream)
+    snapshots = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pop = executor_backend.steady_state(
+            executor, max_births=100, init_pop_size=10, pop_size=10,
+            representation=representation, problem=MaxOnes(),
+            offspring_pipeline=[ops.random_selection,
+                                ops.clone,
+                                mutate_bitflip(expected_num_mutations=1),
+                                ops.pool(size=1)],
+            inserter=probe,
+            pop_probe=lambda p: snapshots.append(fitness_stats(
+                [ind.fitness for ind in p])))
+
+    rows = [[float(x) for x in line.split(',')]
+            for line in stream.getvalue().splitlines()[1:]]
+    assert len(rows) == len(snapshots) == 110
+    for row, expected in zip(rows, snapshots):
+        assert row[2:] == pytest.approx([expected.mean, expected.std,
+                                         expected.min, expected.max])
+    assert probe.stats.count == len(pop)
+
+
+def test_RunningFitnessStatsCSVProbe_needs_evictions():
+    """An inserter that doesn't report its evictions is rejected."""
+    def silent_inserter(ind, pop, pop_size):
+        if len(pop) < pop_size:
+            pop.append(ind)
+        else:
+            pop[0] = ind
+
+    probe = RunningFitnessStatsCSVProbe(silent_inserter, stream=io.StringIO())
+    pop = []
+    for genome in ([0, 1], [1, 1]):
+        ind = Individual(np.array(genome), problem=MaxOnes())
+        ind.evaluate()
+        if not pop:
+            probe(ind, pop, 1)
+        else:
+            with pytest.raises(ValueError):
+                probe(ind, pop, 1)
@@ -13,6 +13,7 @@ from leap_ec import Individual
 from leap_ec import ops, problem, context, statistical_helpers
 from leap_ec.binary_rep.problems import MaxOnes
 from leap_ec.data import test_population
+from leap_ec.probe import best_of_gen
 from leap_ec.real_rep.problems import SpheroidProblem
 
 
@@ -636,6 +637,68 @@ def test_truncation_selection_with_nan2():
     assert pop[1] == best[0]
 
 
+def test_truncation_selection_ties():
+    """Ties should be broken in favor of offspring over parents, and of
+    earlier over later individuals."""
+    problem = MaxOnes()
+    offspring = [Individual(np.array([1, 0]), problem=problem),
+                 Individual(np.array([0, 1]), problem=problem)]
+    parents = [Individual(np.array([1, 0]), problem=problem)]
+    offspring = Individual.evaluate_population(offspring)
+    parents = Individual.evaluate_population(parents)
+
+    truncated = ops.truncation_selection(offspring, 2, parents=parents)
+
+    assert truncated[0] is offspring[0]
+    assert truncated[1] is offspring[1]
+
+
+class _CloseToFiveProblem(problem.FunctionProblem):
+    """Over-rides worse_than() to prefer fitnesses closest to 5, but not
+    ordering_key()."""
+    def __init__(self):
+        super().__init__(sum, maximize=True)
+
+    def worse_than(self, first_fitness, second_fitness):
+        return abs(first_fitness - 5) > abs(second_fitness - 5)
+
+
+def test_selection_custom_worse_than():
+    """Selection should follow a custom worse_than() that ordering keys
+    don't know about."""
+    p = _CloseToFiveProblem()
+    pop = [Individual(np.array([100.0]), problem=p),
+           Individual(np.array([5.0]), problem=p),
+           Individual(np.array([-3.0]), problem=p)]
+    pop = Individual.evaluate_population(pop)
+
+    assert ops.selection_keys(pop) is None
+    assert max(pop) is pop[1]
+    assert best_of_gen(pop) is pop[1]
+    assert ops.truncation_selection(pop, size=1)[0] is pop[1]
+    assert ops.elitist_survival(pop[2:], pop[:2], k=1)[0] is pop[1]
+
+
+##############################
+# Tests for insertion_selection()
+##############################
+def test_insertion_selection():
+    """Every offspring should get to compete with a parent, so with a single
+    parent slot the best offspring should end up in it."""
+    problem = MaxOnes()
+    parents = [Individual(np.array([0, 0, 0]), problem=problem)]
+    offspring = [Individual(np.array([1, 1, 1]), problem=problem),
+                 Individual(np.array([0, 0, 1]), problem=problem),
+                 Individual(np.array([0, 1, 1]), problem=problem)]
+    parents = Individual.evaluate_population(parents)
+    offspring = Individual.evaluate_population(offspring)
+
+    survivors = ops.insertion_selection(offspring, parents=parents)
+
+    assert survivors[0] is offspring[0]
+    assert parents[0].genome.tolist() == [0, 0, 0]
+
+
 ##############################
 # Tests for tournament_selection()
 ##############################
@@ -720,6 +783,59 @@ def test_tournament_selection_indices():
     assert(pop[idx] is s)
 
 
+##############################
+# Tests for batch_tournament_selection()
+##############################
+@pytest.mark.stochastic
+def test_batch_tournament_selection1():
+    """If there are just two individuals in the population, then batched binary
+    tournament selection will select the better one with 75% probability."""
+    pop = [Individual(np.array([0, 0, 0]), problem=MaxOnes()),
+           Individual(np.array([1, 1, 1]), problem=MaxOnes())]
+    pop[0].id = 0
+    pop[1].id = 1
+
+    pop = Individual.evaluate_population(pop)
+    selected = ops.batch_tournament_selection(pop)
+
+    N = 1000
+    p_thresh = 0.1
+    observed_dist = statistical_helpers.collect_distribution(lambda: next(selected).id, samples=N)
+    expected_dist = { pop[0].id: 0.25*N, pop[1].id: 0.75*N }
+    assert(statistical_helpers.stochastic_equals(expected_dist, observed_dist, p=p_thresh))
+
+
+def test_batch_tournament_selection_direction():
+    """With a large tournament, the best individual should always win,
+    respecting minimization, select_worst, and NaN fitnesses."""
+    pop = [Individual(np.array([0.0]), problem=SpheroidProblem()),
+           Individual(np.array([1.0]), problem=SpheroidProblem()),
+           Individual(np.array([2.0]), problem=SpheroidProblem())]
+    pop = Individual.evaluate_population(pop)
+    pop[0].fitness = nan
+
+    indices = []
+    best = ops.batch_tournament_selection(pop, k=50, indices=indices)
+    assert(next(best) is pop[1])
+    assert(indices == [1])
+
+    worst = ops.batch_tournament_selection(pop, k=50, select_worst=True)
+    assert(next(worst) is pop[0])
+
+
+def test_batch_tournament_selection_tuple_key():
+    """Tuple keys should be compared lexicographically."""
+    pop = [Individual(np.array([0])), Individual(np.array([1])),
+           Individual(np.array([2]))]
+    pop[0].rank, pop[0].distance = 1, 0.5
+    pop[1].rank, pop[1].distance = 1, 2.0
+    pop[2].rank, pop[2].distance = 2, 9.0
+
+    selected = ops.batch_tournament_selection(pop, k=50,
+                                              key=lambda x: (-x.rank, x.distance))
+    assert(next(selected) is pop[1])
+
+
 ##############################
 # Tests for random_selection()
 ##############################
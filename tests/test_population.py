@@ -0,0 +1,221 @@
+"""
+    Unit tests for the array-backed Population
+"""
+import pickle
+from copy import copy
+
+import numpy as np
+import pytest
+import toolz
+
+from leap_ec import ops, probe
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.binary_rep.ops import mutate_bitflip
+from leap_ec.individual import Individual, RobustIndividual
+from leap_ec.multiobjective.ops import rank_ordinal_sort, crowding_distance_calc
+from leap_ec.multiobjective.problems import SCHProblem
+from leap_ec.population import Population, genome_matrix, fitness_array
+
+
+def _maxones_population():
+    genomes = np.array([[0, 0, 0, 0],
+                        [1, 0, 0, 0],
+                        [1, 1, 0, 0],
+                        [1, 1, 1, 0]])
+    pop = Population(genomes, problem=MaxOnes())
+    return Individual.evaluate_population(pop)
+
+
+##############################
+# Tests for array storage
+##############################
+def test_views_share_memory():
+    """The genomes and fitnesses of the individuals should live in the
+    population's arrays."""
+    pop = _maxones_population()
+
+    assert np.shares_memory(pop[2].genome, pop.genomes)
+    assert genome_matrix(pop) is pop.genomes
+    assert fitness_array(pop) is pop.fitnesses
+    np.testing.assert_array_equal(pop.fitnesses, [0, 1, 2, 3])
+
+    pop[0].fitness = 10
+    assert pop.fitnesses[0] == 10
+
+
+def test_helpers_on_lists():
+    """genome_matrix() and fitness_array() should also work on plain lists."""
+    pop = _maxones_population()
+    inds = [ind.clone() for ind in pop]
+    for ind in inds:
+        ind.evaluate()
+
+    np.testing.assert_array_equal(genome_matrix(inds), pop.genomes)
+    np.testing.assert_array_equal(fitness_array(inds), pop.fitnesses)
+
+
+def test_multiobjective_fitness():
+    """Assigning vector fitnesses should give a 2-D fitness array."""
+    pop = Population(np.array([[0.0], [1.0], [2.0]]), problem=SCHProblem())
+    Individual.evaluate_population(pop)
+
+    assert pop.fitnesses.shape == (3, 2)
+    np.testing.assert_array_equal(pop[1].fitness, [1, 1])
+
+
+def test_rank_and_distance_arrays():
+    """NSGA-II bookkeeping should be written into the parallel arrays."""
+    pop = Population(np.array([[0.0], [1.0], [2.0], [-1.0]]),
+                     problem=SCHProblem())
+    Individual.evaluate_population(pop)
+    assert not hasattr(pop[0], 'rank')
+
+    rank_ordinal_sort(pop)
+    crowding_distance_calc(pop)
+
+    np.testing.assert_array_equal(pop.ranks, [ind.rank for ind in pop])
+    np.testing.assert_array_equal(pop.distances, [ind.distance for ind in pop])
+    assert pop.ranks.tolist() == [1, 1, 1, 2]
+
+
+##############################
+# Tests for detaching individuals
+##############################
+def test_clone_is_free_standing():
+    """Clones of a view shouldn't alias the population."""
+    pop = _maxones_population()
+    child = pop[1].clone()
+
+    assert type(child) is Individual
+    assert pop[1].uuid in child.parents
+    child.genome[:] = 1
+    assert pop.genomes[1].tolist() == [1, 0, 0, 0]
+
+
+def test_individual_cls():
+    """Views should use the behavior of the population's individual_cls."""
+    inds = [RobustIndividual(np.array([0, 1]), problem=MaxOnes()),
+            RobustIndividual(np.array([1, 1]), problem=MaxOnes())]
+    pop = Population.from_individuals(inds)
+
+    assert isinstance(pop[0], RobustIndividual)
+    pop[0].evaluate()
+    assert pop[0].is_viable
+
+    assert type(pop[0].clone()) is RobustIndividual
+
+
+def test_pickle():
+    """Pickling should round-trip the arrays and individual attributes."""
+    pop = _maxones_population()
+    pop[2].is_viable = True
+
+    restored = pickle.loads(pickle.dumps(pop))
+
+    assert isinstance(restored, Population)
+    np.testing.assert_array_equal(restored.genomes, pop.genomes)
+    np.testing.assert_array_equal(restored.fitnesses, pop.fitnesses)
+    assert restored[2].uuid == pop[2].uuid
+    assert restored[2].is_viable
+    assert np.shares_memory(restored[3].genome, restored.genomes)
+
+    # Individual views are pickled as free-standing individuals
+    ind = pickle.loads(pickle.dumps(pop[3]))
+    assert type(ind) is Individual
+    assert ind.fitness == 3
+
+
+def test_copy():
+    """A copy should have its own arrays."""
+    pop = _maxones_population()
+    copied = copy(pop)
+
+    copied[0].genome[:] = 1
+    assert pop.genomes[0].tolist() == [0, 0, 0, 0]
+    assert copied[0].uuid == pop[0].uuid
+
+
+##############################
+# Tests for the list interface
+##############################
+def test_setitem():
+    """Assigning an individual should overwrite the row and detach the
+    previous occupant."""
+    pop = _maxones_population()
+    old = pop[0]
+    new = Individual(np.array([1, 1, 1, 1]), problem=MaxOnes())
+    new.fitness = 4
+
+    pop[0] = new
+
+    assert pop.genomes[0].tolist() == [1, 1, 1, 1]
+    assert pop.fitnesses[0] == 4
+    assert pop[0].uuid == new.uuid
+    assert old.genome.tolist() == [0, 0, 0, 0]
+    assert old.fitness == 0
+    assert not hasattr(old, '_population')
+
+
+def test_append_and_delete():
+    """Growing and shrinking the population should keep rows aligned."""
+    pop = _maxones_population()
+    extra = Individual(np.array([1, 1, 1, 1]), problem=MaxOnes())
+    pop.append(extra)
+
+    assert len(pop) == 5
+    assert pop.genomes.shape == (5, 4)
+    assert pop[4].fitness is None
+
+    removed = pop.pop(1)
+    assert removed.genome.tolist() == [1, 0, 0, 0]
+    assert pop.genomes[:, 0].tolist() == [0, 1, 1, 1]
+    for i, ind in enumerate(pop):
+        assert np.shares_memory(ind.genome, pop.genomes[i])
+
+    pop.insert(0, removed)
+    assert pop.genomes[:, 0].tolist() == [1, 0, 1, 1, 1]
+    assert pop[0].fitness == 1
+
+
+def test_sort():
+    """Sorting should reorder the arrays along with the individuals."""
+    pop = _maxones_population()
+    pop.sort(reverse=True)
+
+    assert pop.fitnesses.tolist() == [3, 2, 1, 0]
+    assert pop.genomes.sum(axis=1).tolist() == [3, 2, 1, 0]
+    assert [ind._index for ind in pop] == [0, 1, 2, 3]
+
+
+##############################
+# Tests for pipelines
+##############################
+def test_pipeline():
+    """A Population should flow through an ordinary pipeline and be
+    repackable at the end."""
+    pop = _maxones_population()
+
+    offspring = toolz.pipe(pop,
+                           ops.tournament_selection,
+                           ops.clone,
+                           mutate_bitflip(expected_num_mutations=1),
+                           ops.evaluate,
+                           ops.pool(size=len(pop)),
+                           Population.from_individuals)
+
+    assert isinstance(offspring, Population)
+    assert offspring.genomes.shape == pop.genomes.shape
+    assert offspring.evaluated.all()
+
+
+def test_diversity_metrics():
+    """The diversity metrics should give the same answer for a Population and
+    a list."""
+    pop = _maxones_population()
+    as_list = list(pop)
+
+    assert probe.pairwise_squared_distance_metric(pop) == \
+        pytest.approx(probe.pairwise_squared_distance_metric(as_list))
+    assert probe.sum_of_variances_metric(pop) == \
+        pytest.approx(probe.sum_of_variances_metric(as_list))
+    assert probe.num_fixated_metric(pop) == probe.num_fixated_metric(as_list)
@@ -1,4 +1,7 @@
 """Unit tests for the leap_ec.problem module."""
+import pickle
+import sys
+
 import numpy as np
 import pytest
 from scipy.stats import norm
@@ -34,3 +37,215 @@ def test_averagefitnessproblem():
     alpha = 0.999
     low, high = norm.interval(alpha, scale=1.0/np.sqrt(n))
     assert((difference >= low) and (difference <= high)), f"Expected difference from the true and estimated mean fitness to be within the confidence interval ({low}, {high}) (computed from alpha={alpha}), but observed an estimate of {difference}."
+
+
+##############################
+# Tests for ScalarProblem
+##############################
+def test_ordering_key():
+    """Ordering keys should sort the same way as worse_than(), with NaN as
+    the worst fitness."""
+    fitnesses = np.array([2.0, np.nan, -5.0, 7.0])
+
+    for maximize in (True, False):
+        p = problem.FunctionProblem(sum, maximize=maximize)
+        keys = p.ordering_key(fitnesses)
+        assert keys[1] == -np.inf
+        for i in range(len(fitnesses)):
+            for j in range(len(fitnesses)):
+                if i != j and not np.isnan(fitnesses[j]):
+                    assert (keys[i] < keys[j]) == \
+                        p.worse_than(fitnesses[i], fitnesses[j])
+
+
+##############################
+# Tests for CachedProblem
+##############################
+class _CountingProblem(problem.ScalarProblem):
+    """Sums the phenome and counts how many phenomes it was given."""
+    def __init__(self):
+        super().__init__(maximize=True)
+        self.num_evaluated = 0
+
+    def evaluate(self, phenome):
+        self.num_evaluated += 1
+        return float(np.sum(phenome))
+
+
+def test_cachedproblem_lru():
+    """Repeated phenomes should be served from the cache, and the least
+    recently used fitness should be evicted first."""
+    wrapped = _CountingProblem()
+    p = problem.CachedProblem(wrapped, maxsize=2)
+
+    assert p.evaluate(np.array([1, 1])) == 2
+    assert p.evaluate(np.array([1, 2])) == 3
+    assert p.evaluate(np.array([1, 1])) == 2  # Hit, so [1, 2] is now oldest
+    assert p.evaluate(np.array([3, 3])) == 6  # Evicts [1, 2]
+    assert p.evaluate(np.array([1, 2])) == 3
+
+    assert wrapped.num_evaluated == 4
+    assert p.cache_info() == problem.CacheInfo(hits=1, misses=4, maxsize=2,
+                                               currsize=2)
+    assert p.maximize
+
+
+def test_cachedproblem_evaluate_multiple():
+    """Only the distinct uncached phenomes in a group should be evaluated."""
+    wrapped = _CountingProblem()
+    p = problem.CachedProblem(wrapped)
+    p.evaluate(np.array([0, 1]))
+
+    phenomes = np.array([[0, 1], [2, 2], [2, 2], [5, 5]])
+    individuals = [Individual(g) for g in phenomes]
+    fitnesses = p.evaluate_multiple(phenomes, individuals=individuals)
+
+    assert fitnesses == [1, 4, 4, 10]
+    assert wrapped.num_evaluated == 3
+    assert p.cache_info().hits == 2
+
+
+def test_cachedproblem_pickle():
+    """A pickled CachedProblem should arrive with an empty, working cache."""
+    p = problem.CachedProblem(_CountingProblem())
+    p.evaluate(np.array([1, 1]))
+
+    copied = pickle.loads(pickle.dumps(p))
+
+    assert copied.cache_info().currsize == 0
+    assert copied.evaluate(np.array([1, 1])) == 2
+    assert copied.cache_info().currsize == 1
+
+
+##############################
+# Tests for PersistentExternalProcessProblem
+##############################
+# Returns the sum of each phenome, except that it exits on seeing a -1, sleeps
+# on seeing a -2, and returns its pid when given a 0
+_simulator = """
+import os, sys, time
+for line in sys.stdin:
+    phenome = [float(x) for x in line.split(',')]
+    if phenome[0] == -1:
+        sys.exit(1)
+    if phenome[0] == -2:
+        time.sleep(10)
+    print(os.getpid() if phenome[0] == 0 else sum(phenome), flush=True)
+"""
+
+
+def _persistent_problem(**kwargs):
+    return problem.PersistentExternalProcessProblem(
+        sys.executable, maximize=True, args=['-c', _simulator], **kwargs)
+
+
+def test_persistentexternalprocessproblem_reuses_processes():
+    """The same programs should evaluate every call, sharing each batch."""
+    with _persistent_problem(num_processes=2) as p:
+        assert p.evaluate([1, 2]) == 3.0
+
+        pids = set(p.evaluate_multiple([[0], [0], [0], [0]]))
+        assert len(pids) == 2
+        assert pids == set(p.evaluate_multiple([[0], [0]]))
+
+    assert p._processes == [None, None]
+
+
+def test_persistentexternalprocessproblem_crash():
+    """A program that exits should be restarted, and the phenomes it didn't
+    finish should get NaN fitness."""
+    with _persistent_problem() as p:
+        with pytest.warns(RuntimeWarning):
+            fitnesses = p.evaluate_multiple([[1, 1], [-1], [3]])
+        assert fitnesses[0] == 2.0
+        assert np.isnan(fitnesses[1]) and np.isnan(fitnesses[2])
+
+        assert p.evaluate([3]) == 3.0
+
+
+def test_persistentexternalprocessproblem_timeout():
+    """A program that takes too long should be killed and restarted."""
+    with _persistent_problem(timeout=0.5) as p:
+        with pytest.warns(RuntimeWarning):
+            assert np.isnan(p.evaluate([-2]))
+
+        assert p.evaluate([4]) == 4.0
+
+
+##############################
+# Tests for the binary external protocol
+##############################
+_binary_simulator = """
+from leap_ec.external import serve
+serve(lambda phenome: (phenome.sum(), -phenome[0]))
+"""
+
+
+def test_externalprocessproblem_binary():
+    """The binary protocol should round-trip float64 phenomes without loss,
+    and return vectors of objectives from evaluate_vectors()."""
+    p = problem.ExternalProcessProblem(sys.executable, maximize=True,
+                                       args=['-c', _binary_simulator],
+                                       protocol='binary')
+    x = np.array([0.1, 1e-17, 2 / 3])
+
+    fitnesses = p.evaluate_vectors([x, np.arange(4)])
+
+    assert fitnesses[0].tolist() == [x.sum(), -0.1]
+    assert fitnesses[1].tolist() == [6.0, -0.0]
+
+
+def test_externalprocessproblem_binary_scalar():
+    """A scalar problem should return one-value frames as floats, and reject
+    frames of several values."""
+    scalar = problem.ExternalProcessProblem(
+        sys.executable, maximize=True, protocol='binary',
+        args=['-c', 'from leap_ec.external import serve\n'
+                    'serve(lambda phenome: phenome.sum())'])
+    assert scalar.evaluate_multiple([np.array([0.5, 2.0])]) == [2.5]
+
+    vector = problem.ExternalProcessProblem(sys.executable, maximize=True,
+                                            args=['-c', _binary_simulator],
+                                            protocol='binary')
+    with pytest.raises(ValueError, match='ExternalMultiObjectiveProblem'):
+        vector.evaluate(np.array([1.0]))
+    with pytest.raises(ValueError):
+        problem.ExternalProcessProblem('true', maximize=True).evaluate_vectors([[1]])
+
+
+def test_externalmultiobjectiveproblem_selection():
+    """Individuals evaluated by a binary multi-objective simulator should be
+    comparable by Pareto dominance, so that selection works on them."""
+    from leap_ec import ops
+    from leap_ec.multiobjective.problems import ExternalMultiObjectiveProblem
+
+    simulator = problem.ExternalProcessProblem(sys.executable, maximize=True,
+                                               args=['-c', _binary_simulator],
+                                               protocol='binary')
+    p = ExternalMultiObjectiveProblem(simulator, maximize=[True, False])
+    # The objectives are (sum, -first), and each genome dominates the last
+    pop = Individual.evaluate_population(
+        [Individual(np.array(genome), problem=p)
+         for genome in ([1.0, 1.0], [3.0, 0.0], [2.0, 0.0])])
+
+    assert max(pop).genome.tolist() == [3.0, 0.0]
+    assert pop[0] < pop[2] < pop[1]
+    selected = ops.truncation_selection(pop, size=1)
+    assert selected[0].genome.tolist() == [3.0, 0.0]
+
+
+def test_persistentexternalprocessproblem_binary():
+    """A multi-objective wrapper around a persistent binary simulator."""
+    from leap_ec.multiobjective.problems import ExternalMultiObjectiveProblem
+
+    with problem.PersistentExternalProcessProblem(
+            sys.executable, maximize=True, args=['-c', _binary_simulator],
+            num_processes=2, protocol='binary') as simulator:
+        p = ExternalMultiObjectiveProblem(simulator, maximize=[True, False])
+        phenomes = [np.full(10_000, i / 3) for i in range(5)]
+
+        fitnesses = p.evaluate_multiple(phenomes)
+
+        for phenome, fitness in zip(phenomes, fitnesses):
+            assert fitness.tolist() == [phenome.sum(), -phenome[0]]
+        assert p.evaluate(np.array([1.5])).tolist() == [1.5, -1.5]
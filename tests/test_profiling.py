@@ -0,0 +1,134 @@
+"""
+    Unit tests for leap_ec.profiling.
+"""
+import io
+import time
+
+import numpy as np
+import toolz
+
+from leap_ec import ops
+from leap_ec.algorithm import generational_ea
+from leap_ec.binary_rep.initializers import create_binary_sequence
+from leap_ec.binary_rep.ops import mutate_bitflip
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.checkpoint import Checkpointer
+from leap_ec.individual import Individual
+from leap_ec.problem import ScalarProblem
+from leap_ec.profiling import PipelineProfiler
+from leap_ec.representation import Representation
+
+
+class _SlowProblem(ScalarProblem):
+    """Takes `delay` seconds per evaluation."""
+    def __init__(self, delay):
+        super().__init__(maximize=True)
+        self.delay = delay
+
+    def evaluate(self, phenome):
+        time.sleep(self.delay)
+        return sum(phenome)
+
+
+def _slow_stage(delay):
+    """An iteriter operator that spends `delay` seconds on each individual."""
+    @ops.iteriter_op
+    def slow(next_individual):
+        for ind in next_individual:
+            time.sleep(delay)
+            yield ind
+    return slow
+
+
+def _population(problem, n=5):
+    return Individual.evaluate_population(
+        [Individual(np.array([0, 1, 1]), problem=problem) for _ in range(n)])
+
+
+def test_exclusive_time():
+    """Each lazy stage should be charged for its own time, and not for the
+    time of the stages it pulls from, and evaluations should be timed
+    separately."""
+    problem = _SlowProblem(delay=0.01)
+    parents = _population(problem)
+    profiler = PipelineProfiler()
+    pipeline = profiler.wrap([ops.random_selection,
+                              _slow_stage(0.02),
+                              ops.clone,
+                              ops.evaluate,
+                              ops.pool(size=5)])
+
+    with profiler.timing(problem):
+        toolz.pipe(parents, *pipeline)
+    rows = profiler.end_generation(1)
+
+    times = [row['time'] for row in rows]
+    assert times[1] >= 0.1
+    assert times[3] >= 0.05
+    # The evaluations shouldn't be charged to the earlier stages, nor should
+    # any of the lazy stages be charged to pool()
+    assert times[1] < 0.1 + 0.05
+    assert times[4] < 0.05
+    assert 0.05 <= rows[3]['evaluate_time'] <= times[3]
+    assert [row['evaluations'] for row in rows] == [0, 0, 0, 5, 0]
+    assert [row['name'] for row in rows] == ['random_selection', 'slow',
+                                             'clone', 'evaluate', 'pool']
+
+    # The problem should be back to normal
+    assert 'evaluate' not in vars(problem)
+
+
+def test_counts_and_output():
+    """Pulled and pushed counts should be recorded for each generation, and
+    written to the stream."""
+    problem = MaxOnes()
+    parents = _population(problem, n=4)
+    stream = io.StringIO()
+    profiler = PipelineProfiler(stream=stream)
+    pipeline = profiler.wrap([ops.tournament_selection,
+                              ops.clone,
+                              ops.pool(size=3),
+                              ops.truncation_selection(size=2)])
+
+    for generation in (1, 2):
+        toolz.pipe(parents, *pipeline)
+        profiler.end_generation(generation)
+
+    table = profiler.table()
+    assert len(table) == 8
+    assert table['pulled'].tolist()[:4] == [4, 3, 3, 3]
+    assert table['pushed'].tolist()[:4] == [3, 3, 3, 2]
+    assert len(stream.getvalue().splitlines()) == 9
+
+    summary = profiler.summary()
+    assert summary['pushed'].tolist() == [6, 6, 6, 4]
+    assert abs(summary['fraction_of_time'].sum() - 1.0) < 1e-9
+
+
+def test_checkpointed_run(tmp_path):
+    """A profiled run should still be able to checkpoint its population, and
+    to resume from the checkpoint with a new profiler."""
+    path = tmp_path / 'run.pkl'
+
+    def run(max_generations, profiler):
+        return generational_ea(
+            max_generations=max_generations, pop_size=6, problem=MaxOnes(),
+            representation=Representation(
+                initialize=create_binary_sequence(length=8)),
+            pipeline=[ops.tournament_selection,
+                      ops.clone,
+                      mutate_bitflip(expected_num_mutations=1),
+                      ops.evaluate,
+                      ops.pool(size=6)],
+            checkpointer=Checkpointer(path),
+            profiler=profiler)
+
+    first = PipelineProfiler(stream=io.StringIO())
+    run(2, first)
+    assert first.table()['evaluations'].sum() == 12
+
+    second = PipelineProfiler(stream=io.StringIO())
+    pop = run(4, second)
+    assert len(pop) == 6
+    assert second.table()['generation'].unique().tolist() == [3, 4]
+    assert second.table()['evaluations'].sum() == 12
@@ -0,0 +1,244 @@
+"""
+    Unit tests for the columnar sinks in leap_ec.sink.
+"""
+import io
+import threading
+
+import numpy as np
+import pytest
+
+from leap_ec import data
+from leap_ec.binary_rep.ops import batch_mutate_bitflip
+from leap_ec.binary_rep.problems import MaxOnes
+from leap_ec.global_vars import context
+from leap_ec.individual import Individual
+from leap_ec.population import Population
+from leap_ec.probe import AttributesCSVProbe, FitnessStatsCSVProbe
+from leap_ec.sink import BackgroundWriter, ColumnarSink, open_sink, read_dataframe
+
+
+class _ListSink(ColumnarSink):
+    """A sink that just remembers the batches it's given."""
+    def __init__(self, buffer_rows=10_000):
+        super().__init__(path=None, buffer_rows=buffer_rows)
+        self.batches = []
+
+    def _write_columns(self, columns):
+        self.batches.append(columns)
+
+
+##############################
+# Tests for ColumnarSink
+##############################
+def test_buffering():
+    """Rows should be written out in batches of buffer_rows, with array
+    values stacked into matrices, and the rest on close()."""
+    sink = _ListSink(buffer_rows=2)
+    with sink:
+        for i in range(5):
+            sink.write_row({'step': i, 'genome': np.array([i, i, i])})
+        assert len(sink.batches) == 2
+
+    assert len(sink.batches) == 3
+    assert sink.names == ['step', 'genome']
+    assert sink.batches[0]['step'].tolist() == [0, 1]
+    assert sink.batches[0]['genome'].shape == (2, 3)
+    assert sink.batches[2]['genome'].tolist() == [[4, 4, 4]]
+
+    with pytest.raises(ValueError):
+        sink.write_row({'step': 5, 'genome': np.array([5, 5, 5])})
+
+
+def test_bad_rows():
+    """Rows with different columns, or values of different shapes, should
+    be rejected."""
+    sink = _ListSink()
+    sink.write_row({'step': 0, 'genome': np.array([0, 0])})
+    with pytest.raises(ValueError):
+        sink.write_row({'step': 1, 'fitness': 0})
+
+    sink.write_row({'step': 1, 'genome': np.array([0, 0, 0])})
+    with pytest.raises(ValueError):
+        sink.flush()
+
+
+##############################
+# Tests for the probes with a sink
+##############################
+def test_AttributesCSVProbe_sink():
+    """Genomes should reach the sink as a matrix, not as strings."""
+    context['leap']['generation'] = 7
+    sink = _ListSink()
+    probe = AttributesCSVProbe(stream=None, do_fitness=True, do_genome=True,
+                               job=3, sink=sink)
+    probe(data.test_population)
+    sink.close()
+
+    columns, = sink.batches
+    assert sink.names == ['job', 'step', 'fitness', 'genome']
+    assert columns['step'].tolist() == [7, 7, 7, 7]
+    assert columns['genome'].shape == (4, 5)
+    assert columns['fitness'].tolist() == [ind.fitness for ind in data.test_population]
+
+
+def test_AttributesCSVProbe_sink_population_changes():
+    """Genomes buffered from a Population are views of its genome matrix,
+    so changing the population afterwards mustn't change the rows."""
+    context['leap']['generation'] = 0
+    pop = Population(np.zeros((2, 4), dtype=int), problem=MaxOnes())
+    sink = _ListSink()
+    probe = AttributesCSVProbe(stream=None, do_genome=True, sink=sink)
+
+    probe(pop)
+    batch_mutate_bitflip(pop, probability=1.0)
+    pop[0] = Individual(np.full(4, 2), problem=MaxOnes())
+    sink.close()
+
+    columns, = sink.batches
+    assert columns['genome'].tolist() == [[0, 0, 0, 0], [0, 0, 0, 0]]
+    assert pop.genomes.tolist() == [[2, 2, 2, 2], [1, 1, 1, 1]]
+
+
+def test_FitnessStatsCSVProbe_sink():
+    """The fitness statistics should reach the sink as numbers."""
+    context['leap']['generation'] = 100
+    sink = _ListSink()
+    probe = FitnessStatsCSVProbe(stream=None, notes={'description': 'test'},
+                                 sink=sink)
+    probe(data.test_population)
+    sink.close()
+
+    columns, = sink.batches
+    assert sink.names == ['description', 'step', 'bsf', 'mean_fitness',
+                          'std_fitness', 'min_fitness', 'max_fitness']
+    fitnesses = [ind.fitness for ind in data.test_population]
+    assert columns['bsf'].tolist() == [max(fitnesses)]
+    assert columns['mean_fitness'].tolist() == [np.mean(fitnesses)]
+
+
+##############################
+# Tests for the file formats
+##############################
+@pytest.mark.parametrize('extension, module', [('.parquet', 'pyarrow'),
+                                               ('.arrow', 'pyarrow'),
+                                               ('.h5', 'h5py')])
+def test_round_trip(tmp_path, extension, module):
+    """What's written to each kind of file should be read back the same."""
+    pytest.importorskip(module)
+    path = tmp_path / f'run{extension}'
+    genomes = np.random.uniform(size=(7, 3))
+    with open_sink(path, buffer_rows=3) as sink:
+        for i, genome in enumerate(genomes):
+            sink.write_row({'step': i, 'note': 'x', 'genome': genome})
+
+    df = read_dataframe(path)
+    assert list(df.columns) == ['step', 'note', 'genome']
+    assert df['step'].tolist() == list(range(7))
+    assert df['note'].tolist() == ['x'] * 7
+    assert np.array_equal(np.stack(df['genome']), genomes)
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(tmp_path / 'run.csv')
+
+
+##############################
+# Tests for BackgroundWriter
+##############################
+class _SlowStream:
+    """A stream whose first write doesn't finish until `release` is set."""
+    def __init__(self):
+        self.lines = []
+        self.flushes = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.started.set()
+        self.release.wait()
+        self.lines.append(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def _fill(writer, stream):
+    """Block the writer's thread on 'a', then fill its queue of two."""
+    writer.write('a')
+    stream.started.wait()
+    writer.write('b')
+    writer.write('c')
+
+
+def test_background_writer_block():
+    """Everything should be written, in order, with the flushes coalesced."""
+    stream = _SlowStream()
+    writer = BackgroundWriter(stream, maxsize=2)
+    _fill(writer, stream)
+    threading.Timer(0.1, stream.release.set).start()
+    writer.write('d')  # Waits for room
+    for _ in range(3):
+        writer.flush()
+    writer.close()
+
+    assert stream.lines == ['a', 'b', 'c', 'd']
+    assert stream.flushes == 1
+    assert writer.dropped == 0
+
+
+def test_background_writer_drop():
+    """Writes should be discarded while the queue is full."""
+    stream = _SlowStream()
+    writer = BackgroundWriter(stream, maxsize=2, policy='drop')
+    _fill(writer, stream)
+    writer.write('d')
+    writer.write('e')
+    stream.release.set()
+    writer.drain()
+    writer.write('f')
+    writer.close()
+
+    assert stream.lines == ['a', 'b', 'c', 'f']
+    assert writer.dropped == 2
+
+
+def test_background_writer_sample():
+    """Every sample_every'th write should be kept while the queue is full."""
+    stream = _SlowStream()
+    writer = BackgroundWriter(stream, maxsize=2, policy='sample',
+                              sample_every=2)
+    _fill(writer, stream)
+    writer.write('d')
+    threading.Timer(0.1, stream.release.set).start()
+    writer.write('e')  # Waits for room
+    writer.close()
+
+    assert stream.lines == ['a', 'b', 'c', 'e']
+    assert writer.dropped == 1
+
+
+def test_background_writer_sink():
+    """Rows should reach a sink as they were when they were written."""
+    sink = _ListSink()
+    genome = np.array([0, 1])
+    with BackgroundWriter(sink, close_target=True) as writer:
+        writer.write_row({'genome': genome})
+        genome[0] = 1
+        writer.write_rows([{'genome': genome}])
+
+    assert sink.closed
+    assert sink.batches[0]['genome'].tolist() == [[0, 1], [1, 1]]
+
+
+def test_background_writer_error():
+    """An exception in the writer thread should be raised again in the
+    caller's thread."""
+    writer = BackgroundWriter(_ListSink())
+    writer.write('Sinks have no write()')
+    with pytest.raises(AttributeError):
+        writer.drain()
+    writer.close()
+
+    with pytest.raises(ValueError):
+        BackgroundWriter(io.StringIO(), policy='shuffle')